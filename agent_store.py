@@ -0,0 +1,201 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from auction import ANIMATION_SPEED, COLORS, HEIGHT, WIDTH, Agent, MarketEngine, Task
+
+# State codes mirror the strings used by auction.Agent
+IDLE, MOVING_TO_TASK, WORKING, RETURNING = range(4)
+STATE_NAMES = ["IDLE", "MOVING_TO_TASK", "WORKING", "RETURNING"]
+STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
+
+class AgentArrays:
+    """
+    Structure-of-arrays agent store for auction.py, used by
+    MarketEngine(store="arrays").
+
+    Holds one NumPy array per attribute instead of one object per agent, and
+    advances movement, arrival and work progress for every agent in a single
+    vectorized step() with the same rules as Agent.update. Each agent's task is
+    stored as its target position, value and work needed.
+    """
+    def __init__(self, count):
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.start_x = np.zeros(count)
+        self.start_y = np.zeros(count)
+        self.state = np.full(count, IDLE, dtype=np.int8)
+        self.work_progress = np.zeros(count, dtype=np.int64)
+        self.balance = np.zeros(count, dtype=np.int64)
+        self.current_bid = np.zeros(count, dtype=np.int64)
+        self.task_x = np.zeros(count)
+        self.task_y = np.zeros(count)
+        self.task_value = np.zeros(count, dtype=np.int64)
+        self.work_needed = np.zeros(count, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.x)
+
+    @classmethod
+    def from_agents(cls, agents):
+        store = cls(len(agents))
+        for i, agent in enumerate(agents):
+            store.x[i], store.y[i] = agent.x, agent.y
+            store.start_x[i], store.start_y[i] = agent.start_pos
+            store.state[i] = STATE_CODES[agent.state]
+            store.work_progress[i] = agent.work_progress
+            store.balance[i] = agent.balance
+            store.current_bid[i] = agent.current_bid
+            if agent.task is not None:
+                store.set_task(i, agent.task)
+        return store
+
+    def sync_to_agents(self, agents):
+        """Copies positions, states and money back onto the Agent objects, with the status text Agent.update sets."""
+        for i, agent in enumerate(agents):
+            agent.x, agent.y = float(self.x[i]), float(self.y[i])
+            state = STATE_NAMES[self.state[i]]
+            if state == "MOVING_TO_TASK":
+                agent.last_action_text = "Winning! Moving..."
+            elif state == "WORKING":
+                agent.last_action_text = f"Working {self.work_progress[i]}%"
+            elif state == "RETURNING":
+                agent.last_action_text = "Task Done. Returning."
+            elif agent.state != "IDLE":
+                agent.last_action_text = "Idle"
+            agent.state = state
+            agent.work_progress = int(self.work_progress[i])
+            agent.balance = int(self.balance[i])
+            agent.current_bid = int(self.current_bid[i])
+
+    def is_idle(self, index):
+        return self.state[index] == IDLE
+
+    def set_task(self, index, task):
+        self.task_x[index] = task.x
+        self.task_y[index] = task.y
+        self.task_value[index] = task.true_value
+        self.work_needed[index] = task.work_needed
+
+    def assign(self, index, task, bid):
+        """Sends agent `index` to `task` after winning it for `bid`."""
+        self.set_task(index, task)
+        self.current_bid[index] = bid
+        self.state[index] = MOVING_TO_TASK
+
+    def move_towards(self, mask, target_x, target_y):
+        """Vectorized Agent.move_towards; returns the arrival mask for the selected agents."""
+        dx = target_x[mask] - self.x[mask]
+        dy = target_y[mask] - self.y[mask]
+        dist = np.hypot(dx, dy)
+        arrived = dist <= ANIMATION_SPEED
+
+        # Only divide where the agent is still travelling, like the scalar code
+        travelling = ~arrived
+        scale = np.zeros_like(dist)
+        scale[travelling] = ANIMATION_SPEED
+        safe = np.where(travelling, dist, 1.0)
+        self.x[mask] = np.where(arrived, target_x[mask], self.x[mask] + (dx / safe) * scale)
+        self.y[mask] = np.where(arrived, target_y[mask], self.y[mask] + (dy / safe) * scale)
+        return arrived
+
+    def step(self):
+        """
+        Advances every agent by one tick and returns the indices of the agents that
+        finished their task. States are read once at the start of the tick, so an
+        agent changes state at most once per step, exactly as with Agent.update.
+        """
+        moving = self.state == MOVING_TO_TASK
+        working = self.state == WORKING
+        returning = self.state == RETURNING
+
+        # Moving to task: arrive -> start working next tick
+        if moving.any():
+            arrived = self.move_towards(moving, self.task_x, self.task_y)
+            self.state[np.flatnonzero(moving)[arrived]] = WORKING
+
+        # Working: one unit of progress per tick, then collect the profit
+        completed = np.empty(0, dtype=np.intp)
+        if working.any():
+            self.work_progress[working] += 1
+            done = working & (self.work_progress >= self.work_needed)
+            completed = np.flatnonzero(done)
+            self.balance[done] += self.task_value[done] - self.current_bid[done]
+            self.state[done] = RETURNING
+            self.work_progress[done] = 0
+
+        # Returning: arrive home -> idle
+        if returning.any():
+            arrived = self.move_towards(returning, self.start_x, self.start_y)
+            self.state[np.flatnonzero(returning)[arrived]] = IDLE
+
+        return completed
+
+# --- Equivalence check and benchmark ---
+
+def random_agents(count, rng):
+    return [Agent(i + 1, rng.randint(0, WIDTH), rng.randint(0, HEIGHT), COLORS[i % len(COLORS)], rng)
+            for i in range(count)]
+
+def check(count=200, ticks=2000, seed=0):
+    """
+    Runs the object model and the store side by side, tick by tick, and raises
+    RuntimeError on the first state or balance mismatch. Returns the worst
+    position difference, which is float rounding (np.hypot vs math.hypot).
+    """
+    rng = random.Random(seed)
+    agents = random_agents(count, rng)
+    store = AgentArrays.from_agents(agents)
+    worst = 0.0
+
+    for tick in range(ticks):
+        # Hand new tasks to a few idle agents, identically in both models
+        for i, agent in enumerate(agents):
+            if agent.state == "IDLE" and rng.random() < 0.02:
+                task = Task(rng)
+                bid = agent.calculate_bid(task.true_value)
+                agent.state, agent.task = "MOVING_TO_TASK", task
+                store.assign(i, task, bid)
+
+        for agent in agents:
+            if agent.update(agent.task):
+                agent.task = None
+        store.step()
+
+        worst = max(worst, float(np.max(np.abs(store.x - [a.x for a in agents]))))
+        if [STATE_CODES[a.state] for a in agents] != store.state.tolist():
+            raise RuntimeError(f"State mismatch at tick {tick}")
+        if [a.balance for a in agents] != store.balance.tolist():
+            raise RuntimeError(f"Balance mismatch at tick {tick}")
+    return worst
+
+def run_engine(count, ticks, seed=0, store="objects"):
+    """A seeded MarketEngine with `count` random agents; returns (engine, seconds)."""
+    rng = random.Random(seed)
+    engine = MarketEngine(random_agents(count, rng), seed=seed, store=store)
+    start = time.perf_counter()
+    engine.run(ticks)
+    return engine, time.perf_counter() - start
+
+def benchmark(count, ticks=100, seed=0):
+    """Seconds per engine run with each store; raises RuntimeError if their balances differ."""
+    objects, objects_s = run_engine(count, ticks, seed, "objects")
+    arrays, arrays_s = run_engine(count, ticks, seed, "arrays")
+    if [a.balance for a in objects.agents] != [a.balance for a in arrays.agents]:
+        raise RuntimeError(f"Object and array engines disagree on balances ({count} agents, seed {seed})")
+    return objects_s, arrays_s
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Array-backed agent store for auction.py")
+    parser.add_argument("--agents", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--check", action="store_true", help="first run the tick-by-tick parity check")
+    args = parser.parse_args()
+
+    if args.check:
+        print(f"Object vs array model match, worst x difference: {check():.2e}")
+    objects, arrays = benchmark(args.agents, args.ticks)
+    print(f"MarketEngine, {args.agents} agents x {args.ticks} ticks | objects: {objects:.3f}s | "
+          f"arrays: {arrays:.3f}s | speedup: {objects / arrays:.1f}x")
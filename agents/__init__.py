@@ -0,0 +1,25 @@
+"""
+Single entry point for the simulations: python -m agents <command> [args].
+
+Each command runs the named module's own command line as if it were started
+with python <module>.py, so every flag keeps working. Rendering backends
+(matplotlib, pygame) are only imported by the viewers, so --headless runs
+start with little more than NumPy loaded.
+"""
+
+# Command -> module
+COMMANDS = {
+    "bid": "bid",
+    "auction": "auction",
+    "cleaner": "cleaner",
+    "treasure": "treasurehunt",
+    "auction-house": "auction_house",
+    "marketplace": "marketplace",
+    "tournament": "tournament",
+    "batch-cleaner": "batch_cleaner",
+    "mazegen": "mazegen",
+    "parallel-hunt": "parallel_hunt",
+    "ledger": "ledger",
+    "replay": "replay",
+    "sweep": "sweep",
+}
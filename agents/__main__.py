@@ -0,0 +1,24 @@
+import argparse
+import runpy
+import sys
+
+from agents import COMMANDS
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents", description="Run any of the simulations",
+                                     epilog="startup: time headless cold starts (see agents/startup.py)")
+    parser.add_argument("command", choices=sorted(COMMANDS) + ["startup"])
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the command (try --help)")
+    args = parser.parse_args(argv)
+
+    if args.command == "startup":
+        from agents import startup
+        return startup.main(args.args)
+
+    # The module sees the same argv and __name__ as when run directly (runpy sets argv[0] to its file)
+    sys.argv = [COMMANDS[args.command]] + args.args
+    runpy.run_module(COMMANDS[args.command], run_name="__main__", alter_sys=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# --- Configuration ---
+STARTUP_BUDGET = 0.25 # Seconds from process launch to exit for a tiny headless run
+RUNS = 5
+GUI_MODULES = ("matplotlib", "pygame")
+
+# The smallest useful headless run of every simulation
+HEADLESS_RUNS = {
+    "bid": ["--headless", "--rounds", "5", "--seed", "0"],
+    "auction": ["--headless", "--ticks", "600", "--seed", "0"],
+    "cleaner": ["--headless", "--rooms", "1", "--seed", "0"],
+    "treasure": ["--headless"],
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def launch(command, extra=()):
+    """Runs python -m agents <command> in a fresh interpreter; returns (seconds, stderr)."""
+    cmd = [sys.executable, *extra, "-m", "agents", command, *HEADLESS_RUNS[command]]
+    started = time.perf_counter()
+    done = subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - started
+    if done.returncode:
+        raise RuntimeError(f"{' '.join(cmd)} failed:\n{done.stderr}")
+    return elapsed, done.stderr
+
+def imported_modules(importtime_log):
+    """Top-level package names from a python -X importtime log."""
+    names = set()
+    for line in importtime_log.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            names.add(name.split(".")[0])
+    return names
+
+def benchmark(commands=tuple(HEADLESS_RUNS), runs=RUNS, budget=STARTUP_BUDGET):
+    """
+    Cold-start wall time of each headless command over `runs` launches, plus
+    one extra launch under -X importtime to list any GUI backend it loaded.
+    """
+    rows = []
+    for command in commands:
+        times = [launch(command)[0] for _ in range(runs)]
+        _, log = launch(command, ["-X", "importtime"])
+        median = statistics.median(times)
+        rows.append({
+            'command': command,
+            'median_s': median,
+            'best_s': min(times),
+            'gui_modules': sorted(imported_modules(log) & set(GUI_MODULES)),
+            'within_budget': median <= budget,
+        })
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents startup",
+                                     description="Cold-start time of headless runs against a budget")
+    parser.add_argument("commands", nargs="*", metavar="command",
+                        help=f"any of {', '.join(HEADLESS_RUNS)} (default: all)")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="seconds per headless launch")
+    args = parser.parse_args(argv)
+    unknown = set(args.commands) - set(HEADLESS_RUNS)
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(sorted(unknown))}")
+
+    rows = benchmark(args.commands or tuple(HEADLESS_RUNS), args.runs, args.budget)
+    print(f"{'Command':<10} | {'Median':>8} | {'Best':>8} | {'GUI imported':<12} | Budget {args.budget * 1000:.0f} ms")
+    print("-" * 62)
+    for row in rows:
+        gui = ", ".join(row['gui_modules']) or "none"
+        print(f"{row['command']:<10} | {row['median_s'] * 1000:>6.0f}ms | {row['best_s'] * 1000:>6.0f}ms | "
+              f"{gui:<12} | {'ok' if row['within_budget'] else 'OVER'}")
+    # Non-zero exit lets a scheduler or CI job fail on a startup regression
+    return 0 if all(row['within_budget'] and not row['gui_modules'] for row in rows) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,13 @@
-import pygame
+import argparse
 import random
 import math
+from collections import OrderedDict
+
+import clearing
+import metrics
+from ledger import NO_BID, Ledger
+
+pygame = None # Loaded by load_pygame() once a viewer opens; headless runs never import it
 
 # --- Configuration ---
 WIDTH, HEIGHT = 1000, 700
@@ -8,6 +15,16 @@ BG_COLOR = (30, 30, 30)
 TEXT_COLOR = (255, 255, 255)
 FPS = 60 
 ANIMATION_SPEED = 2
+TRAVEL_COST = 0.05 # Dollars an agent deducts from its bid per pixel of travel
+TEXT_CACHE_SIZE = 512 # Rendered text surfaces kept by the viewer
+PANEL_WIDTH = 250
+TASK_SPAWN_DELAY = 60 # Ticks between a task closing and the next one appearing
+STORES = ["objects", "arrays"] # Where MarketEngine keeps per-tick agent state
+
+# Ranges each agent's personality traits are drawn from
+VALUATION_SKILL_RANGE = (0.85, 1.15)
+GREED_RANGE = (0.1, 0.3)
+AGGRESSIVENESS_RANGE = (0.3, 0.8)
 
 # Colors
 COLORS = [
@@ -20,20 +37,20 @@ COLORS = [
 # --- Classes ---
 
 class Task:
-    def __init__(self):
-        self.x = random.randint(200, WIDTH - 200)
-        self.y = random.randint(200, HEIGHT - 200)
-        self.true_value = random.randint(50, 150) 
+    def __init__(self, rng=random):
+        self.x = rng.randint(200, WIDTH - 200)
+        self.y = rng.randint(200, HEIGHT - 200)
+        self.true_value = rng.randint(50, 150) 
         self.work_needed = 100
         self.radius = 15
         self.color = (200, 200, 200)
 
     def draw(self, screen):
         pygame.draw.circle(screen, self.color, (self.x, self.y), self.radius)
-        pygame.draw.circle(screen, (255,255,255), (self.x, self.y), self.radius, 2)
+        return pygame.draw.circle(screen, (255,255,255), (self.x, self.y), self.radius, 2)
 
 class Agent:
-    def __init__(self, id, start_x, start_y, color):
+    def __init__(self, id, start_x, start_y, color, rng=random):
         self.id = id
         self.x = start_x
         self.y = start_y
@@ -44,21 +61,23 @@ class Agent:
         self.balance = 0
         
         # Personality Traits
-        self.valuation_skill = random.uniform(0.85, 1.15) 
-        self.greed = random.uniform(0.1, 0.3) 
+        self.valuation_skill = rng.uniform(*VALUATION_SKILL_RANGE)
+        self.greed = rng.uniform(*GREED_RANGE)
         
         # New Trait: Aggressiveness (Probability to enter an auction)
         # 0.3 means they only bid 30% of the time, 0.9 means 90%
-        self.aggressiveness = random.uniform(0.3, 0.8)
+        self.aggressiveness = rng.uniform(*AGGRESSIVENESS_RANGE)
 
         self.state = "IDLE" 
+        self.task = None
         self.current_bid = 0
         self.work_progress = 0
         self.last_action_text = "Ready"
 
-    def calculate_bid(self, task_value):
+    def calculate_bid(self, task_value, travel_distance=0):
         estimated_value = task_value * self.valuation_skill
-        max_bid = estimated_value * (1 - self.greed)
+        # Far away tasks are worth less: the trip itself costs money
+        max_bid = estimated_value * (1 - self.greed) - travel_distance * TRAVEL_COST
         self.current_bid = int(max(1, max_bid))
         return self.current_bid
 
@@ -100,133 +119,400 @@ class Agent:
         
         return False
 
-    def draw(self, screen, font):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
-        text = font.render(f"A{self.id}", True, (0,0,0))
-        screen.blit(text, (self.x - 5, self.y - 8))
-        status = font.render(self.last_action_text, True, TEXT_COLOR)
-        screen.blit(status, (self.x - 20, self.y - 40))
+    def draw(self, screen, font, text_cache=None):
+        """Draws the agent and returns the screen rectangles it touched."""
+        render = text_cache.render if text_cache else lambda f, t, c: f.render(t, True, c)
+        rects = [pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)]
+        text = render(font, f"A{self.id}", (0,0,0))
+        rects.append(screen.blit(text, (self.x - 5, self.y - 8)))
+        status = render(font, self.last_action_text, TEXT_COLOR)
+        rects.append(screen.blit(status, (self.x - 20, self.y - 40)))
 
         if self.state == "WORKING":
-            pygame.draw.rect(screen, (255, 255, 255), (self.x - 15, self.y + 25, 30, 5))
+            rects.append(pygame.draw.rect(screen, (255, 255, 255), (self.x - 15, self.y + 25, 30, 5)))
             pygame.draw.rect(screen, (0, 255, 0), (self.x - 15, self.y + 25, 30 * (self.work_progress/100), 5))
+        return rects
 
-# --- Main System ---
-
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Multi-Agent Auction (Reduced Bids)")
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Arial", 16)
-    header_font = pygame.font.SysFont("Arial", 24, bold=True)
+# --- Simulation Engine ---
 
-    agents = [
-        Agent(1, 50, 50, COLORS[0]),
-        Agent(2, WIDTH-50, 50, COLORS[1]),
-        Agent(3, 50, HEIGHT-50, COLORS[2]),
-        Agent(4, WIDTH-50, HEIGHT-50, COLORS[3])
+def default_agents(rng=random):
+    return [
+        Agent(1, 50, 50, COLORS[0], rng),
+        Agent(2, WIDTH-50, 50, COLORS[1], rng),
+        Agent(3, 50, HEIGHT-50, COLORS[2], rng),
+        Agent(4, WIDTH-50, HEIGHT-50, COLORS[3], rng)
     ]
 
-    current_task = None
-    task_delay_timer = 0
-    auction_log = "System: Waiting for task..."
+class MarketEngine:
+    """
+    Owns the market state and advances it one fixed tick at a time.
+    Knows nothing about pygame, so it can run headless as fast as the CPU allows
+    or be stepped several times per rendered frame by the viewer.
 
-    running = True
-    while running:
-        screen.fill(BG_COLOR)
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+    With store="arrays" the agents' positions, states, work and money live in an
+    agent_store.AgentArrays and every tick is one vectorized step. The Agent
+    objects keep their traits and are brought up to date by sync().
+    """
+    def __init__(self, agents=None, seed=None, mechanism="first", reserve=None, ledger=None, store="objects"):
+        if store not in STORES:
+            raise ValueError(f"Unknown store '{store}'. Choose from: {', '.join(STORES)}")
+        self.rng = random.Random(seed) if seed is not None else random
+        self.mechanism = mechanism
+        self.reserve = reserve
+        self.agents = agents if agents is not None else default_agents(self.rng)
+        self.store = None
+        if store == "arrays":
+            from agent_store import AgentArrays # agent_store imports this module
+            self.store = AgentArrays.from_agents(self.agents)
+        self.ledger = ledger # Optional ledger.Ledger with one column per agent, in self.agents order
+        self.lots = 0
+        self.current_task = None
+        self.task_delay_timer = 0
+        self.auction_log = "System: Waiting for task..."
+        self.ticks = 0
+        self.tasks_completed = 0
 
-        if current_task is None:
-            task_delay_timer += 1
-            if task_delay_timer > 60:
-                current_task = Task()
-                auction_log = f"NEW TASK! Value: ${current_task.true_value}"
-                
-                # --- AUCTION LOGIC ---
-                bids = []
-                bid_participants = 0
-                
-                for agent in agents:
-                    if agent.state == "IDLE":
-                        # DECISION: Should I bid? (Simulate interest/availability)
-                        # Agent only bids if random chance is lower than their aggressiveness trait
-                        if random.random() < agent.aggressiveness:
-                            bid = agent.calculate_bid(current_task.true_value)
-                            bids.append((bid, agent))
-                            bid_participants += 1
-                        else:
-                            # Optional: Visual feedback that they passed
-                            agent.last_action_text = "Passed (No Bid)"
-                
-                if bids:
-                    bids.sort(key=lambda x: x[0], reverse=True)
-                    winning_bid, winner = bids[0]
-                    auction_log = f"WINNER: A{winner.id} (${winning_bid}) | Total Bids: {bid_participants}"
-                    winner.state = "MOVING_TO_TASK"
-                else:
-                    auction_log = "No bids placed. Task skipped."
-                    current_task = None 
-                    task_delay_timer = 0
+    def open_auction(self):
+        with metrics.timer("auction.spawn"):
+            self.current_task = Task(self.rng)
+            self.auction_log = f"NEW TASK! Value: ${self.current_task.true_value}"
+
+        # --- AUCTION LOGIC ---
+        bids = []
+        bid_participants = 0
+
+        with metrics.timer("auction.collect_bids"):
+            for i, agent in enumerate(self.agents):
+                if self.idle(i, agent):
+                    # DECISION: Should I bid? (Simulate interest/availability)
+                    # Agent only bids if random chance is lower than their aggressiveness trait
+                    if self.rng.random() < agent.aggressiveness:
+                        bid = agent.calculate_bid(self.current_task.true_value)
+                        if self.store is not None:
+                            self.store.current_bid[i] = bid
+                        bids.append((bid, agent))
+                        bid_participants += 1
+                    else:
+                        # Optional: Visual feedback that they passed
+                        agent.last_action_text = "Passed (No Bid)"
+        metrics.count("auction.tasks")
+        metrics.count("auction.bids", bid_participants)
+
+        with metrics.timer("auction.clear"):
+            outcome = clearing.clear(bids, self.mechanism, self.reserve)
+        self.lots += 1
+        if self.ledger is not None:
+            self.record_lot(bids, outcome)
+        if outcome:
+            winner = outcome['winner']
+            # current_bid is what the agent gets charged, which can be below its bid
+            winner.current_bid = outcome['price']
+            self.auction_log = f"WINNER: A{winner.id} (${outcome['price']}) | Total Bids: {bid_participants}"
+            winner.state = "MOVING_TO_TASK"
+            winner.task = self.current_task
+            if self.store is not None:
+                self.store.assign(self.agents.index(winner), self.current_task, outcome['price'])
+        else:
+            self.auction_log = "No bids placed. Task skipped." if not bids else "Reserve not met. Task skipped."
+            self.current_task = None
+            self.task_delay_timer = 0
+
+    def idle(self, index, agent):
+        if self.store is None:
+            return agent.state == "IDLE"
+        return self.store.is_idle(index)
+
+    def record_lot(self, bids, outcome):
+        """Appends the lot just cleared to the ledger. Profit is booked at clearing, before the work is done."""
+        column = {id(agent): i for i, agent in enumerate(self.agents)}
+        row = [NO_BID] * len(self.agents)
+        for amount, agent in bids:
+            row[column[id(agent)]] = amount
+        value = self.current_task.true_value
+        if outcome is None:
+            self.ledger.append(self.lots, value, row, -1, 0, 0, 0)
+        else:
+            self.ledger.append(self.lots, value, row, column[id(outcome['winner'])], outcome['winning_bid'],
+                               outcome['price'], value - outcome['price'])
+
+    def step(self):
+        """Advances the market by one tick."""
+        self.ticks += 1
+
+        if self.current_task is None:
+            self.task_delay_timer += 1
+            if self.task_delay_timer > TASK_SPAWN_DELAY:
+                self.open_auction()
 
         task_completed = False
-        for agent in agents:
-            if current_task and agent.state != "IDLE" and agent.state != "RETURNING":
-                if agent.update(current_task):
-                    task_completed = True
-            else:
-                agent.update(None)
+        if self.store is not None:
+            # Only the current task's winner can be working, so any completion is that task
+            task_completed = len(self.store.step()) > 0
+        else:
+            for agent in self.agents:
+                if self.current_task and agent.state != "IDLE" and agent.state != "RETURNING":
+                    if agent.update(self.current_task):
+                        task_completed = True
+                else:
+                    agent.update(None)
 
         if task_completed:
-            current_task = None
-            task_delay_timer = 0
+            for agent in self.agents:
+                if agent.task is self.current_task:
+                    agent.task = None
+            self.current_task = None
+            self.task_delay_timer = 0
+            self.tasks_completed += 1
+
+    def run(self, ticks):
+        for _ in range(ticks):
+            self.step()
+        self.sync()
+        return self
+
+    def sync(self):
+        """Copies array-store state back onto the Agent objects; a no-op for the object store."""
+        if self.store is not None:
+            self.store.sync_to_agents(self.agents)
+
+    def visible_tasks(self):
+        return [self.current_task] if self.current_task else []
+
+def run_headless(ticks, seed=None, mechanism="first", reserve=None, ledger=None, store="objects"):
+    """Runs the market without a display and returns the final statistics."""
+    engine = MarketEngine(seed=seed, mechanism=mechanism, reserve=reserve, ledger=ledger, store=store).run(ticks)
+    return {
+        'ticks': engine.ticks,
+        'tasks_completed': engine.tasks_completed,
+        'balances': {agent.id: agent.balance for agent in engine.agents},
+    }
+
+# Per-tick methods timed by --metrics
+METRIC_HOOKS = [(MarketEngine, "step", "auction.step")]
+
+# --- Viewer ---
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (text, colour, font)."""
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
-        # Drawing
-        if current_task:
-            current_task.draw(screen)
-            for agent in agents:
-                if agent.state == "MOVING_TO_TASK" or agent.state == "WORKING":
-                    pygame.draw.line(screen, agent.color, (agent.x, agent.y), (current_task.x, current_task.y), 2)
+    def render(self, font, text, color):
+        key = (text, color, font)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
 
-        for agent in agents:
-            agent.draw(screen, font)
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
 
-        # UI
-        pygame.draw.rect(screen, (50, 50, 50), (0, 0, 250, HEIGHT))
-        pygame.draw.line(screen, (255, 255, 255), (250, 0), (250, HEIGHT), 2)
-        title = header_font.render("Agent Stats", True, (255, 215, 0))
-        screen.blit(title, (20, 20))
+class Viewer:
+    """
+    Renders a MarketEngine with as little work per frame as possible:
+    the stats panel chrome lives on a static background layer, text surfaces
+    come from a TextCache, and only rectangles that changed since the previous
+    frame are erased, redrawn and pushed with pygame.display.update(rects).
+    """
+    def __init__(self, screen, font, header_font):
+        self.screen = screen
+        self.font = font
+        self.text = TextCache()
+        self.panel_area = pygame.Rect(0, 0, PANEL_WIDTH + 2, HEIGHT)
+        self.world_area = pygame.Rect(PANEL_WIDTH + 2, 0, WIDTH - PANEL_WIDTH - 2, HEIGHT)
+        self.background = self.build_background(header_font)
+        self.world_key = None
+        self.world_rects = []
+        self.panel = {} # slot -> (text, color, rect) currently on screen
 
+        screen.blit(self.background, (0, 0))
+        pygame.display.flip()
+
+    def build_background(self, header_font):
+        background = pygame.Surface((WIDTH, HEIGHT)).convert()
+        background.fill(BG_COLOR)
+        pygame.draw.rect(background, (50, 50, 50), (0, 0, PANEL_WIDTH, HEIGHT))
+        pygame.draw.line(background, (255, 255, 255), (PANEL_WIDTH, 0), (PANEL_WIDTH, HEIGHT), 2)
+        background.blit(header_font.render("Agent Stats", True, (255, 215, 0)), (20, 20))
+        background.blit(header_font.render("Auction Feed", True, (255, 215, 0)), (20, HEIGHT - 100))
+        return background
+
+    def draw_world(self, engine, overlay):
+        """
+        Redraws the world layer if anything on it moved. Panel texts long enough to
+        spill into the world are part of this layer (overlay), drawn last so they
+        stay on top exactly as in a full-screen redraw.
+        """
+        tasks = engine.visible_tasks()
+        key = (
+            tuple((t.x, t.y) for t in tasks),
+            tuple((round(a.x, 1), round(a.y, 1), a.state, a.last_action_text, a.work_progress,
+                   (a.task.x, a.task.y) if a.task else None) for a in engine.agents),
+            tuple(overlay),
+        )
+        if key == self.world_key:
+            return []
+        self.world_key = key
+
+        # Sprites overlap each other, so the world is erased and redrawn as one layer
+        dirty = self.world_rects
+        for rect in dirty:
+            self.screen.blit(self.background, rect, rect)
+
+        drawn = [task.draw(self.screen) for task in tasks]
+        for agent in engine.agents:
+            if agent.task and (agent.state == "MOVING_TO_TASK" or agent.state == "WORKING"):
+                drawn.append(pygame.draw.line(self.screen, agent.color, (agent.x, agent.y),
+                                              (agent.task.x, agent.task.y), 2))
+        for agent in engine.agents:
+            drawn.extend(agent.draw(self.screen, self.font, self.text))
+
+        # pygame under-reports the bounds of thick lines by a pixel, so pad every rect
+        drawn = [rect.inflate(4, 4) for rect in drawn]
+
+        # The panel sits on top of the world: restore its chrome wherever sprites spilled over
+        for rect in drawn:
+            covered = rect.clip(self.panel_area)
+            if covered:
+                self.screen.blit(self.background, covered, covered)
+
+        for slot, text, color, pos in overlay:
+            drawn.append(self.screen.blit(self.text.render(self.font, text, color), pos))
+
+        self.world_rects = drawn
+        return dirty + drawn
+
+    def panel_texts(self, engine):
+        texts = []
         y_offset = 60
-        for agent in agents:
-            name_text = font.render(f"Agent {agent.id} Bal: ${agent.balance}", True, agent.color)
-            screen.blit(name_text, (20, y_offset))
-            aggro_text = font.render(f"Bid Rate: {int(agent.aggressiveness*100)}%", True, (150, 150, 150))
-            screen.blit(aggro_text, (20, y_offset + 20))
-            
+        for agent in engine.agents:
+            texts.append(((agent.id, "name"), f"Agent {agent.id} Bal: ${agent.balance}", agent.color, (20, y_offset)))
+            texts.append(((agent.id, "aggro"), f"Bid Rate: {int(agent.aggressiveness*100)}%", (150, 150, 150), (20, y_offset + 20)))
+
             if agent.state == "IDLE":
                 state_text = agent.last_action_text
             elif agent.state == "MOVING_TO_TASK":
                 state_text = f"Won bid: ${agent.current_bid}"
             else:
                 state_text = agent.state
-            
-            sub_text = font.render(state_text, True, (200, 200, 200))
-            screen.blit(sub_text, (20, y_offset + 40))
+
+            texts.append(((agent.id, "state"), state_text, (200, 200, 200), (20, y_offset + 40)))
             y_offset += 85
 
-        log_title = header_font.render("Auction Feed", True, (255, 215, 0))
-        screen.blit(log_title, (20, HEIGHT - 100))
-        log_msg = font.render(auction_log, True, (255, 255, 255))
-        screen.blit(log_msg, (20, HEIGHT - 70))
+        texts.append(("log", engine.auction_log, (255, 255, 255), (20, HEIGHT - 70)))
+        return texts
 
-        pygame.display.flip()
+    def draw(self, engine):
+        overlay = []
+        panel = []
+        for entry in self.panel_texts(engine):
+            slot, text, color, pos = entry
+            size = self.text.render(self.font, text, color).get_size()
+            if pygame.Rect(pos, size).colliderect(self.world_area):
+                overlay.append(entry)
+            else:
+                panel.append(entry)
+
+        # Texts that just grew into the world leave their panel slot behind
+        dirty = []
+        for slot, _, _, _ in overlay:
+            previous = self.panel.pop(slot, None)
+            if previous:
+                self.screen.blit(self.background, previous[2], previous[2])
+                dirty.append(previous[2])
+
+        world_dirty = self.draw_world(engine, overlay)
+        dirty += world_dirty
+
+        # Panel-only texts: redraw when they changed or a world sprite was drawn over them
+        for slot, text, color, pos in panel:
+            previous = self.panel.get(slot)
+            if previous:
+                unchanged = previous[0] == text and previous[1] == color
+                if unchanged and previous[2].collidelist(world_dirty) == -1:
+                    continue
+                self.screen.blit(self.background, previous[2], previous[2])
+                dirty.append(previous[2])
+            rect = self.screen.blit(self.text.render(self.font, text, color), pos)
+            self.panel[slot] = (text, color, rect)
+            dirty.append(rect)
+
+        if dirty:
+            pygame.display.update(dirty)
+
+def load_pygame():
+    global pygame
+    if pygame is None:
+        try:
+            import pygame as module
+        except ImportError:
+            raise RuntimeError("pygame is required for the viewer; use --headless to run without it")
+        pygame = module
+    return pygame
+
+def main(ticks_per_frame=1, seed=None, engine=None):
+    load_pygame()
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Multi-Agent Auction (Reduced Bids)")
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont("Arial", 16)
+    header_font = pygame.font.SysFont("Arial", 24, bold=True)
+
+    if engine is None:
+        engine = MarketEngine(seed=seed)
+    viewer = Viewer(screen, font, header_font)
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        with metrics.timer("auction.sim"):
+            for _ in range(ticks_per_frame):
+                engine.step()
+            engine.sync()
+
+        with metrics.timer("auction.render"):
+            viewer.draw(engine)
         clock.tick(FPS)
 
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Multi-agent task auction")
+    parser.add_argument("--headless", action="store_true", help="run without pygame as fast as possible")
+    parser.add_argument("--ticks", type=int, default=FPS * 3600, help="ticks to simulate when headless")
+    parser.add_argument("--ticks-per-frame", type=int, default=1, help="simulation ticks per rendered frame")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--mechanism", choices=sorted(clearing.MECHANISMS), default="first")
+    parser.add_argument("--reserve", type=int, default=None)
+    parser.add_argument("--metrics", metavar="PATH", help="write timings on exit (.prom for Prometheus, else JSON)")
+    parser.add_argument("--ledger", metavar="PATH", help="save every lot to a ledger directory (see ledger.py)")
+    parser.add_argument("--store", choices=STORES, default="objects", help="where per-tick agent state is kept")
+    args = parser.parse_args()
+    trades = Ledger([f"Agent {i + 1}" for i in range(len(COLORS))]) if args.ledger else None
+
+    if args.metrics:
+        metrics.enable(METRIC_HOOKS)
+    if args.headless:
+        stats = run_headless(args.ticks, args.seed, args.mechanism, args.reserve, trades, args.store)
+        print(f"Ticks: {stats['ticks']} | Tasks completed: {stats['tasks_completed']}")
+        for agent_id, balance in stats['balances'].items():
+            print(f"   Agent {agent_id} Bal: ${balance}")
+    else:
+        main(args.ticks_per_frame, engine=MarketEngine(seed=args.seed, mechanism=args.mechanism, reserve=args.reserve,
+                                                       ledger=trades, store=args.store))
+    if args.metrics:
+        metrics.REGISTRY.write(args.metrics)
+    if args.ledger:
+        trades.save(args.ledger)
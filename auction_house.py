@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import random
+
+import numpy as np
+
+import clearing
+from bid import AGENTS_CONFIG, TASK_VALUE_RANGE, Agent, SeededDraws, agent_rows, print_standings
+
+# --- Configuration ---
+NUM_LOTS = 200
+CONCURRENT_LOTS = 50
+BID_DEADLINE = 0.1     # Seconds a lot stays open after the call for bids
+MEAN_LATENCY = 0.04    # Mean simulated network delay of a bidder's reply
+
+class AsyncBidder:
+    """
+    Wraps a bid.Agent as a coroutine that listens on an inbox queue.
+    Every call for bids is answered by its own task, so one bidder can take
+    part in many lots at the same time. Replies finish in whatever order the
+    latencies allow, so the estimation draws for a lot come from a stream seeded
+    by (seed, lot) rather than from one stream consumed in arrival order.
+    """
+    def __init__(self, agent, mean_latency=MEAN_LATENCY, rng=None, seed=None):
+        if mean_latency < 0:
+            raise ValueError(f"Mean latency must be >= 0, got {mean_latency}")
+        self.agent = agent
+        self.mean_latency = mean_latency
+        self.rng = rng or random.Random()
+        self.seed = seed if seed is not None else self.rng.getrandbits(64)
+        self.inbox = asyncio.Queue()
+        self.pending = set()
+
+    async def run(self):
+        while True:
+            call = await self.inbox.get()
+            if call is None: # House is closing
+                break
+            task = asyncio.create_task(self.respond(call))
+            self.pending.add(task)
+            task.add_done_callback(self.pending.discard)
+        for task in list(self.pending):
+            task.cancel()
+
+    async def respond(self, call):
+        # Simulate the network round trip before the bid reaches the house (none at zero latency)
+        if self.mean_latency:
+            await asyncio.sleep(self.rng.expovariate(1 / self.mean_latency))
+        draws = SeededDraws([self.seed, call['lot']])
+        bid_amount, estimated = self.agent.evaluate_and_bid(call['true_value'], draws)
+        call['replies'].put_nowait((bid_amount, self.agent))
+
+class AsyncAuctionHouse:
+    """
+    Opens lots, broadcasts calls for bids, gathers replies concurrently until each
+    lot's deadline and drops anything that arrives late. Many lots can be open at once.
+    """
+    def __init__(self, bidders, deadline=BID_DEADLINE, rng=None, mechanism="first", reserve=None):
+        self.bidders = bidders
+        self.deadline = deadline
+        self.mechanism = mechanism
+        self.reserve = reserve
+        self.rng = rng or random.Random()
+        self.arrival_latencies = []
+        self.late_bids = 0
+        self.results = []
+
+    async def run_lot(self, lot_id):
+        loop = asyncio.get_running_loop()
+        true_value = self.rng.randint(*TASK_VALUE_RANGE)
+        replies = asyncio.Queue()
+        opened = loop.time()
+        closes = opened + self.deadline
+
+        # 1. Open the lot
+        for bidder in self.bidders:
+            bidder.inbox.put_nowait({'lot': lot_id, 'true_value': true_value, 'replies': replies})
+
+        # 2. Gather bids until everyone answered or the deadline passed
+        bids = []
+        while len(bids) < len(self.bidders):
+            remaining = closes - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                bid_amount, agent = await asyncio.wait_for(replies.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            self.arrival_latencies.append(loop.time() - opened)
+            bids.append((bid_amount, agent))
+        # Replies still in flight land on a queue nobody reads anymore
+        self.late_bids += len(self.bidders) - len(bids)
+
+        # 3. Determine Winner. Bids are put back in agent order so ties go to the
+        #    earliest agent, as in bid.run_auction, whatever order they arrived in.
+        bids.sort(key=lambda x: x[1].id)
+        outcome = clearing.clear(bids, self.mechanism, self.reserve)
+        if outcome is None:
+            self.results.append({'lot': lot_id, 'true_value': true_value, 'bids': len(bids), 'winner_id': None})
+            return
+
+        winner = outcome['winner']
+        profit = true_value - outcome['price']
+        winner.balance += profit
+        winner.wins += 1
+        self.results.append({'lot': lot_id, 'true_value': true_value, 'bids': len(bids), 'winner_id': winner.id,
+                             'winning_bid': outcome['winning_bid'], 'price': outcome['price'], 'profit': profit})
+
+    async def run(self, num_lots, concurrency=CONCURRENT_LOTS):
+        listeners = [asyncio.create_task(b.run()) for b in self.bidders]
+        slots = asyncio.Semaphore(concurrency)
+
+        async def bounded_lot(lot_id):
+            async with slots:
+                await self.run_lot(lot_id)
+
+        await asyncio.gather(*(bounded_lot(i) for i in range(num_lots)))
+
+        for bidder in self.bidders:
+            bidder.inbox.put_nowait(None)
+        await asyncio.gather(*listeners)
+        return self.results
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)):
+        if not self.arrival_latencies:
+            return {}
+        values = np.percentile(self.arrival_latencies, percentiles)
+        return {f"p{p}": float(v) for p, v in zip(percentiles, values)}
+
+def run_auction_house(num_lots=NUM_LOTS, concurrency=CONCURRENT_LOTS, deadline=BID_DEADLINE,
+                      mean_latency=MEAN_LATENCY, seed=None, mechanism="first", reserve=None):
+    rng = random.Random(seed)
+    agents = [Agent(i, c["name"], c["strategy"], c["risk_factor"], c["color"])
+              for i, c in enumerate(AGENTS_CONFIG)]
+    bidders = [AsyncBidder(a, mean_latency, random.Random(rng.random()), rng.getrandbits(64)) for a in agents]
+    house = AsyncAuctionHouse(bidders, deadline, random.Random(rng.random()), mechanism, reserve)
+    asyncio.run(house.run(num_lots, concurrency))
+    return house, agents
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asyncio auction house with concurrent bidders")
+    parser.add_argument("--lots", type=int, default=NUM_LOTS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENT_LOTS)
+    parser.add_argument("--deadline", type=float, default=BID_DEADLINE)
+    parser.add_argument("--latency", type=float, default=MEAN_LATENCY, help="mean reply delay in seconds, 0 for none")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--mechanism", choices=sorted(clearing.MECHANISMS), default="first")
+    parser.add_argument("--reserve", type=int, default=None)
+    args = parser.parse_args()
+
+    house, agents = run_auction_house(args.lots, args.concurrency, args.deadline, args.latency, args.seed,
+                                      args.mechanism, args.reserve)
+
+    received = len(house.arrival_latencies)
+    print(f"Lots: {len(house.results)} | Bids on time: {received} | Late bids dropped: {house.late_bids}")
+    for name, value in house.latency_percentiles().items():
+        print(f"   Bid arrival {name}: {value * 1000:.1f} ms")
+    print()
+    print_standings(agent_rows(agents))
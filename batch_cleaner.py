@@ -0,0 +1,178 @@
+import argparse
+import time
+
+import numpy as np
+
+from cleaner import DIRT_DENSITY, GRID_SIZE, column_strips, run_batch, start_positions
+
+# Move order of CleaningAgent.get_valid_moves: up, down, left, right
+MOVE_ROWS = np.array([-1, 1, 0, 0])
+MOVE_COLS = np.array([0, 0, -1, 1])
+# Nearest-dirt distance fields are computed for at most this many cells per pass
+MAX_FIELD_CELLS = 1 << 22
+
+class BatchCleaningSimulation:
+    """
+    Many independent cleaning rooms advanced together with array operations.
+
+    Dirt is a (B, H, W) boolean array and agent positions a (B, K, 2) array. Each
+    step applies the CleaningAgent.step policy to every agent in every room at
+    once: clean if standing on dirt, else step onto a random dirty neighbour,
+    else head for the nearest dirt in the zone (row-major tie-break), else take
+    a random valid move. Random choices use one uniform priority per candidate
+    move, which picks uniformly among the tied candidates just like the
+    shuffled scan of the scalar agent, so results match it in distribution.
+
+    Only the "split" negotiation with the "greedy" policy is modelled: the
+    num_agents agents get the equal column strips and start positions of
+    CleaningSimulation (LEFT/RIGHT for two agents). Balanced zones depend on
+    each room's dirt and are rebalanced as it is cleaned, so they stay scalar.
+    """
+    def __init__(self, num_rooms, grid_size=GRID_SIZE, dirt_density=DIRT_DENSITY, seed=None, num_agents=2):
+        if not 1 <= num_agents <= grid_size:
+            raise ValueError(f"num_agents must be between 1 and grid_size ({grid_size}), got {num_agents}")
+        self.rng = np.random.default_rng(seed)
+        self.grid_size = grid_size
+        self.dirt = self.rng.random((num_rooms, grid_size, grid_size)) < dirt_density
+
+        # Same split layout as CleaningSimulation: (first col, end col) per agent
+        self.zones = np.array([zone[2:] for zone in column_strips(grid_size, num_agents, grid_size)])
+        starts = np.array(start_positions(num_agents, grid_size))
+        self.pos = np.broadcast_to(starts, (num_rooms, num_agents, 2)).copy()
+
+        cols = np.arange(grid_size)
+        self.zone_masks = (cols >= self.zones[:, :1]) & (cols < self.zones[:, 1:]) # (K, W)
+
+        self.remaining = self.dirt.sum(axis=(1, 2))
+        self.moves_made = np.zeros((num_rooms, num_agents), dtype=np.int64)
+        self.cleaned_count = np.zeros((num_rooms, num_agents), dtype=np.int64)
+        self.steps_to_clean = np.where(self.remaining == 0, 0, -1)
+        self.steps = 0
+
+        # Greedy moves towards the nearest dirt keep it the nearest (every other
+        # cell gets at most one step closer), so the target only has to be
+        # searched again after the agent cleans or detours to a dirty neighbour.
+        self.targets = np.full((num_rooms, num_agents, 2), -1)
+        self.target_known = np.zeros((num_rooms, num_agents), dtype=bool)
+
+    def nearest_dirt(self, rooms, agents):
+        """Row-major-first nearest dirt in each (room, agent) zone; (-1, -1) if none."""
+        size = self.grid_size
+        targets = np.full((len(rooms), 2), -1)
+        rows = np.arange(size)[:, None]
+        cols = np.arange(size)[None, :]
+        chunk = max(1, MAX_FIELD_CELLS // (size * size))
+
+        for start in range(0, len(rooms), chunk):
+            b = rooms[start:start + chunk]
+            k = agents[start:start + chunk]
+            r = self.pos[b, k, 0][:, None, None]
+            c = self.pos[b, k, 1][:, None, None]
+            candidates = self.dirt[b] & self.zone_masks[k][:, None, :]
+            dist = np.abs(rows - r) + np.abs(cols - c)
+            dist = np.where(candidates, dist, 2 * size).reshape(len(b), -1)
+            # argmin returns the first minimum, i.e. the row-major scan order
+            flat = dist.argmin(axis=1)
+            found = dist[np.arange(len(b)), flat] < 2 * size
+            targets[start:start + chunk][found] = np.stack(np.divmod(flat[found], size), axis=1)
+        return targets
+
+    def step(self):
+        active = self.remaining > 0
+        num_rooms, num_agents = self.pos.shape[:2]
+        room_idx = np.broadcast_to(np.arange(num_rooms)[:, None], (num_rooms, num_agents))
+        r, c = self.pos[..., 0], self.pos[..., 1]
+
+        # 1. Clean current spot if dirty (zones are disjoint, so agents never race)
+        cleaning = active[:, None] & self.dirt[room_idx, r, c]
+        self.dirt[room_idx[cleaning], r[cleaning], c[cleaning]] = False
+        self.cleaned_count += cleaning
+        self.remaining -= cleaning.sum(axis=1)
+        moving = active[:, None] & ~cleaning
+
+        # Candidate moves, masked by grid bounds and negotiated zone
+        nr = r[..., None] + MOVE_ROWS
+        nc = c[..., None] + MOVE_COLS
+        zone = self.zones[None, :, None, :]
+        valid = (nr >= 0) & (nr < self.grid_size) & (nc >= zone[..., 0]) & (nc < zone[..., 1])
+        valid &= moving[..., None]
+        nr_safe = np.clip(nr, 0, self.grid_size - 1)
+        nc_safe = np.clip(nc, 0, self.grid_size - 1)
+        priority = self.rng.random(valid.shape)
+
+        # 2. Step onto a dirty neighbour if there is one
+        dirty_neighbour = valid & self.dirt[room_idx[..., None], nr_safe, nc_safe]
+        choice = np.where(dirty_neighbour, priority, -1.0).argmax(axis=-1)
+        has_choice = dirty_neighbour.any(axis=-1)
+
+        # 3. Otherwise move greedily towards the nearest dirt in the zone,
+        # 4. or random walk once the zone is clean
+        seeking = moving & ~has_choice & valid.any(axis=-1)
+        b, k = np.nonzero(seeking)
+        if len(b):
+            stale = ~self.target_known[b, k]
+            self.targets[b[stale], k[stale]] = self.nearest_dirt(b[stale], k[stale])
+            self.target_known[b[stale], k[stale]] = True
+            targets = self.targets[b, k]
+            has_target = targets[:, 0] >= 0
+            dist = np.abs(nr[b, k] - targets[:, :1]) + np.abs(nc[b, k] - targets[:, 1:])
+            dist = np.where(valid[b, k], dist, np.iinfo(dist.dtype).max)
+            best = valid[b, k] & (dist == dist.min(axis=1, keepdims=True))
+            candidates = np.where(has_target[:, None], best, valid[b, k])
+            choice[b, k] = np.where(candidates, priority[b, k], -1.0).argmax(axis=1)
+            has_choice[b, k] = True
+
+        # Execute move
+        movers = has_choice & moving
+        rows = np.take_along_axis(nr, choice[..., None], axis=-1)[..., 0]
+        cols = np.take_along_axis(nc, choice[..., None], axis=-1)[..., 0]
+        self.pos[..., 0] = np.where(movers, rows, r)
+        self.pos[..., 1] = np.where(movers, cols, c)
+        self.moves_made += movers
+        self.target_known &= ~(cleaning | (moving & ~seeking))
+
+        self.steps += 1
+        self.steps_to_clean[(self.steps_to_clean < 0) & (self.remaining == 0)] = self.steps
+
+    def run(self, max_steps):
+        while self.steps < max_steps and (self.remaining > 0).any():
+            self.step()
+        return {
+            'steps_to_clean': self.steps_to_clean, # -1 where the room is still dirty
+            'moves_made': self.moves_made,
+            'cleaned_count': self.cleaned_count,
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized multi-room cleaning simulation")
+    parser.add_argument("--rooms", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--size", type=int, default=GRID_SIZE)
+    parser.add_argument("--density", type=float, default=DIRT_DENSITY)
+    parser.add_argument("--agents", type=int, default=2,
+                        help="agents per room, on equal column strips (split negotiation, greedy policy)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", type=int, default=500, help="scalar rooms to compare against")
+    args = parser.parse_args()
+    if not 1 <= args.agents <= args.size:
+        parser.error(f"--agents must be between 1 and --size ({args.size})")
+
+    start = time.perf_counter()
+    batch = BatchCleaningSimulation(args.rooms, args.size, args.density, args.seed,
+                                    args.agents).run(args.steps)
+    batch_time = time.perf_counter() - start
+    done = batch['steps_to_clean'][batch['steps_to_clean'] >= 0]
+    mean_steps = f"{done.mean():.1f}" if len(done) else "-"
+    print(f"Batch:  {args.rooms} rooms in {batch_time:.2f}s ({args.rooms / batch_time:.0f} rooms/s) | "
+          f"clean: {len(done)} | steps mean {mean_steps} | moves/room {batch['moves_made'].sum(1).mean():.1f}")
+
+    if args.compare:
+        start = time.perf_counter()
+        scalar = run_batch(args.compare, args.steps, seed=args.seed, grid_size=args.size, dirt_density=args.density,
+                           num_agents=args.agents)
+        scalar_time = time.perf_counter() - start
+        steps = [r['steps_to_clean'] for r in scalar if r['clean']]
+        mean_steps = f"{np.mean(steps):.1f}" if steps else "-"
+        moves = np.mean([sum(a['moves_made'] for a in r['agents']) for r in scalar])
+        print(f"Scalar: {args.compare} rooms in {scalar_time:.2f}s ({args.compare / scalar_time:.0f} rooms/s) | "
+              f"clean: {len(steps)} | steps mean {mean_steps} | moves/room {moves:.1f}")
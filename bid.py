@@ -1,6 +1,14 @@
+import argparse
+import itertools
+import json
 import random
 import time
 import sys
+import numpy as np
+
+import clearing
+import metrics
+from ledger import Ledger
 
 # --- Configuration ---
 NUM_ROUNDS = 5
@@ -12,6 +20,42 @@ AGENTS_CONFIG = [
 ]
 RESET_COLOR = "\033[0m"
 
+# Task values are drawn uniformly from this inclusive range
+TASK_VALUE_RANGE = (100, 500)
+
+# Multi-lot rounds (see run_multi_lot_auction)
+NUM_LOTS = 3
+BUNDLE_SYNERGY = 0.1 # Extra value per additional task in a package: tasks done together share set-up work
+MAX_PACKAGE = 2 # Most tasks one combinatorial package may hold
+
+class SeededDraws:
+    """
+    Reproducible random source shared by the scalar and batch auction engines.
+    Task values, estimation errors and Random-strategy margins each get their own
+    stream, so drawing them one round at a time or as whole (rounds x agents)
+    matrices consumes every stream in the same order and yields identical numbers.
+    """
+    def __init__(self, seed=None):
+        value_seq, error_seq, margin_seq = np.random.SeedSequence(seed).spawn(3)
+        self.values = np.random.default_rng(value_seq)
+        self.errors = np.random.default_rng(error_seq)
+        self.margins = np.random.default_rng(margin_seq)
+
+    def task_value(self, size=None):
+        low, high = TASK_VALUE_RANGE
+        # Floor of a scaled double rather than Generator.integers, whose scalar and
+        # vector forms consume the bit stream differently.
+        values = low + np.floor(self.values.random(size) * (high - low + 1)).astype(np.int64)
+        return int(values) if size is None else values
+
+    def estimation_error(self, size=None):
+        error = self.errors.uniform(0.9, 1.1, size)
+        return float(error) if size is None else error
+
+    def random_margin(self, size=None):
+        margin = self.margins.uniform(0.1, 0.5, size)
+        return float(margin) if size is None else margin
+
 class Agent:
     def __init__(self, id, name, strategy, risk_factor, color):
         self.id = id
@@ -22,19 +66,25 @@ class Agent:
         self.balance = 0
         self.wins = 0
 
-    def evaluate_and_bid(self, true_task_value):
+    def fixed_margin(self):
+        # Higher risk factor = smaller margin (bidding higher to win)
+        # Lower risk factor = larger margin (bidding lower to stay safe)
+        return 0.4 - (self.risk_factor * 0.3)
+
+    def evaluate_and_bid(self, true_task_value, draws=None):
         # 1. Estimate Value: Agents don't know the true value perfectly.
         # Error margin is between -10% and +10%
-        estimation_error = random.uniform(0.9, 1.1)
+        if draws is None:
+            estimation_error = random.uniform(0.9, 1.1)
+        else:
+            estimation_error = draws.estimation_error()
         estimated_value = true_task_value * estimation_error
 
         # 2. Determine Profit Margin based on strategy
         if self.strategy == "Random":
-            margin = random.uniform(0.1, 0.5)
+            margin = random.uniform(0.1, 0.5) if draws is None else draws.random_margin()
         else:
-            # Higher risk factor = smaller margin (bidding higher to win)
-            # Lower risk factor = larger margin (bidding lower to stay safe)
-            margin = 0.4 - (self.risk_factor * 0.3)
+            margin = self.fixed_margin()
 
         # 3. Calculate Bid
         my_bid = int(estimated_value * (1 - margin))
@@ -42,68 +92,376 @@ class Agent:
         # Log the internal thought process (simulation)
         return max(1, my_bid), estimated_value
 
-def run_auction():
-    print(f"{'-'*60}")
-    print(f"STARTING MULTI-AGENT AUCTION SYSTEM")
-    print(f"{'-'*60}\n")
-    
+# --- Clocks ---
+
+class WallClock:
+    """Real time. sleep() blocks, which paces the interactive demo."""
+    def __init__(self):
+        self.started = time.monotonic()
+
+    def now(self):
+        return time.monotonic() - self.started
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+class SimulatedClock:
+    """Virtual time. sleep() advances the clock instantly instead of blocking."""
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def now(self):
+        return self.elapsed
+
+    def sleep(self, seconds):
+        self.elapsed += seconds
+
+# --- Output Sinks ---
+# A sink receives every auction event as handle(event, data). Events are
+# "start", "round_start", "bid", "round_end" and "finish"; data is a plain dict.
+
+class SilentSink:
+    """Discards every event."""
+    def handle(self, event, data):
+        pass
+
+class SummarySink:
+    """Prints only the final standings table."""
+    def handle(self, event, data):
+        if event == "finish":
+            print_standings(data["agents"])
+
+class ConsoleSink:
+    """The original coloured, round-by-round console output."""
+    def __init__(self):
+        self.colors = {}
+
+    def handle(self, event, data):
+        if event == "start":
+            self.colors = {a["id"]: a["color"] for a in data["agents"]}
+            print(f"{'-'*60}")
+            print(f"STARTING MULTI-AGENT AUCTION SYSTEM")
+            print(f"{'-'*60}\n")
+
+        elif event == "round_start":
+            print(f"--- ROUND {data['round']} ---")
+            print(f"New Task Available! True Value (Unknown to agents): ${data['true_value']}")
+            print("Agents are processing messages...\n")
+
+        elif event == "bid":
+            if data["index"] == 0:
+                print(f"{'Agent':<15} | {'Strategy':<12} | {'Bid':<10} | {'Msg'}")
+                print("-" * 60)
+            color = self.colors[data["agent_id"]]
+            print(f"{color}{data['name']:<15}{RESET_COLOR} | {data['strategy']:<12} | ${data['bid']:<9} | (Est: ${int(data['estimated'])})")
+
+        elif event == "round_end":
+            print("-" * 60)
+            if data["winner_id"] is None:
+                print(f"\nNo bid met the reserve price. Task withdrawn.")
+                print("\n" + "="*60 + "\n")
+                return
+            color = self.colors[data["winner_id"]]
+            profit = data["profit"]
+            print(f"\n🏆 WINNER: {color}{data['winner']}{RESET_COLOR}")
+            print(f"   Bid Amount: ${data['winning_bid']}")
+            if data["price"] != data["winning_bid"]:
+                print(f"   Price Paid: ${data['price']}")
+            print(f"   True Value: ${data['true_value']}")
+
+            if profit >= 0:
+                print(f"   Outcome:    \033[92m+${profit} Profit\033[0m")
+            else:
+                print(f"   Outcome:    \033[91m-${abs(profit)} LOSS (Overpaid!)\033[0m")
+
+            print("\n" + "="*60 + "\n")
+
+        elif event == "finish":
+            print_standings(data["agents"])
+
+class JsonlSink:
+    """Writes one JSON object per event, tagged with the event name."""
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+
+    def handle(self, event, data):
+        self.stream.write(json.dumps({"event": event, **data}) + "\n")
+
+def print_standings(agent_rows):
+    print("FINAL STANDINGS")
+    print(f"{'Agent':<15} | {'Wins':<5} | {'Total Balance'}")
+    print("-" * 40)
+    for row in sorted(agent_rows, key=lambda x: x["balance"], reverse=True):
+        print(f"{row['color']}{row['name']:<15}{RESET_COLOR} | {row['wins']:<5} | ${row['balance']}")
+
+def agent_rows(agents):
+    return [{"id": a.id, "name": a.name, "strategy": a.strategy, "color": a.color,
+             "balance": a.balance, "wins": a.wins} for a in agents]
+
+# --- Scalar Engine ---
+
+def run_auction(num_rounds=NUM_ROUNDS, seed=None, sink=None, clock=None, headless=False,
+                mechanism="first", reserve=None, ledger=None):
+    """
+    Runs the auction round by round and returns the structured results.
+    Each lot is cleared by clearing.clear with the given mechanism and reserve price.
+
+    Output goes to sink (ConsoleSink by default) and the simulated network delays go
+    through clock (WallClock by default). headless=True swaps the defaults for
+    SilentSink and SimulatedClock so the same logic runs at full CPU speed.
+    Passing a seed switches every random draw to SeededDraws, which makes the run
+    reproducible by run_batch_auction. Every lot is also appended to ledger
+    (a ledger.Ledger over AGENTS_CONFIG) when one is given.
+    """
+    if sink is None:
+        sink = SilentSink() if headless else ConsoleSink()
+    if clock is None:
+        clock = SimulatedClock() if headless else WallClock()
+    draws = SeededDraws(seed) if seed is not None else None
+
     agents = [Agent(i, c["name"], c["strategy"], c["risk_factor"], c["color"]) 
               for i, c in enumerate(AGENTS_CONFIG)]
+    sink.handle("start", {"t": clock.now(), "agents": agent_rows(agents)})
 
-    for round_num in range(1, NUM_ROUNDS + 1):
-        print(f"--- ROUND {round_num} ---")
-        
+    rounds = []
+    for round_num in range(1, num_rounds + 1):
         # 1. Generate Task
-        true_value = random.randint(100, 500)
-        print(f"New Task Available! True Value (Unknown to agents): ${true_value}")
-        print("Agents are processing messages...\n")
-        time.sleep(1)
+        # The phase timers cover the simulation logic only. Sink output is timed as
+        # bid.render, and the simulated network delays are not timed at all.
+        with metrics.timer("bid.spawn"):
+            if draws is None:
+                true_value = random.randint(*TASK_VALUE_RANGE)
+            else:
+                true_value = draws.task_value()
+        with metrics.timer("bid.render"):
+            sink.handle("round_start", {"t": clock.now(), "round": round_num, "true_value": true_value})
+        clock.sleep(1)
 
         # 2. Collect Bids
         bids = []
-        print(f"{'Agent':<15} | {'Strategy':<12} | {'Bid':<10} | {'Msg'}")
-        print("-" * 60)
-
-        for agent in agents:
-            bid_amount, estimated = agent.evaluate_and_bid(true_value)
-            bids.append((bid_amount, agent))
-            
-            # Print bid arrival
-            print(f"{agent.color}{agent.name:<15}{RESET_COLOR} | {agent.strategy:<12} | ${bid_amount:<9} | (Est: ${int(estimated)})")
-            time.sleep(0.5) # Simulate network delay
+        estimates = []
+        with metrics.timer("bid.collect"):
+            for agent in agents:
+                bid_amount, estimated = agent.evaluate_and_bid(true_value, draws)
+                bids.append((bid_amount, agent))
+                estimates.append(estimated)
+        metrics.count("bid.bids", len(bids))
+        for index, ((bid_amount, agent), estimated) in enumerate(zip(bids, estimates)):
+            with metrics.timer("bid.render"):
+                sink.handle("bid", {"t": clock.now(), "round": round_num, "index": index,
+                                    "agent_id": agent.id, "name": agent.name, "strategy": agent.strategy,
+                                    "bid": bid_amount, "estimated": estimated})
+            clock.sleep(0.5) # Simulate network delay
 
         # 3. Determine Winner (Highest Bid)
-        bids.sort(key=lambda x: x[0], reverse=True)
-        winning_bid, winner = bids[0]
+        with metrics.timer("bid.clear"):
+            outcome = clearing.clear(bids, mechanism, reserve)
 
         # 4. Execute Transaction
-        print("-" * 60)
-        
-        # Winner pays the bid, receives the True Value
-        profit = true_value - winning_bid
-        winner.balance += profit
-        winner.wins += 1
+        # Winner pays the clearing price, receives the True Value
+        with metrics.timer("bid.settle"):
+            if outcome is None:
+                winner, winning_bid, price, profit = None, None, None, 0
+            else:
+                winner, winning_bid, price = outcome['winner'], outcome['winning_bid'], outcome['price']
+                profit = true_value - price
+                winner.balance += profit
+                winner.wins += 1
+
+            result = {
+                "t": clock.now(),
+                "round": round_num,
+                "true_value": true_value,
+                "bids": [b for b, _ in bids],
+                "winner_id": winner.id if winner else None,
+                "winner": winner.name if winner else None,
+                "winning_bid": winning_bid,
+                "price": price,
+                "profit": profit,
+            }
+            rounds.append(result)
+            if ledger is not None:
+                ledger.append(round_num, true_value, result["bids"], winner.id if winner else -1,
+                              winning_bid or 0, price or 0, profit)
 
         # 5. Output Result
-        print(f"\n🏆 WINNER: {winner.color}{winner.name}{RESET_COLOR}")
-        print(f"   Bid Amount: ${winning_bid}")
-        print(f"   True Value: ${true_value}")
-        
-        if profit >= 0:
-            print(f"   Outcome:    \033[92m+${profit} Profit\033[0m")
-        else:
-            print(f"   Outcome:    \033[91m-${abs(profit)} LOSS (Overpaid!)\033[0m")
-        
-        print("\n" + "="*60 + "\n")
-        time.sleep(2)
+        with metrics.timer("bid.render"):
+            sink.handle("round_end", result)
+        clock.sleep(2)
 
     # --- Final Stats ---
-    print("FINAL STANDINGS")
-    print(f"{'Agent':<15} | {'Wins':<5} | {'Total Balance'}")
-    print("-" * 40)
-    agents.sort(key=lambda x: x.balance, reverse=True)
+    sink.handle("finish", {"t": clock.now(), "agents": agent_rows(agents)})
+
+    return {"rounds": rounds, "agents": agents}
+
+# --- Batch Engine ---
+
+def run_batch_auction(num_rounds, seed=None, agents_config=AGENTS_CONFIG, mechanism="first", reserve=None):
+    """
+    Clears num_rounds auctions for every agent in agents_config in one vectorized pass.
+    Draws the (rounds x agents) estimation-error and margin matrices up front, computes
+    every bid, and clears every round with clearing.clear_batch (first highest bid wins,
+    as in run_auction). With the same seed the results match run_auction exactly.
+    Rounds where no bid met the reserve have winner -1 and zero profit.
+    """
+    draws = SeededDraws(seed)
+    agents = [Agent(i, c["name"], c["strategy"], c["risk_factor"], c["color"])
+              for i, c in enumerate(agents_config)]
+    num_agents = len(agents)
+
+    true_values = draws.task_value(num_rounds)
+    estimation_errors = draws.estimation_error((num_rounds, num_agents))
+    estimated_values = true_values[:, None] * estimation_errors
+
+    # Strategy margins are constant per agent; Random agents draw one per round,
+    # in agent order, exactly like the scalar loop does.
+    margins = np.empty((num_rounds, num_agents))
+    random_cols = [a.id for a in agents if a.strategy == "Random"]
+    for agent in agents:
+        if agent.strategy != "Random":
+            margins[:, agent.id] = agent.fixed_margin()
+    margins[:, random_cols] = draws.random_margin((num_rounds, len(random_cols)))
+
+    bids = np.maximum(1, (estimated_values * (1 - margins)).astype(np.int64))
+
+    winners, winning_bids, prices = clearing.clear_batch(bids, mechanism, reserve)
+    sold = winners >= 0
+    profits = np.where(sold, true_values - prices, 0)
+
+    balances = np.bincount(winners[sold], weights=profits[sold], minlength=num_agents).astype(np.int64)
+    wins = np.bincount(winners[sold], minlength=num_agents)
     for agent in agents:
-        print(f"{agent.color}{agent.name:<15}{RESET_COLOR} | {agent.wins:<5} | ${agent.balance}")
+        agent.balance = int(balances[agent.id])
+        agent.wins = int(wins[agent.id])
+
+    return {
+        'agents': agents,
+        'true_values': true_values,
+        'bids': bids,
+        'winners': winners,
+        'winning_bids': winning_bids,
+        'prices': prices,
+        'profits': profits,
+        'balances': balances,
+        'wins': wins,
+    }
+
+# --- Multi-Lot Engine ---
+
+def package_value(values, synergy=BUNDLE_SYNERGY):
+    """Value of a package of tasks: their sum plus `synergy` of it for every task past the first."""
+    return int(sum(values) * (1 + synergy * (len(values) - 1)))
+
+def run_multi_lot_auction(num_rounds=NUM_ROUNDS, seed=None, mechanism="multi-first", lots=NUM_LOTS, reserve=None,
+                          time_budget=clearing.TIME_BUDGET, max_package=MAX_PACKAGE):
+    """
+    Runs rounds that each sell `lots` tasks at once and returns the structured results.
+
+    multi-first / multi-uniform: the tasks are identical units of one true value.
+    Every agent bids once, as in run_auction, and the `lots` best bids win a unit
+    each through clearing.clear_multi_unit.
+
+    combinatorial: the tasks are distinct. Every agent bids on every package of
+    up to max_package of them, valued with package_value over its per-task bids, and
+    clearing.clear_combinatorial picks the non-overlapping packages with the
+    highest revenue. Winners pay their bid. Each round records whether the
+    solver proved its answer optimal within time_budget.
+
+    reserve is per task. Draws always come from SeededDraws, so a seed makes the run reproducible.
+    """
+    if mechanism not in clearing.MULTI_LOT_MECHANISMS:
+        raise ValueError(f"Unknown mechanism '{mechanism}'. Choose from: {', '.join(clearing.MULTI_LOT_MECHANISMS)}")
+    draws = SeededDraws(seed)
+    agents = [Agent(i, c["name"], c["strategy"], c["risk_factor"], c["color"])
+              for i, c in enumerate(AGENTS_CONFIG)]
+    packages = [items for size in range(1, min(lots, max_package) + 1)
+                for items in itertools.combinations(range(lots), size)]
+
+    rounds = []
+    for round_num in range(1, num_rounds + 1):
+        optimal = True
+        if mechanism == "combinatorial":
+            true_values = [draws.task_value() for _ in range(lots)]
+            bids = []
+            for agent in agents:
+                own = [agent.evaluate_and_bid(value, draws)[0] for value in true_values]
+                for items in packages:
+                    amount = package_value([own[i] for i in items])
+                    if reserve is None or amount >= reserve * len(items):
+                        bids.append((amount, agent, items))
+            with metrics.timer("bid.clear"):
+                accepted, _, optimal = clearing.clear_combinatorial(bids, time_budget)
+            sales = [(agent, list(items), amount, package_value([true_values[i] for i in items]))
+                     for amount, agent, items in accepted]
+        else:
+            true_value = draws.task_value()
+            true_values = [true_value] * lots
+            bids = [(agent.evaluate_and_bid(true_value, draws)[0], agent) for agent in agents]
+            with metrics.timer("bid.clear"):
+                outcomes = clearing.clear_multi_unit(bids, lots, mechanism.split("-")[1], reserve)
+            sales = [(o['winner'], [i], o['price'], true_value) for i, o in enumerate(outcomes)]
+
+        results = []
+        for agent, items, price, value in sales:
+            agent.balance += value - price
+            agent.wins += 1
+            results.append({"winner_id": agent.id, "items": items, "price": price, "profit": value - price})
+        rounds.append({"round": round_num, "true_values": true_values, "sales": results, "optimal": optimal})
+
+    return {"rounds": rounds, "agents": agents}
+
+# Per-call methods timed by --metrics
+METRIC_HOOKS = [(Agent, "evaluate_and_bid", "bid.evaluate_and_bid")]
+
+SINKS = {
+    "console": ConsoleSink,
+    "summary": SummarySink,
+    "silent": SilentSink,
+    "jsonl": JsonlSink,
+}
 
 if __name__ == "__main__":
-    run_auction()
+    parser = argparse.ArgumentParser(description="Multi-agent sealed-bid auction")
+    parser.add_argument("--rounds", type=int, default=NUM_ROUNDS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--headless", action="store_true",
+                        help="no sleeping; prints only the final standings unless --sink is given")
+    parser.add_argument("--sink", choices=sorted(SINKS), default=None)
+    parser.add_argument("--simulated-latency", action="store_true",
+                        help="advance a virtual clock instead of sleeping")
+    parser.add_argument("--mechanism", choices=sorted(clearing.MECHANISMS) + clearing.MULTI_LOT_MECHANISMS,
+                        default="first")
+    parser.add_argument("--reserve", type=int, default=None)
+    parser.add_argument("--lots", type=int, default=NUM_LOTS, help="tasks sold per round by the multi-lot mechanisms")
+    parser.add_argument("--time-budget", type=float, default=clearing.TIME_BUDGET,
+                        help="seconds the combinatorial solver may search per round")
+    parser.add_argument("--metrics", metavar="PATH", help="write timings on exit (.prom for Prometheus, else JSON)")
+    parser.add_argument("--ledger", metavar="PATH", help="save every lot to a ledger directory (see ledger.py)")
+    args = parser.parse_args()
+    multi_lot = args.mechanism in clearing.MULTI_LOT_MECHANISMS
+    if multi_lot and (args.sink or args.ledger):
+        parser.error("--sink and --ledger record single-lot rounds only")
+
+    if args.metrics:
+        metrics.enable(METRIC_HOOKS)
+
+    if multi_lot:
+        result = run_multi_lot_auction(args.rounds, args.seed, args.mechanism, args.lots, args.reserve,
+                                       args.time_budget)
+        sold = sum(len(r["sales"]) for r in result["rounds"])
+        optimal = sum(r["optimal"] for r in result["rounds"])
+        print(f"Rounds: {args.rounds} | Sales: {sold} | Proved optimal: {optimal}/{args.rounds}\n")
+        print_standings(agent_rows(result["agents"]))
+        if args.metrics:
+            metrics.REGISTRY.write(args.metrics)
+        sys.exit()
+
+    sink_name = args.sink or ("summary" if args.headless else "console")
+    clock = SimulatedClock() if (args.headless or args.simulated_latency) else WallClock()
+    trades = Ledger([c["name"] for c in AGENTS_CONFIG]) if args.ledger else None
+    run_auction(args.rounds, seed=args.seed, sink=SINKS[sink_name](), clock=clock,
+                mechanism=args.mechanism, reserve=args.reserve, ledger=trades)
+    if args.ledger:
+        trades.save(args.ledger)
+    if args.metrics:
+        metrics.REGISTRY.write(args.metrics)
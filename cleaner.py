@@ -1,7 +1,13 @@
+import argparse
+import time
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 import random
+from bisect import bisect_left, insort
+
+import metrics
+from grid_topology import byte_grid, open_grid
+from replay import KEYFRAME_INTERVAL, ReplayRecorder
 
 # --- Constants ---
 GRID_SIZE = 20
@@ -10,19 +16,245 @@ EMPTY = 0
 DIRT = 1
 AGENT_A_COLOR = 'red'
 AGENT_B_COLOR = 'blue'
+AGENT_COLORS = [AGENT_A_COLOR, AGENT_B_COLOR, 'green', 'orange', 'purple', 'cyan', 'magenta', 'olive']
 DIRT_COLOR = '#e6ccb3' # Light brown
 CLEAN_COLOR = 'white'
 
+class DirtIndex:
+    """
+    Dirty cells of one zone, kept as a sorted column list per dirty row plus a
+    sorted list of those rows. Cleaning a cell is an O(W) list delete at worst,
+    and a nearest-dirt query walks outwards through dirty rows only, stopping as
+    soon as the row distance alone exceeds the best match found.
+    """
+    def __init__(self, grid, zone):
+        min_row, max_row, min_col, max_col = zone
+        self.cols = {}
+        rows, cols = np.nonzero(grid[min_row:max_row, min_col:max_col] == DIRT)
+        # np.nonzero is row-major, so every row's columns arrive sorted
+        for r, c in zip((rows + min_row).tolist(), (cols + min_col).tolist()):
+            self.cols.setdefault(r, []).append(c)
+        self.rows = sorted(self.cols)
+
+    def __len__(self):
+        return sum(len(cols) for cols in self.cols.values())
+
+    def add(self, r, c):
+        cols = self.cols.get(r)
+        if cols is None:
+            self.cols[r] = [c]
+            insort(self.rows, r)
+        else:
+            i = bisect_left(cols, c)
+            if i == len(cols) or cols[i] != c:
+                cols.insert(i, c)
+
+    def remove(self, r, c):
+        cols = self.cols.get(r)
+        if not cols:
+            return
+        i = bisect_left(cols, c)
+        if i < len(cols) and cols[i] == c:
+            del cols[i]
+            if not cols:
+                del self.cols[r]
+                del self.rows[bisect_left(self.rows, r)]
+
+    def nearest(self, r, c):
+        """
+        Nearest dirty cell by Manhattan distance. Ties go to the smaller row, then
+        the smaller column, matching a row-major scan of the zone.
+        """
+        best = None # (dist, row, col)
+        i = bisect_left(self.rows, r)
+        up, down = i - 1, i
+
+        while up >= 0 or down < len(self.rows):
+            # Visit the next dirty row closest to r (the upper one on equal distance)
+            up_dist = r - self.rows[up] if up >= 0 else None
+            down_dist = self.rows[down] - r if down < len(self.rows) else None
+            if down_dist is None or (up_dist is not None and up_dist <= down_dist):
+                row, row_dist = self.rows[up], up_dist
+                up -= 1
+            else:
+                row, row_dist = self.rows[down], down_dist
+                down += 1
+
+            if best is not None and row_dist > best[0]:
+                break
+
+            cols = self.cols[row]
+            j = bisect_left(cols, c)
+            for col in cols[max(0, j - 1):j + 1]:
+                candidate = (row_dist + abs(col - c), row, col)
+                if best is None or candidate < best:
+                    best = candidate
+
+        return None if best is None else (best[1], best[2])
+
+# --- Route Planning ---
+# Planned policies visit the zone's dirt in a precomputed order instead of
+# chasing the nearest cell step by step. Rooms have no walls, so the Manhattan
+# distance between two cells is the exact number of moves between them, and a
+# route's length is the number of moves it needs.
+
+POLICIES = ["greedy", "tour", "sweep", "auto"]
+SWEEP_DENSITY = 0.8 # "auto" sweeps zones at least this dirty and tours the rest
+MAX_IMPROVE_PASSES = 3 # Later passes rarely gain more than a move or two
+
+def route_length(start, points):
+    path = np.vstack([start, points])
+    return int(np.abs(np.diff(path, axis=0)).sum())
+
+def nearest_neighbour_route(grid, zone, start):
+    """Dirt of a zone in nearest-next order from start, using a throwaway DirtIndex."""
+    index = DirtIndex(grid, zone)
+    route = []
+    r, c = start
+    while True:
+        nearest = index.nearest(r, c)
+        if nearest is None:
+            return np.array(route, dtype=np.int64).reshape(-1, 2)
+        route.append(nearest)
+        index.remove(*nearest)
+        r, c = nearest
+
+def two_opt_pass(path):
+    """
+    One first-improvement 2-opt pass over an open path whose first point is fixed.
+    For each edge (a, b) every later edge (c, d) is scored at once; reversing b..c
+    changes the length by |ac| + |bd| - |ab| - |cd|, and the last point has no d.
+    """
+    improved = False
+    for i in range(len(path) - 2):
+        a, b = path[i], path[i + 1]
+        c = path[i + 2:]
+        to_next = np.abs(c[:-1] - c[1:]).sum(axis=1)
+        b_to_next = np.abs(c[1:] - b).sum(axis=1)
+        delta = np.abs(c - a).sum(axis=1) - np.abs(b - a).sum()
+        delta[:-1] += b_to_next - to_next
+        k = int(delta.argmin())
+        if delta[k] < 0:
+            path[i + 1:i + k + 3] = path[i + 1:i + k + 3][::-1].copy()
+            improved = True
+    return improved
+
+def or_opt_pass(path):
+    """
+    One Or-opt pass: every point (but the fixed first) is tried at every other
+    slot of the path, including the end, and moved wherever that shortens it.
+    """
+    improved = False
+    i = 1
+    while i < len(path):
+        point = path[i]
+        prev = path[i - 1]
+        saved = np.abs(point - prev).sum()
+        if i + 1 < len(path):
+            nxt = path[i + 1]
+            saved += np.abs(nxt - point).sum() - np.abs(nxt - prev).sum()
+        rest = np.delete(path, i, axis=0)
+        added = np.empty(len(rest))
+        added[:-1] = (np.abs(rest[:-1] - point).sum(axis=1) + np.abs(rest[1:] - point).sum(axis=1)
+                      - np.abs(rest[1:] - rest[:-1]).sum(axis=1))
+        added[-1] = np.abs(rest[-1] - point).sum()
+        k = int(added.argmin())
+        if added[k] < saved:
+            path[:] = np.insert(rest, k + 1, point, axis=0)
+            improved = True
+        i += 1
+    return improved
+
+def tour_route(grid, zone, start):
+    """Nearest-neighbour route improved by 2-opt and Or-opt until neither helps."""
+    route = nearest_neighbour_route(grid, zone, start)
+    if len(route) < 3:
+        return route
+    path = np.vstack([start, route])
+    for _ in range(MAX_IMPROVE_PASSES):
+        if not (two_opt_pass(path) | or_opt_pass(path)):
+            break
+    return path[1:]
+
+def sweep_route(grid, zone, start):
+    """
+    Boustrophedon: the zone's dirt lane by lane, alternating direction. A lane is
+    one or two rows (or columns) wide; two-wide lanes zig-zag across their width
+    as they go, which suits dense zones. Of the variants (lane width, rows or
+    columns, from either end, first pass either way) the shortest from start wins.
+    """
+    min_row, max_row, min_col, max_col = zone
+    rows, cols = np.nonzero(grid[min_row:max_row, min_col:max_col] == DIRT)
+    cells = np.stack([rows + min_row, cols + min_col], axis=1)
+    if len(cells) < 2:
+        return cells
+    best = None
+    for width in (1, 2):
+        for major in (0, 1):
+            minor = 1 - major
+            for major_sign in (1, -1):
+                for minor_sign in (1, -1):
+                    across = cells[:, major] * major_sign
+                    lane = np.floor_divide(across - across.min(), width)
+                    # Every other lane runs the opposite way
+                    along = cells[:, minor] * minor_sign * np.where(lane % 2, -1, 1)
+                    # Inside a two-wide lane, alternate which side comes first
+                    side = across * np.where(along % 2, -1, 1)
+                    route = cells[np.lexsort((side, along, lane))]
+                    length = route_length(start, route)
+                    if best is None or length < best[0]:
+                        best = (length, route)
+    return best[1]
+
+def plan_route(grid, zone, start, policy):
+    """Route over the zone's dirt for a planned policy, as an (N, 2) array of cells."""
+    if policy == "auto":
+        min_row, max_row, min_col, max_col = zone
+        area = max(1, (max_row - min_row) * (max_col - min_col))
+        dense = np.count_nonzero(grid[min_row:max_row, min_col:max_col] == DIRT) >= SWEEP_DENSITY * area
+        policy = "sweep" if dense else "tour"
+    if policy == "sweep":
+        return sweep_route(grid, zone, start)
+    return tour_route(grid, zone, start)
+
 class CleaningAgent:
-    def __init__(self, agent_id, color, start_pos):
+    """
+    policy="greedy" steps onto dirty neighbours and otherwise heads for the nearest
+    dirt in the zone. The planned policies ("tour", "sweep", "auto") follow a route
+    over all of the zone's dirt from plan_route instead. The route is planned on
+    the first step that needs it and again only when the zone changes. Dirt
+    already cleaned on the way is skipped, so nothing is recomputed for it.
+    """
+    def __init__(self, agent_id, color, start_pos, grid_size=GRID_SIZE, rng=random, topology=None, policy="greedy"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}'. Choose from: {', '.join(POLICIES)}")
         self.agent_id = agent_id
         self.color = color
+        self.grid_size = grid_size
+        self.rng = rng
+        self.topology = topology or open_grid(grid_size, grid_size)
+        self.policy = policy
         self.pos = list(start_pos)  # [row, col]
         self.zone = None  # Will be defined during negotiation
+        self.dirt_index = None  # Built from the grid on the first nearest-dirt query
         self.moves_made = 0
         self.cleaned_count = 0
+        self.replans = 0
+        self.halves = None # Cached split of the zone for rebalance_zones (see zone_halves)
+
+    @property
+    def zone(self):
+        return self._zone
 
-    def negotiate_zone(self, total_cols, role):
+    @zone.setter
+    def zone(self, zone):
+        # Keep a flat cell mask of the zone for the move generation in step()
+        self._zone = zone
+        self.route = None # Planned policies replan for the new zone
+        if zone is not None:
+            self.zone_mask = self.topology.zone_mask(zone)
+
+    def negotiate_zone(self, total_cols, role, verbose=True):
         """
         Simple negotiation logic:
         Agents split the room vertically based on their ID to avoid overlap.
@@ -31,164 +263,554 @@ class CleaningAgent:
         
         if role == "LEFT":
             # Agent takes columns 0 to split_line-1
-            self.zone = (0, split_line) 
-            print(f"[Agent {self.agent_id}] Requesting LEFT Sector (Cols 0-{split_line}).")
+            self.zone = (0, self.grid_size, 0, split_line)
+            if verbose:
+                print(f"[Agent {self.agent_id}] Requesting LEFT Sector (Cols 0-{split_line}).")
         else:
             # Agent takes columns split_line to total_cols-1
-            self.zone = (split_line, total_cols)
-            print(f"[Agent {self.agent_id}] Requesting RIGHT Sector (Cols {split_line}-{total_cols}).")
+            self.zone = (0, self.grid_size, split_line, total_cols)
+            if verbose:
+                print(f"[Agent {self.agent_id}] Requesting RIGHT Sector (Cols {split_line}-{total_cols}).")
             
         return True # Agreement reached
 
+    def accept_zone(self, zone, grid):
+        """Takes over a (min_row, max_row, min_col, max_col) zone handed out by negotiate_zones."""
+        self.zone = zone
+        self.dirt_index = DirtIndex(grid, zone)
+
+    def in_zone(self, r, c):
+        return bool(self.zone_mask[self.topology.index(r, c)])
+
     def get_valid_moves(self):
-        """Returns all valid adjacent coordinates within the negotiated zone."""
-        r, c = self.pos
-        candidates = [
-            (r - 1, c), (r + 1, c), 
-            (r, c - 1), (r, c + 1)
-        ]
-        valid = []
-        min_col, max_col = self.zone
-        
-        for nr, nc in candidates:
-            # Check Grid Boundaries
-            if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                # Check Negotiated Zone Boundaries (Crucial for conflict avoidance)
-                if min_col <= nc < max_col:
-                    valid.append((nr, nc))
-        return valid
+        """
+        Returns all valid adjacent coordinates within the negotiated zone. An agent
+        that was just handed a zone elsewhere may cross other zones to reach it.
+        """
+        coords = self.topology.coords
+        return [coords[n] for n in self.topology.moves_within(self.topology.index(*self.pos), self.zone_mask)]
 
     def find_nearest_dirt(self, grid):
-        """Global Sensor: Finds nearest dirt in the assigned zone."""
-        r, c = self.pos
-        min_dist = float('inf')
-        target = None
-        min_col, max_col = self.zone
-
-        # Scan only the assigned zone
-        for row in range(GRID_SIZE):
-            for col in range(min_col, max_col):
-                if grid[row, col] == DIRT:
-                    # Manhattan distance
-                    dist = abs(row - r) + abs(col - c)
-                    if dist < min_dist:
-                        min_dist = dist
-                        target = (row, col)
-        return target
-
-    def step(self, grid):
+        """
+        Global Sensor: Finds nearest dirt in the assigned zone.
+        Answered from the zone's DirtIndex, which step() keeps current as it cleans.
+        """
+        if self.dirt_index is None:
+            self.dirt_index = DirtIndex(grid, self.zone)
+        return self.dirt_index.nearest(*self.pos)
+
+    def next_stop(self, grid, cells):
+        """Next dirty cell on the planned route, planning it first if needed; None once the zone is clean."""
+        if self.route is None:
+            planned = plan_route(grid, self.zone, self.pos, self.policy)
+            self.route = [self.topology.index(r, c) for r, c in planned.tolist()]
+            self.route_stop = 0
+            self.replans += 1
+        while self.route_stop < len(self.route) and cells[self.route[self.route_stop]] != DIRT:
+            self.route_stop += 1
+        if self.route_stop == len(self.route):
+            return None
+        return self.topology.coords[self.route[self.route_stop]]
+
+    def closest_move(self, valid_moves, target):
+        """First of valid_moves that minimizes the Manhattan distance to target."""
+        coords = self.topology.coords
+        tr, tc = target
+        best_dist = float('inf')
+        best = None
+        for move in valid_moves:
+            mr, mc = coords[move]
+            dist = abs(mr - tr) + abs(mc - tc)
+            if dist < best_dist:
+                best_dist = dist
+                best = move
+        return best
+
+    def step(self, grid, cells=None):
         """
         AI Logic: 
         1. Clean if on dirt.
         2. Look for adjacent dirt.
         3. If no adjacent dirt, look for NEAREST dirt in zone (Global sensing).
+
+        cells is a flat bytearray sharing memory with grid (see grid_topology.byte_grid);
+        CleaningSimulation passes one so the inner loop avoids NumPy scalar indexing.
         """
-        # 1. Clean current spot if dirty
-        if grid[self.pos[0], self.pos[1]] == DIRT:
-            grid[self.pos[0], self.pos[1]] = EMPTY
+        if cells is None:
+            cells = grid.reshape(-1)
+        here = self.topology.index(*self.pos)
+        zone_mask = self.zone_mask
+
+        # 1. Clean current spot if dirty (only inside the zone, so zone indexes stay exact)
+        if cells[here] == DIRT and zone_mask[here]:
+            cells[here] = EMPTY
             self.cleaned_count += 1
+            if self.dirt_index is not None:
+                self.dirt_index.remove(self.pos[0], self.pos[1])
             return # Spend turn cleaning
 
-        valid_moves = self.get_valid_moves()
+        valid_moves = self.topology.moves_within(here, zone_mask)
         if not valid_moves: 
             return # Stuck
 
         target_move = None
-        
-        # 2. Check immediate neighbors for dirt
-        random.shuffle(valid_moves)
-        for mr, mc in valid_moves:
-            if grid[mr, mc] == DIRT:
-                target_move = (mr, mc)
-                break
-        
-        # 3. If no neighbor has dirt, find nearest dirt in entire zone and move towards it
-        if not target_move:
-            global_target = self.find_nearest_dirt(grid)
-            if global_target:
-                # Find move that minimizes distance to global target
-                tr, tc = global_target
-                best_dist = float('inf')
-                for mr, mc in valid_moves:
-                    dist = abs(mr - tr) + abs(mc - tc)
-                    if dist < best_dist:
-                        best_dist = dist
-                        target_move = (mr, mc)
+        self.rng.shuffle(valid_moves)
+
+        if self.policy != "greedy":
+            # Planned policies: head for the next stop on the route
+            stop = self.next_stop(grid, cells)
+            if stop is not None:
+                target_move = self.closest_move(valid_moves, stop)
             else:
-                # Zone is clean, random walk
-                target_move = random.choice(valid_moves)
+                target_move = self.rng.choice(valid_moves)
+        else:
+            # 2. Check immediate neighbors for dirt
+            for move in valid_moves:
+                if cells[move] == DIRT and zone_mask[move]:
+                    target_move = move
+                    break
+
+            # 3. If no neighbor has dirt, find nearest dirt in entire zone and move towards it
+            if target_move is None:
+                global_target = self.find_nearest_dirt(grid)
+                if global_target:
+                    target_move = self.closest_move(valid_moves, global_target)
+                else:
+                    # Zone is clean, random walk
+                    target_move = self.rng.choice(valid_moves)
 
         # Execute move
-        self.pos = list(target_move)
+        self.pos = list(self.topology.coords[target_move])
         self.moves_made += 1
 
-# --- Simulation Setup ---
-
-# Initialize Grid
-grid = np.random.choice([EMPTY, DIRT], size=(GRID_SIZE, GRID_SIZE), p=[1-DIRT_DENSITY, DIRT_DENSITY])
-
-# Initialize Agents
-agent1 = CleaningAgent(1, AGENT_A_COLOR, [0, 0])
-agent2 = CleaningAgent(2, AGENT_B_COLOR, [0, GRID_SIZE-1])
-
-print("--- STARTING NEGOTIATION PHASE ---")
-# Agents agree on zones to avoid collision/overlap
-agent1.negotiate_zone(GRID_SIZE, "LEFT")
-agent2.negotiate_zone(GRID_SIZE, "RIGHT")
-print("--- NEGOTIATION COMPLETE: ZONES LOCKED ---")
-
-# --- Visualization Setup ---
-
-fig, ax = plt.subplots(figsize=(8, 8))
-ax.set_title("Multi-Agent Cleaning Simulation (Negotiated Zones)")
-
-# Create a custom colormap for the grid (Clean vs Dirt)
-cmap = plt.matplotlib.colors.ListedColormap([CLEAN_COLOR, DIRT_COLOR])
-
-# Initial Plot
-img = ax.imshow(grid, cmap=cmap, vmin=0, vmax=1)
-
-# Agent Scatter Plots (Dots)
-scat1 = ax.scatter(agent1.pos[1], agent1.pos[0], c=agent1.color, s=200, label='Agent A (Left Zone)', edgecolors='black')
-scat2 = ax.scatter(agent2.pos[1], agent2.pos[0], c=agent2.color, s=200, label='Agent B (Right Zone)', edgecolors='black')
-ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.05), fancybox=True, shadow=True, ncol=2)
-
-# Grid lines for visual clarity
-ax.set_xticks(np.arange(-.5, GRID_SIZE, 1), minor=True)
-ax.set_yticks(np.arange(-.5, GRID_SIZE, 1), minor=True)
-ax.grid(which='minor', color='gray', linestyle='-', linewidth=0.5, alpha=0.3)
-ax.tick_params(which='minor', size=0)
-ax.set_xticks([]) # Hide major ticks
-ax.set_yticks([])
-
-# Draw the negotiated boundary line
-ax.axvline(x=GRID_SIZE//2 - 0.5, color='black', linestyle='--', linewidth=2, label='Negotiated Boundary')
-
-def update(frame):
-    # 1. Update Agents Logic
-    agent1.step(grid)
-    agent2.step(grid)
-
-    # 2. Update Visuals
-    img.set_data(grid)
-    
-    # Update Agent positions
-    scat1.set_offsets([agent1.pos[1], agent1.pos[0]])
-    scat2.set_offsets([agent2.pos[1], agent2.pos[0]])
-
-    # Check completion
-    remaining_dirt = np.sum(grid)
-    total_cells = GRID_SIZE * GRID_SIZE
-    percent_clean = ((total_cells * DIRT_DENSITY - remaining_dirt) / (total_cells * DIRT_DENSITY)) * 100
-    
-    ax.set_title(f"Simulation Step: {frame} | Dirt Remaining: {remaining_dirt} | Cleaned: {int(percent_clean)}%")
-    
-    if remaining_dirt == 0:
-        print(f"Cleaning Complete in {frame} steps!")
-        ani.event_source.stop()
-
-# Create Animation
-# Reduced frames to 200 as requested
-ani = FuncAnimation(fig, update, frames=200, interval=200, repeat=False)
-
-plt.show()
+# --- Load-Balanced Negotiation ---
+
+MIN_SPLIT_DIRT = 2 # A zone is only shared once both halves can get some dirt
+
+def dirt_prefix_sums(grid):
+    """(H+1, W+1) table whose [r, c] entry counts the dirt in grid[:r, :c]."""
+    sums = np.zeros((grid.shape[0] + 1, grid.shape[1] + 1), dtype=np.int64)
+    sums[1:, 1:] = (grid == DIRT).cumsum(axis=0).cumsum(axis=1)
+    return sums
+
+def partition_zones(grid, num_zones, zone=None):
+    """
+    Splits the grid (or one zone of it) into num_zones rectangles holding near-equal dirt by recursive
+    bisection. Each split sends half of the zones to one side and picks the row or
+    column cut whose dirt count is closest to that side's fair share; every cut's
+    dirt count is read off 2D prefix sums, so a split costs O(H + W) once the sums
+    are built. The sums cover the zone only, so splitting one zone never scans the
+    rest of the floor. Ties prefer the longer axis and the most even area, which
+    keeps zones compact. Returns (min_row, max_row, min_col, max_col) tuples.
+    """
+    if zone is None:
+        zone = (0, grid.shape[0], 0, grid.shape[1])
+    top, left = zone[0], zone[2]
+    rows, cols = zone[1] - zone[0], zone[3] - zone[2]
+    if not 1 <= num_zones <= rows * cols:
+        raise ValueError(f"Cannot split a {rows}x{cols} zone into {num_zones} zones")
+    sums = dirt_prefix_sums(grid[top:top + rows, left:left + cols])
+
+    # Bisect in zone-local coordinates, then shift the results back
+    zones = []
+    pending = [((0, rows, 0, cols), num_zones)]
+    while pending:
+        zone, parts = pending.pop()
+        if parts == 1:
+            zones.append(zone)
+            continue
+        r0, r1, c0, c1 = zone
+        height, width = r1 - r0, c1 - c0
+        first = parts // 2
+        share = first / parts
+        target = (sums[r1, c1] - sums[r0, c1] - sums[r1, c0] + sums[r0, c0]) * share
+
+        candidates = [] # (imbalance, off_axis, area_skew, cut, is_row)
+        if height > 1:
+            cuts = np.arange(r0 + 1, r1)
+            dirt = sums[cuts, c1] - sums[cuts, c0] - sums[r0, c1] + sums[r0, c0]
+            area = (cuts - r0) * width
+            candidates.append((cuts, dirt, area, height < width, True))
+        if width > 1:
+            cuts = np.arange(c0 + 1, c1)
+            dirt = sums[r1, cuts] - sums[r0, cuts] - sums[r1, c0] + sums[r0, c0]
+            area = (cuts - c0) * height
+            candidates.append((cuts, dirt, area, width < height, False))
+
+        best = None
+        for cuts, dirt, area, off_axis, is_row in candidates:
+            # Both sides need at least one cell per zone they still have to hold
+            fits = (area >= first) & (height * width - area >= parts - first)
+            if not fits.any():
+                continue
+            imbalance = np.abs(dirt - target)[fits]
+            skew = np.abs(area / (height * width) - share)[fits]
+            i = np.lexsort((skew, imbalance))[0]
+            key = (imbalance[i], off_axis, skew[i])
+            if best is None or key < best[0]:
+                best = (key, int(cuts[fits][i]), is_row)
+
+        _, cut, is_row = best
+        if is_row:
+            pending.append(((cut, r1, c0, c1), parts - first))
+            pending.append(((r0, cut, c0, c1), first))
+        else:
+            pending.append(((r0, r1, cut, c1), parts - first))
+            pending.append(((r0, r1, c0, cut), first))
+    return [(r0 + top, r1 + top, c0 + left, c1 + left) for r0, r1, c0, c1 in zones]
+
+def zone_distance(pos, zone):
+    """Manhattan distance from pos to the closest cell of zone."""
+    r, c = pos
+    min_row, max_row, min_col, max_col = zone
+    return max(min_row - r, 0, r - (max_row - 1)) + max(min_col - c, 0, c - (max_col - 1))
+
+def negotiate_zones(agents, grid, verbose=False):
+    """
+    N-agent negotiation: the grid is partitioned into dirt-balanced zones and
+    agents claim them closest-first, so nobody crosses the room when a nearby
+    zone is free. Returns the zones in agent order.
+    """
+    zones = partition_zones(grid, len(agents))
+    claims = sorted((zone_distance(agent.pos, zone), i, j)
+                    for i, agent in enumerate(agents) for j, zone in enumerate(zones))
+    assigned = {}
+    taken = set()
+    for _, i, j in claims:
+        if i not in assigned and j not in taken:
+            assigned[i] = zones[j]
+            taken.add(j)
+
+    for i, agent in enumerate(agents):
+        agent.accept_zone(assigned[i], grid)
+        if verbose:
+            min_row, max_row, min_col, max_col = agent.zone
+            print(f"[Agent {agent.agent_id}] Claims Rows {min_row}-{max_row}, Cols {min_col}-{max_col} "
+                  f"({len(agent.dirt_index)} dirt).")
+    return [assigned[i] for i in range(len(agents))]
+
+def zone_halves(agent, grid):
+    """
+    The dirt-balanced halves of agent's zone as ((zone, dirt), (zone, dirt)).
+    Cached on the agent until its zone or dirt count changes, so an idle agent
+    that keeps turning down the split costs nothing per step.
+    """
+    key = (agent.zone, len(agent.dirt_index))
+    if agent.halves is None or agent.halves[0] != key:
+        first, second = partition_zones(grid, 2, agent.zone)
+        r0, r1, c0, c1 = second
+        second_dirt = int(np.count_nonzero(grid[r0:r1, c0:c1] == DIRT))
+        agent.halves = (key, ((first, key[1] - second_dirt), (second, second_dirt)))
+    return agent.halves[1]
+
+def rebalance_zones(agents, grid, verbose=False):
+    """
+    Re-partitioning once zones run out: each agent whose zone is clean takes over
+    half of the dirtiest remaining zone, split in two by dirt count. The halves go
+    to whichever pairing of the two agents walks less. Returns the number of splits.
+    """
+    splits = 0
+    for idle in agents:
+        if idle.dirt_index.rows:
+            continue
+        busiest = max(agents, key=lambda agent: len(agent.dirt_index))
+        if len(busiest.dirt_index) < MIN_SPLIT_DIRT:
+            break
+        (first, _), (second, given) = zone_halves(busiest, grid)
+        if (zone_distance(busiest.pos, second) + zone_distance(idle.pos, first)
+                < zone_distance(busiest.pos, first) + zone_distance(idle.pos, second)):
+            (second, given), (first, _) = zone_halves(busiest, grid)
+        # Only worth it if the busy agent would need longer for the half than the walk takes
+        if zone_distance(idle.pos, second) >= 2 * given:
+            continue
+        busiest.accept_zone(first, grid)
+        idle.accept_zone(second, grid)
+        splits += 1
+        if verbose:
+            print(f"[Agent {idle.agent_id}] Takes over Rows {second[0]}-{second[1]}, Cols {second[2]}-{second[3]} "
+                  f"from Agent {busiest.agent_id} ({len(idle.dirt_index)} dirt).")
+    return splits
+
+def column_strips(total_cols, num_zones, total_rows):
+    """Fixed equal-width column zones, the N-agent version of the LEFT/RIGHT split."""
+    bounds = np.linspace(0, total_cols, num_zones + 1).astype(int)
+    return [(0, total_rows, int(bounds[i]), int(bounds[i + 1])) for i in range(num_zones)]
+
+def start_positions(num_agents, grid_size):
+    """Agents start spread along the top wall, in the two corners when there are two."""
+    if num_agents == 1:
+        return [[0, 0]]
+    return [[0, int(c)] for c in np.linspace(0, grid_size - 1, num_agents).round()]
+
+# --- Simulation Core ---
+
+class CleaningSimulation:
+    """
+    Owns one room and its agents, with no display attached.
+    Seeded simulations are fully reproducible: the grid comes from a NumPy
+    generator and the agents' tie-breaking from a random.Random, both spawned
+    from one SeedSequence.
+
+    negotiation="split" gives every agent a fixed, equal-width column strip (the
+    original LEFT/RIGHT split for two agents). negotiation="balanced" hands out
+    dirt-balanced zones with negotiate_zones and, whenever an agent's zone is
+    clean while dirt is left elsewhere, lets it take half of the dirtiest zone
+    (rebalance_zones), which keeps every agent busy until the room is done.
+
+    policy picks how agents move inside their zones (see CleaningAgent).
+    """
+    def __init__(self, grid_size=GRID_SIZE, dirt_density=DIRT_DENSITY, seed=None, verbose=False,
+                 num_agents=2, negotiation="split", policy="greedy"):
+        if negotiation not in ("split", "balanced"):
+            raise ValueError(f"Unknown negotiation '{negotiation}'. Choose from: split, balanced")
+        self.grid_size = grid_size
+        self.dirt_density = dirt_density
+        self.negotiation = negotiation
+        self.verbose = verbose
+        grid_seq, agent_seq = np.random.SeedSequence(seed).spawn(2)
+        grid_rng = np.random.default_rng(grid_seq)
+        agent_rng = random.Random(int(agent_seq.generate_state(1)[0]))
+
+        # Initialize Grid: a bytearray for the agents' inner loop, viewed as a 2D array for everything else
+        dirt = grid_rng.choice([EMPTY, DIRT], size=(grid_size, grid_size), p=[1-dirt_density, dirt_density])
+        self.cells, self.grid = byte_grid(dirt)
+        self.initial_dirt = int(np.sum(self.grid))
+
+        # Initialize Agents (all rooms of one size share a neighbour table)
+        self.topology = open_grid(grid_size, grid_size)
+        self.agents = [
+            CleaningAgent(i + 1, AGENT_COLORS[i % len(AGENT_COLORS)], pos, grid_size, agent_rng, self.topology,
+                          policy)
+            for i, pos in enumerate(start_positions(num_agents, grid_size))
+        ]
+
+        if verbose:
+            print("--- STARTING NEGOTIATION PHASE ---")
+        # Agents agree on zones to avoid collision/overlap
+        if negotiation == "balanced":
+            negotiate_zones(self.agents, self.grid, verbose)
+        elif num_agents == 2:
+            self.agents[0].negotiate_zone(grid_size, "LEFT", verbose)
+            self.agents[1].negotiate_zone(grid_size, "RIGHT", verbose)
+        else:
+            for agent, zone in zip(self.agents, column_strips(grid_size, num_agents, grid_size)):
+                agent.accept_zone(zone, self.grid)
+        if verbose:
+            print("--- NEGOTIATION COMPLETE: ZONES LOCKED ---")
+
+        self.steps = 0
+        self.renegotiations = 0
+
+    @property
+    def remaining_dirt(self):
+        # Agents only ever remove dirt, so this avoids summing the grid every step
+        return self.initial_dirt - sum(agent.cleaned_count for agent in self.agents)
+
+    def step(self):
+        """Advances every agent by one step and returns the dirt left."""
+        for agent in self.agents:
+            agent.step(self.grid, self.cells)
+        self.steps += 1
+        remaining = self.remaining_dirt
+        if self.negotiation == "balanced" and remaining > 0:
+            self.renegotiations += rebalance_zones(self.agents, self.grid, self.verbose)
+        return remaining
+
+    def run(self, max_steps):
+        """Steps until the room is clean or max_steps is reached."""
+        while self.steps < max_steps and self.remaining_dirt > 0:
+            self.step()
+        return self.result()
+
+    def result(self):
+        clean = self.remaining_dirt == 0
+        return {
+            'clean': clean,
+            'steps_to_clean': self.steps if clean else None,
+            'steps': self.steps,
+            'remaining_dirt': self.remaining_dirt,
+            'renegotiations': self.renegotiations,
+            'agents': [{'agent_id': a.agent_id, 'moves_made': a.moves_made, 'cleaned_count': a.cleaned_count,
+                        'replans': a.replans} for a in self.agents],
+        }
+
+# Per-step methods timed by --metrics (agent timings include the nearest-dirt lookups)
+METRIC_HOOKS = [
+    (CleaningSimulation, "step", "cleaner.sim_step"),
+    (CleaningAgent, "step", "cleaner.agent_step"),
+    (CleaningAgent, "find_nearest_dirt", "cleaner.find_nearest_dirt"),
+]
+
+def run_batch(num_rooms, max_steps, seed=0, **kwargs):
+    """Runs num_rooms independent rooms; room i is seeded with (seed, i)."""
+    return [CleaningSimulation(seed=[seed, i], **kwargs).run(max_steps) for i in range(num_rooms)]
+
+def compare_policies(num_rooms, max_steps, seed=0, policies=POLICIES, **kwargs):
+    """
+    Runs the same seeded rooms under every policy. Reports moves per cleaned
+    cell, the makespan and the wall time the batch took, which includes route
+    planning.
+    """
+    rows = []
+    for policy in policies:
+        started = time.perf_counter()
+        results = run_batch(num_rooms, max_steps, seed=seed, policy=policy, **kwargs)
+        elapsed = time.perf_counter() - started
+        finished = [r['steps_to_clean'] for r in results if r['clean']]
+        moves = sum(a['moves_made'] for r in results for a in r['agents'])
+        cleaned = sum(a['cleaned_count'] for r in results for a in r['agents'])
+        rows.append({
+            'policy': policy,
+            'clean_rate': len(finished) / num_rooms,
+            'makespan_mean': float(np.mean(finished)) if finished else None,
+            'moves_per_room': moves / num_rooms,
+            'moves_per_cleaned': moves / cleaned if cleaned else None,
+            'replans_per_room': sum(a['replans'] for r in results for a in r['agents']) / num_rooms,
+            'seconds': elapsed,
+        })
+    return rows
+
+def record_run(sim, path, max_steps, keyframe_interval=KEYFRAME_INTERVAL):
+    """Runs sim like run() while streaming every step to a replay directory (see replay.py)."""
+    positions = lambda: [agent.pos for agent in sim.agents]
+    with ReplayRecorder(path, sim.grid, positions(), [CLEAN_COLOR, DIRT_COLOR], [a.color for a in sim.agents],
+                        title="Cleaning Simulation", keyframe_interval=keyframe_interval) as recorder:
+        while sim.steps < max_steps and sim.remaining_dirt > 0:
+            sim.step()
+            recorder.record(sim.grid, positions())
+    return sim.result()
+
+# --- Visualization ---
+
+def animate(sim, frames=200, interval=200):
+    """Live matplotlib view of a CleaningSimulation; each frame advances one step."""
+    # Imported here so headless batches never load matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+    from matplotlib.patches import Rectangle
+
+    grid_size = sim.grid_size
+
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.set_title("Multi-Agent Cleaning Simulation (Negotiated Zones)")
+
+    # Create a custom colormap for the grid (Clean vs Dirt)
+    cmap = plt.matplotlib.colors.ListedColormap([CLEAN_COLOR, DIRT_COLOR])
+
+    # Initial Plot
+    img = ax.imshow(sim.grid, cmap=cmap, vmin=0, vmax=1)
+
+    # Agent Scatter Plots (Dots)
+    scats = [ax.scatter(agent.pos[1], agent.pos[0], c=agent.color, s=200, label=f'Agent {agent.agent_id}',
+                        edgecolors='black') for agent in sim.agents]
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.05), fancybox=True, shadow=True,
+              ncol=min(len(sim.agents), 4))
+
+    # Grid lines for visual clarity
+    ax.set_xticks(np.arange(-.5, grid_size, 1), minor=True)
+    ax.set_yticks(np.arange(-.5, grid_size, 1), minor=True)
+    ax.grid(which='minor', color='gray', linestyle='-', linewidth=0.5, alpha=0.3)
+    ax.tick_params(which='minor', size=0)
+    ax.set_xticks([]) # Hide major ticks
+    ax.set_yticks([])
+
+    # Outline each agent's negotiated zone (zones move when the agents renegotiate)
+    outlines = [ax.add_patch(Rectangle((0, 0), 0, 0, fill=False, edgecolor=agent.color, linestyle='--', linewidth=2))
+                for agent in sim.agents]
+
+    def draw_zones():
+        for outline, agent in zip(outlines, sim.agents):
+            min_row, max_row, min_col, max_col = agent.zone
+            outline.set_xy((min_col - 0.5, min_row - 0.5))
+            outline.set_width(max_col - min_col)
+            outline.set_height(max_row - min_row)
+
+    draw_zones()
+    if metrics.REGISTRY.enabled: # Matplotlib's own drawing is most of the rendering cost
+        metrics.enable([(fig.canvas, "draw", "cleaner.draw")])
+
+    def update(frame):
+        # 1. Update Agents Logic
+        remaining_dirt = sim.step()
+
+        # 2. Update Visuals
+        with metrics.timer("cleaner.update_artists"):
+            img.set_data(sim.grid)
+
+            # Update Agent positions
+            for scat, agent in zip(scats, sim.agents):
+                scat.set_offsets([agent.pos[1], agent.pos[0]])
+            draw_zones()
+
+            # Check completion
+            total_cells = grid_size * grid_size
+            percent_clean = ((total_cells * sim.dirt_density - remaining_dirt) / (total_cells * sim.dirt_density)) * 100
+
+            ax.set_title(f"Simulation Step: {frame} | Dirt Remaining: {remaining_dirt} | Cleaned: {int(percent_clean)}%")
+
+        if remaining_dirt == 0:
+            print(f"Cleaning Complete in {frame} steps!")
+            ani.event_source.stop()
+
+    # Create Animation
+    # Reduced frames to 200 as requested
+    ani = FuncAnimation(fig, update, frames=frames, interval=interval, repeat=False)
+
+    plt.show()
+    return ani
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-agent cleaning simulation")
+    parser.add_argument("--headless", action="store_true", help="run seeded rooms without plotting")
+    parser.add_argument("--rooms", type=int, default=1000, help="rooms to simulate when headless")
+    parser.add_argument("--steps", type=int, default=200, help="step limit per room")
+    parser.add_argument("--size", type=int, default=GRID_SIZE)
+    parser.add_argument("--density", type=float, default=DIRT_DENSITY)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--agents", type=int, default=2)
+    parser.add_argument("--negotiation", choices=["split", "balanced"], default="split",
+                        help="fixed column strips or dirt-balanced zones that are renegotiated")
+    parser.add_argument("--policy", choices=POLICIES, default="greedy",
+                        help="nearest-dirt greedy moves or a planned route over the zone")
+    parser.add_argument("--compare-policies", action="store_true",
+                        help="run the headless rooms under every policy and compare moves and time")
+    parser.add_argument("--record", metavar="PATH", help="record one room to a replay directory instead")
+    parser.add_argument("--metrics", metavar="PATH", help="write timings on exit (.prom for Prometheus, else JSON)")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable(METRIC_HOOKS)
+
+    if args.compare_policies:
+        print(f"{'Policy':<7} | {'Clean':>6} | {'Makespan':>8} | {'Moves/room':>10} | {'Moves/cell':>10} | "
+              f"{'Replans':>7} | {'Time':>7}")
+        print("-" * 72)
+        for row in compare_policies(args.rooms, args.steps, seed=args.seed or 0, grid_size=args.size,
+                                    dirt_density=args.density, num_agents=args.agents,
+                                    negotiation=args.negotiation):
+            makespan = f"{row['makespan_mean']:.1f}" if row['makespan_mean'] is not None else "-"
+            print(f"{row['policy']:<7} | {row['clean_rate']:>6.0%} | {makespan:>8} | {row['moves_per_room']:>10.1f} | "
+                  f"{row['moves_per_cleaned']:>10.3f} | {row['replans_per_room']:>7.1f} | {row['seconds']:>6.2f}s")
+    elif args.record:
+        sim = CleaningSimulation(args.size, args.density, seed=args.seed, num_agents=args.agents,
+                                 negotiation=args.negotiation, policy=args.policy)
+        result = record_run(sim, args.record, args.steps)
+        print(f"Recorded {result['steps']} steps to {args.record} | remaining dirt: {result['remaining_dirt']}")
+        print(f"   View with: python replay.py {args.record}")
+    elif args.headless:
+        results = run_batch(args.rooms, args.steps, seed=args.seed or 0, grid_size=args.size,
+                            dirt_density=args.density, num_agents=args.agents, negotiation=args.negotiation,
+                            policy=args.policy)
+        finished = [r['steps_to_clean'] for r in results if r['clean']]
+        moves = np.mean([sum(a['moves_made'] for a in r['agents']) for r in results])
+        print(f"Rooms: {len(results)} | Cleaned within {args.steps} steps: {len(finished)}")
+        if finished:
+            print(f"   Makespan: mean {np.mean(finished):.1f} | median {np.median(finished):.0f} | max {max(finished)}")
+        print(f"   Moves per room: {moves:.1f}")
+        if args.negotiation == "balanced":
+            print(f"   Renegotiations per room: {np.mean([r['renegotiations'] for r in results]):.1f}")
+    else:
+        animate(CleaningSimulation(args.size, args.density, seed=args.seed, verbose=True, num_agents=args.agents,
+                                   negotiation=args.negotiation, policy=args.policy), frames=args.steps)
+    if args.metrics:
+        metrics.REGISTRY.write(args.metrics)
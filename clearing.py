@@ -0,0 +1,202 @@
+import heapq
+import time
+
+import numpy as np
+
+# --- Shared Auction Clearing ---
+# Bids are (amount, bidder) pairs in arrival order. Ties always go to the earlier
+# bid, which is what the original "stable sort, take the first" code did.
+# Single-item clearing returns a dict with the winner, its bid and the price it
+# pays, or None when no bid qualifies.
+
+MIN_BID = 1 # Lowest legal bid; a lone bidder in a second-price auction pays this
+
+def top_two(bids, reserve=None):
+    """
+    One O(M) pass over the bids. Returns (best, runner_up) as (amount, bidder)
+    pairs, ignoring bids below the reserve; either may be None.
+    """
+    best = second = None
+    for bid in bids:
+        amount = bid[0]
+        if reserve is not None and amount < reserve:
+            continue
+        if best is None or amount > best[0]:
+            best, second = bid, best
+        elif second is None or amount > second[0]:
+            second = bid
+    return best, second
+
+def clear_first_price(bids, reserve=None):
+    """Sealed first-price: the highest bid wins and pays what it bid."""
+    best, _ = top_two(bids, reserve)
+    if best is None:
+        return None
+    return {'winner': best[1], 'winning_bid': best[0], 'price': best[0]}
+
+def clear_second_price(bids, reserve=None):
+    """Vickrey: the highest bid wins and pays the runner-up's bid (or the reserve)."""
+    best, second = top_two(bids, reserve)
+    if best is None:
+        return None
+    floor = reserve if reserve is not None else MIN_BID
+    price = max(second[0], floor) if second is not None else floor
+    return {'winner': best[1], 'winning_bid': best[0], 'price': price}
+
+MECHANISMS = {
+    "first": clear_first_price,
+    "second": clear_second_price,
+}
+
+def clear(bids, mechanism="first", reserve=None):
+    """Clears one lot with the named single-item mechanism."""
+    try:
+        return MECHANISMS[mechanism](bids, reserve)
+    except KeyError:
+        raise ValueError(f"Unknown mechanism '{mechanism}'. Choose from: {', '.join(MECHANISMS)}")
+
+def clear_batch(bids, mechanism="first", reserve=None):
+    """
+    Vectorized single-item clearing of a (lots x bidders) bid matrix in O(M) per
+    lot. Returns (winners, winning_bids, prices); winners is -1 for lots where no
+    bid met the reserve, and the other two are 0 there.
+    """
+    if mechanism not in MECHANISMS:
+        raise ValueError(f"Unknown mechanism '{mechanism}'. Choose from: {', '.join(MECHANISMS)}")
+    lots = np.arange(bids.shape[0])
+    if bids.shape[1] == 0: # No bidders: nothing sells
+        unsold = np.full(len(lots), -1, dtype=np.int64)
+        return unsold, np.zeros(len(lots), dtype=bids.dtype), np.zeros(len(lots), dtype=bids.dtype)
+    qualified = bids if reserve is None else np.where(bids >= reserve, bids, -1)
+
+    winners = np.argmax(qualified, axis=1) # first highest bid, like top_two
+    winning_bids = qualified[lots, winners]
+    sold = winning_bids >= 0
+
+    if mechanism == "first":
+        prices = winning_bids.copy()
+    else:
+        floor = reserve if reserve is not None else MIN_BID
+        runner_up = qualified.copy()
+        runner_up[lots, winners] = -1
+        prices = np.maximum(runner_up.max(axis=1, initial=-1), floor)
+
+    winners = np.where(sold, winners, -1)
+    return winners, np.where(sold, winning_bids, 0), np.where(sold, prices, 0)
+
+# --- Multi-Lot Clearing ---
+# Mechanisms that sell several lots per round, as offered by bid.run_multi_lot_auction:
+#   multi-first     identical units, every winner pays its bid
+#   multi-uniform   identical units, every winner pays the highest losing bid
+#   combinatorial   package bids on distinct items, every winner pays its bid
+MULTI_LOT_MECHANISMS = ["multi-first", "multi-uniform", "combinatorial"]
+MULTI_UNIT_PRICING = ["first", "uniform"]
+TIME_BUDGET = 1.0 # Seconds clear_combinatorial may search before settling for its best so far
+
+def clear_multi_unit(bids, units, pricing="first", reserve=None):
+    """
+    Sells `units` identical items to the highest bidders, one unit each.
+    pricing="first" makes every winner pay its own bid; pricing="uniform"
+    charges everyone the highest losing bid (or the reserve). Runs in O(M log units).
+    """
+    if pricing not in MULTI_UNIT_PRICING:
+        raise ValueError(f"Unknown pricing '{pricing}'. Choose from: {', '.join(MULTI_UNIT_PRICING)}")
+    qualified = [(amount, -i, bidder) for i, (amount, bidder) in enumerate(bids)
+                 if reserve is None or amount >= reserve]
+    ranked = heapq.nlargest(units + 1, qualified)
+    winners, losers = ranked[:units], ranked[units:]
+
+    if pricing == "uniform":
+        floor = reserve if reserve is not None else MIN_BID
+        price = max(losers[0][0], floor) if losers else floor
+        return [{'winner': b, 'winning_bid': a, 'price': price} for a, _, b in winners]
+    return [{'winner': b, 'winning_bid': a, 'price': a} for a, _, b in winners]
+
+# --- Combinatorial Clearing ---
+
+def clear_combinatorial(bids, time_budget=TIME_BUDGET):
+    """
+    Winner determination for package bids given as (amount, bidder, items).
+    Finds the set of non-overlapping packages with the highest total amount by
+    depth-first branch and bound over the items, seeded with a greedy solution so
+    there is always an answer when the time budget runs out.
+
+    Returns (accepted_bids, revenue, optimal) where optimal tells whether the
+    search finished inside the budget.
+    """
+    deadline = time.perf_counter() + time_budget
+
+    # Items become bits so package overlap is a single AND
+    item_bit = {}
+    packages = []
+    for index, (amount, bidder, items) in enumerate(bids):
+        mask = 0
+        for item in items:
+            mask |= 1 << item_bit.setdefault(item, len(item_bit))
+        if mask and amount > 0:
+            packages.append((amount, mask, index))
+    num_items = len(item_bit)
+
+    # Branch on the lowest unallocated item: each package is filed under its lowest bit
+    by_item = [[] for _ in range(num_items)]
+    for package in packages:
+        lowest = (package[1] & -package[1]).bit_length() - 1
+        by_item[lowest].append(package)
+    for options in by_item:
+        options.sort(reverse=True)
+
+    # Upper bound: every free item sells at the best per-item price any package offers
+    item_value = [0.0] * num_items
+    for amount, mask, _ in packages:
+        share = amount / bin(mask).count("1")
+        bits = mask
+        while bits:
+            bit = (bits & -bits).bit_length() - 1
+            item_value[bit] = max(item_value[bit], share)
+            bits &= bits - 1
+
+    # Greedy start: highest amount per item first
+    best_revenue, best_set, taken = 0, [], 0
+    for amount, mask, index in sorted(packages, key=lambda p: p[0] / bin(p[1]).count("1"), reverse=True):
+        if not mask & taken:
+            taken |= mask
+            best_revenue += amount
+            best_set.append(index)
+
+    full = (1 << num_items) - 1
+    timed_out = False
+    # Explicit stack instead of recursion: (allocated mask, revenue, chosen, next item)
+    stack = [(0, 0, [], 0)]
+    expansions = 0
+    while stack:
+        expansions += 1
+        if expansions % 1024 == 0 and time.perf_counter() > deadline:
+            timed_out = True
+            break
+
+        allocated, revenue, chosen, item = stack.pop()
+        while item < num_items and allocated >> item & 1:
+            item += 1
+        if item == num_items:
+            if revenue > best_revenue:
+                best_revenue, best_set = revenue, chosen
+            continue
+
+        bound = revenue
+        free = full & ~allocated
+        while free:
+            bit = (free & -free).bit_length() - 1
+            bound += item_value[bit]
+            free &= free - 1
+        if bound <= best_revenue:
+            continue
+
+        # Leave the item unsold, then try every package that starts with it
+        # (pushed last so the most valuable package is explored first)
+        stack.append((allocated | (1 << item), revenue, chosen, item + 1))
+        for amount, mask, index in reversed(by_item[item]):
+            if not mask & allocated:
+                stack.append((allocated | mask, revenue + amount, chosen + [index], item + 1))
+
+    accepted = [bids[i] for i in sorted(best_set)]
+    return accepted, best_revenue, not timed_out
@@ -0,0 +1,83 @@
+from functools import lru_cache
+
+import numpy as np
+
+# --- Shared Grid Topology ---
+# Cells are addressed by flat index r * cols + c. Neighbour tables are tuples of
+# flat indices, built once, in the move order every agent uses: up, down, left, right.
+
+OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+def byte_grid(array):
+    """
+    Copies a 2D array of small ints into a bytearray and returns it together with
+    a writable uint8 NumPy view of the same memory. Inner loops index the
+    bytearray; array code (prefix sums, plotting) keeps using the view.
+    """
+    cells = bytearray(np.ascontiguousarray(array, dtype=np.uint8).tobytes())
+    return cells, np.frombuffer(cells, dtype=np.uint8).reshape(array.shape)
+
+class GridTopology:
+    """
+    Precomputed adjacency of a rows x cols grid. Blocked cells (maze walls) are
+    never anyone's neighbour, so move generation is a table lookup with no
+    bounds or wall checks.
+    """
+    def __init__(self, rows, cols, blocked=None):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        r, c = np.divmod(np.arange(self.size), cols)
+        self.coords = list(zip(r.tolist(), c.tolist()))
+        passable = np.ones(self.size, dtype=bool) if blocked is None else ~np.asarray(blocked, dtype=bool)
+        self.passable = bytearray(passable.astype(np.uint8).tobytes())
+
+        # Candidate neighbours of every cell at once, then one tuple per cell. Cells
+        # sharing a pattern of usable directions are converted together, so the
+        # Python-level work is a single map(tuple, ...) per pattern.
+        candidates = np.empty((self.size, len(OFFSETS)), dtype=np.int64)
+        usable = np.empty((self.size, len(OFFSETS)), dtype=bool)
+        for k, (dr, dc) in enumerate(OFFSETS):
+            nr, nc = r + dr, c + dc
+            usable[:, k] = (nr >= 0) & (nr < rows) & (nc >= 0) & (nc < cols)
+            candidates[:, k] = nr * cols + nc
+        usable[usable] &= passable[candidates[usable]]
+
+        neighbours = np.empty(self.size, dtype=object)
+        patterns = usable @ (1 << np.arange(len(OFFSETS)))
+        for pattern in np.unique(patterns).tolist():
+            cells = np.flatnonzero(patterns == pattern)
+            keep = [k for k in range(len(OFFSETS)) if pattern >> k & 1]
+            neighbours[cells] = np.fromiter(map(tuple, candidates[cells][:, keep].tolist()), dtype=object,
+                                            count=len(cells))
+        self.neighbours = neighbours.tolist()
+
+    @classmethod
+    def from_maze(cls, maze, wall):
+        return cls(maze.shape[0], maze.shape[1], blocked=(maze == wall).ravel())
+
+    def index(self, r, c):
+        return r * self.cols + c
+
+    def zone_mask(self, zone):
+        """bytearray that is 1 on the cells of a (min_row, max_row, min_col, max_col) zone."""
+        min_row, max_row, min_col, max_col = zone
+        mask = bytearray(self.size)
+        row = b"\x01" * (max_col - min_col)
+        for r in range(min_row, max_row):
+            mask[r * self.cols + min_col:r * self.cols + max_col] = row
+        return mask
+
+    def moves_within(self, i, mask):
+        """
+        Neighbours of cell i for an agent confined to mask: inside it only cells
+        inside it, outside it every neighbour, so the agent can walk in.
+        """
+        if mask[i]:
+            return [n for n in self.neighbours[i] if mask[n]]
+        return list(self.neighbours[i])
+
+@lru_cache(maxsize=None)
+def open_grid(rows, cols):
+    """Wall-free topology shared by every grid of this shape; its tables are never mutated."""
+    return GridTopology(rows, cols)
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+# --- Trade Ledger ---
+# One row per lot, stored column by column. Rows are appended into fixed-size
+# NumPy chunks, so a million-round run never reallocates or copies what it
+# already wrote, and one lot is a handful of scalar stores.
+#
+#   round        lot number as the engine counts it
+#   true_value   value of the task
+#   bids         one column per agent; NO_BID where the agent stayed out
+#   winner       agent index, -1 when nothing sold
+#   winning_bid  0 when nothing sold (as clearing.clear_batch)
+#   price        clearing price paid, 0 when nothing sold
+#   profit       true_value - price for the winner, 0 when nothing sold
+#
+# On disk a ledger is a directory with one raw .bin per column and meta.json,
+# like a replay (see replay.py). Every column is written with the smallest
+# dtype that holds its values, and Ledger.open maps them with np.memmap.
+
+CHUNK_ROWS = 1 << 16
+NO_BID = 0 # Legal bids start at clearing.MIN_BID
+META_FILE = "meta.json"
+TMP_SUFFIX = ".tmp" # save() writes here first, then swaps the files in
+SCALAR_COLUMNS = ("round", "true_value", "winner", "winning_bid", "price", "profit")
+COLUMNS = SCALAR_COLUMNS + ("bids",)
+STORAGE_DTYPES = [np.dtype(t) for t in ("uint8", "int8", "uint16", "int16", "uint32", "int32", "int64")]
+
+def smallest_dtype(low, high):
+    """Smallest integer dtype that holds every value in [low, high]; the columns are int64, so one always does."""
+    for dtype in STORAGE_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+
+class Ledger:
+    """
+    Append-only columnar record of auction outcomes for a fixed set of agents.
+    append() adds one lot, extend() a whole batch of lots. column(name)
+    returns the full column as one array, which is cached until the next
+    append. The queries below are whole-column NumPy expressions.
+    """
+    def __init__(self, agent_names, chunk_rows=CHUNK_ROWS):
+        self.agent_names = list(agent_names)
+        self.chunk_rows = chunk_rows
+        self.chunks = [] # Full chunks (or memory-mapped columns), each a dict of column -> array
+        self.rows = 0
+        self.cache = {}
+        self.new_chunk()
+
+    def new_chunk(self):
+        self.current = {name: np.zeros(self.chunk_rows, dtype=np.int64) for name in SCALAR_COLUMNS}
+        self.current['bids'] = np.full((self.chunk_rows, len(self.agent_names)), NO_BID, dtype=np.int64)
+        self.filled = 0
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, round_num, true_value, bids, winner, winning_bid, price, profit):
+        """Adds one lot. bids has one entry per agent; winner is an agent index or -1."""
+        if self.filled == self.chunk_rows:
+            self.chunks.append(self.current)
+            self.new_chunk()
+        i = self.filled
+        current = self.current
+        current['round'][i] = round_num
+        current['true_value'][i] = true_value
+        current['bids'][i] = bids
+        current['winner'][i] = winner
+        current['winning_bid'][i] = winning_bid
+        current['price'][i] = price
+        current['profit'][i] = profit
+        self.filled += 1
+        self.rows += 1
+        self.cache.clear()
+
+    def extend(self, rounds, true_values, bids, winners, winning_bids, prices, profits):
+        """Adds a batch of lots from arrays, e.g. the output of bid.run_batch_auction."""
+        batch = {'round': rounds, 'true_value': true_values, 'bids': bids, 'winner': winners,
+                 'winning_bid': winning_bids, 'price': prices, 'profit': profits}
+        done, total = 0, len(rounds)
+        while done < total:
+            if self.filled == self.chunk_rows:
+                self.chunks.append(self.current)
+                self.new_chunk()
+            n = min(self.chunk_rows - self.filled, total - done)
+            for name, values in batch.items():
+                self.current[name][self.filled:self.filled + n] = values[done:done + n]
+            self.filled += n
+            self.rows += n
+            done += n
+        self.cache.clear()
+
+    def column(self, name):
+        if name not in self.cache:
+            parts = [chunk[name] for chunk in self.chunks]
+            if self.filled:
+                parts.append(self.current[name][:self.filled])
+            if not parts:
+                self.cache[name] = self.current[name][:0]
+            elif len(parts) == 1:
+                self.cache[name] = parts[0]
+            else:
+                self.cache[name] = np.concatenate(parts)
+        return self.cache[name]
+
+    # --- Persistence ---
+
+    def save(self, path):
+        """
+        Writes the ledger to a directory; chunks are streamed, never concatenated.
+        Files are written under a temporary name and swapped in at the end, so a
+        ledger opened from path can be saved back over its own mapped columns.
+        """
+        os.makedirs(path, exist_ok=True)
+        parts = self.chunks + ([{name: values[:self.filled] for name, values in self.current.items()}]
+                               if self.filled else [])
+        arrays = {}
+        written = []
+        for name in COLUMNS:
+            low = min((int(part[name].min()) for part in parts if len(part[name])), default=0)
+            high = max((int(part[name].max()) for part in parts if len(part[name])), default=0)
+            dtype = smallest_dtype(low, high)
+            target = os.path.join(path, name + ".bin")
+            with open(target + TMP_SUFFIX, "wb") as f:
+                for part in parts:
+                    f.write(np.ascontiguousarray(part[name], dtype=dtype).tobytes())
+            written.append(target)
+            shape = [self.rows, len(self.agent_names)] if name == "bids" else [self.rows]
+            arrays[name] = [dtype.name, shape]
+        target = os.path.join(path, META_FILE)
+        with open(target + TMP_SUFFIX, "w") as f:
+            json.dump({'agents': self.agent_names, 'rows': self.rows, 'arrays': arrays}, f, indent=2)
+        # Replacing unlinks the old files; existing maps keep their data alive
+        for target in written + [target]:
+            os.replace(target + TMP_SUFFIX, target)
+
+    @classmethod
+    def open(cls, path, chunk_rows=CHUNK_ROWS):
+        """
+        Maps a saved ledger read-only. Queries run straight off the mapped
+        columns. Appending is still allowed and goes to new in-memory chunks.
+        """
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        ledger = cls(meta['agents'], chunk_rows)
+        if meta['rows']:
+            ledger.chunks.append({name: np.memmap(os.path.join(path, name + ".bin"), dtype=dtype, mode="r",
+                                                  shape=tuple(shape))
+                                  for name, (dtype, shape) in meta['arrays'].items()})
+            ledger.rows = meta['rows']
+        return ledger
+
+    # --- Queries ---
+
+    def profit_matrix(self):
+        """(rows x agents) profit each agent made on each lot; zero where it did not win."""
+        winners = self.column('winner')
+        sold = np.flatnonzero(winners >= 0)
+        profits = np.zeros((self.rows, len(self.agent_names)), dtype=np.int64)
+        profits[sold, winners[sold]] = self.column('profit')[sold]
+        return profits
+
+    def pnl_curves(self):
+        """(rows x agents) running balance of every agent after each lot."""
+        return np.cumsum(self.profit_matrix(), axis=0)
+
+    def wins(self):
+        winners = self.column('winner')
+        return np.bincount(winners[winners >= 0], minlength=len(self.agent_names))
+
+    def balances(self):
+        winners = self.column('winner')
+        sold = winners >= 0
+        return np.bincount(winners[sold], weights=self.column('profit')[sold],
+                           minlength=len(self.agent_names)).astype(np.int64)
+
+    def curse_rates(self):
+        """Winner's curse per agent: the share of its wins where it paid more than the task was worth."""
+        winners = self.column('winner')
+        cursed = winners[(winners >= 0) & (self.column('profit') < 0)]
+        losses = np.bincount(cursed, minlength=len(self.agent_names))
+        wins = self.wins()
+        return np.divide(losses, wins, out=np.zeros(len(wins)), where=wins > 0)
+
+    def participation(self):
+        """Share of lots each agent bid on."""
+        if not self.rows:
+            return np.zeros(len(self.agent_names))
+        return (self.column('bids') != NO_BID).mean(axis=0)
+
+    def max_drawdowns(self):
+        """Largest drop of each agent's balance from its running peak."""
+        if not self.rows:
+            return np.zeros(len(self.agent_names), dtype=np.int64)
+        curves = self.pnl_curves()
+        peaks = np.maximum.accumulate(np.maximum(curves, 0), axis=0) # The balance starts at 0
+        return (peaks - curves).max(axis=0)
+
+    def summary(self):
+        """One row per agent, in the style of bid.agent_rows."""
+        columns = zip(self.agent_names, self.wins(), self.balances(), self.curse_rates(),
+                      self.participation(), self.max_drawdowns())
+        return [{'name': name, 'wins': int(wins), 'balance': int(balance), 'curse_rate': float(curse),
+                 'bid_rate': float(bid_rate), 'max_drawdown': int(drawdown)}
+                for name, wins, balance, curse, bid_rate, drawdown in columns]
+
+def from_batch(result, agent_names=None):
+    """Ledger of a bid.run_batch_auction result."""
+    agents = result['agents']
+    ledger = Ledger(agent_names or [a.name for a in agents])
+    rounds = len(result['true_values'])
+    ledger.extend(np.arange(1, rounds + 1), result['true_values'], result['bids'], result['winners'],
+                  result['winning_bids'], result['prices'], result['profits'])
+    return ledger
+
+def print_summary(ledger):
+    print(f"Lots: {len(ledger)} | Sold: {int((ledger.column('winner') >= 0).sum())}")
+    print(f"{'Agent':<15} | {'Wins':>7} | {'Balance':>10} | {'Bid rate':>8} | {'Curse %':>7} | {'Max drawdown':>12}")
+    print("-" * 75)
+    for row in sorted(ledger.summary(), key=lambda r: r['balance'], reverse=True):
+        print(f"{row['name']:<15} | {row['wins']:>7} | ${row['balance']:>9} | {row['bid_rate']:>8.0%} | "
+              f"{row['curse_rate']:>7.1%} | ${row['max_drawdown']:>11}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise a saved auction ledger")
+    parser.add_argument("path", help="ledger directory")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help="first record this many bid.py batch rounds to path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.rounds:
+        from bid import run_batch_auction
+        from_batch(run_batch_auction(args.rounds, seed=args.seed)).save(args.path)
+    print_summary(Ledger.open(args.path))
@@ -0,0 +1,233 @@
+import argparse
+import math
+import random
+
+import clearing
+from auction import COLORS, FPS, HEIGHT, WIDTH, Agent, MarketEngine, Task, main
+
+# --- Configuration ---
+MAX_OPEN_TASKS = 12
+SPAWN_INTERVAL = 10   # Ticks between spawns while below MAX_OPEN_TASKS
+SPAWN_BATCH = 1       # Tasks per spawn; 0 fills every free slot up to MAX_OPEN_TASKS
+BID_RADIUS = 400      # Agents only bid on tasks within this many pixels
+REBID_INTERVAL = 30   # Ticks before an unsold task is auctioned again
+TASK_TTL = 600        # Ticks an unsold task stays on the market
+CELL_SIZE = 100       # Spatial index cell edge in pixels
+
+class SpatialGrid:
+    """
+    Uniform grid index over objects with x/y attributes.
+    Each cell keeps its items in an insertion-ordered dict, so queries are
+    deterministic and insert/remove are O(1).
+    """
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+
+    def cell_of(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, item):
+        self.cells.setdefault(self.cell_of(item.x, item.y), {})[item] = None
+        self.count += 1
+
+    def remove(self, item):
+        key = self.cell_of(item.x, item.y)
+        cell = self.cells[key]
+        del cell[item]
+        if not cell:
+            del self.cells[key]
+        self.count -= 1
+
+    def __len__(self):
+        return self.count
+
+    def query(self, x, y, radius):
+        """Returns (distance, item) pairs for every item within radius of (x, y)."""
+        min_cx, min_cy = self.cell_of(x - radius, y - radius)
+        max_cx, max_cy = self.cell_of(x + radius, y + radius)
+
+        found = []
+        # Sparse index: walking the occupied cells is cheaper than the covered ones
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self.cells):
+            keys = [k for k in self.cells if min_cx <= k[0] <= max_cx and min_cy <= k[1] <= max_cy]
+        else:
+            keys = [(cx, cy) for cx in range(min_cx, max_cx + 1) for cy in range(min_cy, max_cy + 1)]
+
+        for key in keys:
+            for item in self.cells.get(key, ()):
+                dist = math.hypot(item.x - x, item.y - y)
+                if dist <= radius:
+                    found.append((dist, item))
+        return found
+
+def spread_agents(count, rng=random):
+    """Places agents on an even grid over the play area, cycling the palette."""
+    cols = math.ceil(math.sqrt(count * WIDTH / HEIGHT))
+    rows = math.ceil(count / cols)
+    agents = []
+    for i in range(count):
+        r, c = divmod(i, cols)
+        x = int((c + 0.5) * WIDTH / cols)
+        y = int((r + 0.5) * HEIGHT / rows)
+        agents.append(Agent(i + 1, x, y, COLORS[i % len(COLORS)], rng))
+    return agents
+
+class Marketplace(MarketEngine):
+    """
+    Market with many open tasks and overlapping auctions.
+
+    Open tasks live in a SpatialGrid. Every tick, each free agent (idle or on its
+    way home) looks up the tasks due for auction within BID_RADIUS, picks the one
+    worth the most to it after travel cost, and bids on it. Each task goes to its
+    highest bidder; unsold tasks are re-auctioned every REBID_INTERVAL ticks until
+    they expire.
+
+    Every spawn_interval ticks up to spawn_batch new tasks appear, never more than
+    the free capacity. Throughput is capped at spawn_batch / spawn_interval tasks
+    per tick, so heavy loads need a larger batch (or 0, which refills the market
+    to max_open_tasks every spawn).
+    """
+    def __init__(self, agents=None, seed=None, max_open_tasks=MAX_OPEN_TASKS,
+                 spawn_interval=SPAWN_INTERVAL, bid_radius=BID_RADIUS, cell_size=CELL_SIZE,
+                 mechanism="first", reserve=None, spawn_batch=SPAWN_BATCH):
+        if spawn_interval < 1 or spawn_batch < 0:
+            raise ValueError(f"Need spawn_interval >= 1 and spawn_batch >= 0, got {spawn_interval} and {spawn_batch}")
+        super().__init__(agents, seed, mechanism, reserve)
+        self.max_open_tasks = max_open_tasks
+        self.spawn_interval = spawn_interval
+        self.spawn_batch = spawn_batch
+        self.bid_radius = bid_radius
+        self.index = SpatialGrid(cell_size)
+        self.assigned = 0
+        self.tasks_expired = 0
+        self.next_task_id = 0
+
+    def spawn_task(self):
+        task = Task(self.rng)
+        task.id = self.next_task_id
+        task.opened = self.ticks
+        task.next_auction = self.ticks
+        self.next_task_id += 1
+        self.index.insert(task)
+        self.auction_log = f"NEW TASK #{task.id}! Value: ${task.true_value}"
+
+    def run_auctions(self):
+        offered = {}
+        bids = {}
+        for agent in self.agents:
+            if agent.state != "IDLE" and agent.state != "RETURNING":
+                continue
+            due = [(dist, task) for dist, task in self.index.query(agent.x, agent.y, self.bid_radius)
+                   if task.next_auction <= self.ticks]
+            if not due:
+                continue
+            offered.update((task, None) for _, task in due)
+            if self.rng.random() >= agent.aggressiveness:
+                agent.last_action_text = "Passed (No Bid)"
+                continue
+
+            # Bid on the nearby task worth the most after travel (lowest id on ties)
+            bid, task = max(((agent.calculate_bid(t.true_value, dist), t) for dist, t in due),
+                            key=lambda x: (x[0], -x[1].id))
+            agent.current_bid = bid
+            bids.setdefault(task, []).append((bid, agent))
+
+        for task, task_bids in list(bids.items()):
+            # Agents were visited in id order, so ties still go to the earliest agent
+            outcome = clearing.clear(task_bids, self.mechanism, self.reserve)
+            if outcome is None:
+                del bids[task] # Reserve not met: treat as unsold
+                continue
+            winner, winning_bid = outcome['winner'], outcome['price']
+            winner.current_bid = winning_bid
+            winner.state = "MOVING_TO_TASK"
+            winner.task = task
+            self.index.remove(task)
+            self.assigned += 1
+            self.auction_log = f"TASK #{task.id} -> A{winner.id} (${winning_bid}) | Bids: {len(task_bids)}"
+
+        # Tasks nobody bought wait for the next round; tasks nobody could reach stay due
+        for task in offered:
+            if task not in bids:
+                task.next_auction = self.ticks + REBID_INTERVAL
+
+    def step(self):
+        """Advances the market by one tick."""
+        self.ticks += 1
+
+        # 1. Spawn while the market has room
+        self.task_delay_timer += 1
+        free = self.max_open_tasks - len(self.index) - self.assigned
+        if self.task_delay_timer >= self.spawn_interval and free > 0:
+            for _ in range(min(free, self.spawn_batch) if self.spawn_batch else free):
+                self.spawn_task()
+            self.task_delay_timer = 0
+
+        # 2. Overlapping auctions for every task that is due
+        self.run_auctions()
+
+        # 3. Agents work their own tasks
+        for agent in self.agents:
+            if agent.task is not None and (agent.state == "MOVING_TO_TASK" or agent.state == "WORKING"):
+                if agent.update(agent.task):
+                    agent.task = None
+                    self.assigned -= 1
+                    self.tasks_completed += 1
+            else:
+                agent.update(None)
+
+        # 4. Drop tasks that stayed unsold for too long
+        if self.ticks % REBID_INTERVAL == 0:
+            for cell in list(self.index.cells.values()):
+                for task in list(cell):
+                    if self.ticks - task.opened > TASK_TTL:
+                        self.index.remove(task)
+                        self.tasks_expired += 1
+
+    def visible_tasks(self):
+        open_tasks = [task for cell in self.index.cells.values() for task in cell]
+        return open_tasks + [agent.task for agent in self.agents if agent.task is not None]
+
+def run_marketplace(ticks, num_agents=4, max_open_tasks=MAX_OPEN_TASKS, seed=None, **kwargs):
+    rng = random.Random(seed)
+    engine = Marketplace(spread_agents(num_agents, rng), seed=rng.random(),
+                         max_open_tasks=max_open_tasks, **kwargs)
+    engine.run(ticks)
+    return {
+        'ticks': engine.ticks,
+        'tasks_completed': engine.tasks_completed,
+        'tasks_expired': engine.tasks_expired,
+        'throughput': engine.tasks_completed / max(1, engine.ticks),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-task marketplace with overlapping auctions")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--ticks", type=int, default=FPS * 600)
+    parser.add_argument("--ticks-per-frame", type=int, default=1)
+    parser.add_argument("--agents", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=MAX_OPEN_TASKS, help="max open tasks at once")
+    parser.add_argument("--spawn-interval", type=int, default=SPAWN_INTERVAL, help="ticks between spawns")
+    parser.add_argument("--spawn-batch", type=int, default=SPAWN_BATCH,
+                        help="tasks per spawn (0 refills every free slot)")
+    parser.add_argument("--radius", type=float, default=BID_RADIUS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--mechanism", choices=sorted(clearing.MECHANISMS), default="first")
+    parser.add_argument("--reserve", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.headless:
+        stats = run_marketplace(args.ticks, args.agents, args.tasks, args.seed, bid_radius=args.radius,
+                                mechanism=args.mechanism, reserve=args.reserve,
+                                spawn_interval=args.spawn_interval, spawn_batch=args.spawn_batch)
+        print(f"Ticks: {stats['ticks']} | Completed: {stats['tasks_completed']} | "
+              f"Expired: {stats['tasks_expired']} | Tasks/tick: {stats['throughput']:.4f}")
+    else:
+        rng = random.Random(args.seed)
+        engine = Marketplace(spread_agents(args.agents, rng), seed=rng.random(),
+                             max_open_tasks=args.tasks, bid_radius=args.radius,
+                             mechanism=args.mechanism, reserve=args.reserve,
+                             spawn_interval=args.spawn_interval, spawn_batch=args.spawn_batch)
+        main(args.ticks_per_frame, engine=engine)
@@ -0,0 +1,265 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from grid_topology import GridTopology
+from treasurehunt import EMPTY, STRATEGIES, TREASURE, WALL, run_search
+
+# --- Maze Generation ---
+# Mazes use treasurehunt's encoding in a uint8 array. Rooms sit at odd (row, col)
+# coordinates with a wall cell between neighbouring rooms, so an R x C maze has
+# (R - 1) // 2 x (C - 1) // 2 rooms; an even size keeps a solid last row/column.
+# Generators only pick which walls between rooms to open (as pairs of flat room
+# indices); carve() applies them in one array assignment.
+
+def room_shape(rows, cols):
+    return (rows - 1) // 2, (cols - 1) // 2
+
+def carve(rows, cols, a, b):
+    """Solid maze with every room open plus the passages between rooms a[i] and b[i]."""
+    h, w = room_shape(rows, cols)
+    maze = np.full((rows, cols), WALL, dtype=np.uint8)
+    maze[1:2 * h:2, 1:2 * w:2] = EMPTY
+    ra, ca = np.divmod(np.asarray(a, dtype=np.int64), w)
+    rb, cb = np.divmod(np.asarray(b, dtype=np.int64), w)
+    maze[ra + rb + 1, ca + cb + 1] = EMPTY
+    return maze
+
+def backtracker(rows, cols, rng):
+    """Randomized depth-first search with an explicit stack: long, winding corridors."""
+    h, w = room_shape(rows, cols)
+    n = h * w
+    draws = rng.random(n).tolist()
+    visited = bytearray(n)
+    start = int(rng.integers(n))
+    visited[start] = 1
+    stack = [start]
+    a, b = [], []
+
+    while stack:
+        room = stack[-1]
+        r, c = divmod(room, w)
+        options = []
+        if r > 0 and not visited[room - w]:
+            options.append(room - w)
+        if r < h - 1 and not visited[room + w]:
+            options.append(room + w)
+        if c > 0 and not visited[room - 1]:
+            options.append(room - 1)
+        if c < w - 1 and not visited[room + 1]:
+            options.append(room + 1)
+        if not options:
+            stack.pop()
+            continue
+        nxt = options[int(draws[len(a)] * len(options))]
+        visited[nxt] = 1
+        a.append(room)
+        b.append(nxt)
+        stack.append(nxt)
+    return carve(rows, cols, a, b)
+
+def kruskal(rows, cols, rng):
+    """Randomized Kruskal: walls opened in shuffled order unless already connected. Many short dead ends."""
+    h, w = room_shape(rows, cols)
+    rooms = np.arange(h * w).reshape(h, w)
+    first = np.concatenate([rooms[:, :-1].ravel(), rooms[:-1, :].ravel()])
+    second = np.concatenate([rooms[:, 1:].ravel(), rooms[1:, :].ravel()])
+    order = rng.permutation(len(first))
+
+    parent = list(range(h * w))
+    a, b = [], []
+    remaining = h * w - 1
+    for x, y in zip(first[order].tolist(), second[order].tolist()):
+        # Union-find with path halving
+        rx = x
+        while parent[rx] != rx:
+            parent[rx] = parent[parent[rx]]
+            rx = parent[rx]
+        ry = y
+        while parent[ry] != ry:
+            parent[ry] = parent[parent[ry]]
+            ry = parent[ry]
+        if rx != ry:
+            parent[rx] = ry
+            a.append(x)
+            b.append(y)
+            remaining -= 1
+            if not remaining:
+                break
+    return carve(rows, cols, a, b)
+
+def sidewinder(rows, cols, rng):
+    """
+    Sidewinder, fully vectorized, so 4096 x 4096 takes well under a second. Each row
+    is cut into random runs joined east-west and every run opens north from one
+    random member; the top row is one long corridor.
+    """
+    h, w = room_shape(rows, cols)
+    rooms = np.arange(h * w).reshape(h, w)
+    closes = rng.random((h, w)) < 0.5 # Run ends after this room
+    closes[0] = False
+    closes[:, -1] = True # Runs never wrap to the next row
+
+    east = rooms[:, :-1][~closes[:, :-1]]
+    if h == 1: # The top row has no north passages, so a single row is just the corridor
+        return carve(rows, cols, east, east + 1)
+    below = closes[1:].ravel()
+    starts = np.flatnonzero(np.r_[True, below[:-1]])
+    lengths = np.diff(np.r_[starts, len(below)])
+    north = starts + (rng.random(len(starts)) * lengths).astype(np.int64) + w
+    return carve(rows, cols, np.r_[east, north], np.r_[east + 1, north - w])
+
+GENERATORS = {
+    "backtracker": backtracker,
+    "kruskal": kruskal,
+    "sidewinder": sidewinder,
+}
+
+# Directions from a room to its walls, in treasurehunt's move order
+ROOM_STEPS = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)])
+
+def braid(maze, fraction, rng):
+    """
+    Returns a copy with a wall knocked out of `fraction` of the dead ends, picked
+    at random among walls that lead to another room. Adds loops, so a braided
+    maze has more than one route to the treasure.
+    """
+    maze = maze.copy()
+    h, w = room_shape(*maze.shape)
+    if fraction <= 0 or h == 0 or w == 0:
+        return maze
+    r = 2 * np.arange(h)[:, None] + 1
+    c = 2 * np.arange(w)[None, :] + 1
+    wall_r = np.broadcast_to(r[None] + ROOM_STEPS[:, 0, None, None], (4, h, w))
+    wall_c = np.broadcast_to(c[None] + ROOM_STEPS[:, 1, None, None], (4, h, w))
+    opened = maze[wall_r, wall_c] != WALL # (4, h, w)
+
+    room_r = np.arange(h)[None, :, None] + ROOM_STEPS[:, 0, None, None]
+    room_c = np.arange(w)[None, None, :] + ROOM_STEPS[:, 1, None, None]
+    inside = (room_r >= 0) & (room_r < h) & (room_c >= 0) & (room_c < w)
+
+    candidates = ~opened & inside
+    dead_ends = (opened.sum(axis=0) == 1) & candidates.any(axis=0) & (rng.random((h, w)) < fraction)
+    pick = np.where(candidates, rng.random(candidates.shape), -1.0).argmax(axis=0)
+    ys, xs = np.nonzero(dead_ends)
+    k = pick[ys, xs]
+    maze[wall_r[k, ys, xs], wall_c[k, ys, xs]] = EMPTY
+    return maze
+
+def generate(rows, cols=None, algorithm="backtracker", braid_fraction=0.0, seed=None):
+    """Seeded maze of the given size with no treasure placed yet."""
+    cols = rows if cols is None else cols
+    if min(rows, cols) < 3:
+        raise ValueError(f"A maze needs at least 3x3 cells, got {rows}x{cols}")
+    try:
+        generator = GENERATORS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm '{algorithm}'. Choose from: {', '.join(GENERATORS)}")
+    rng = np.random.default_rng(seed)
+    return braid(generator(rows, cols, rng), braid_fraction, rng)
+
+# --- Start Layouts ---
+
+LAYOUTS = ["corners", "same-corner", "random"]
+
+def layout_rooms(layout, h, w, rng):
+    """(start_1, start_2, treasure) as room coordinates."""
+    if layout == "corners": # Like the built-in maze: opposite corners, treasure in the middle
+        return (0, 0), (h - 1, w - 1), (h // 2, w // 2)
+    if layout == "same-corner": # Both agents far from the treasure
+        return (0, 0), (0, 1 % w), (h - 1, w - 1)
+    if layout == "random":
+        rooms = rng.choice(h * w, size=3, replace=False)
+        return tuple(divmod(int(room), w) for room in rooms)
+    raise ValueError(f"Unknown layout '{layout}'. Choose from: {', '.join(LAYOUTS)}")
+
+def place(maze, layout, seed=None):
+    """Returns (maze with treasure, start_1, start_2) in maze coordinates."""
+    h, w = room_shape(*maze.shape)
+    start_1, start_2, treasure = [(2 * r + 1, 2 * c + 1)
+                                  for r, c in layout_rooms(layout, h, w, np.random.default_rng(seed))]
+    maze = maze.copy()
+    maze[treasure] = TREASURE
+    return maze, start_1, start_2
+
+# --- Benchmark ---
+
+def benchmark(sizes, algorithms=tuple(GENERATORS), braids=(0.0,), layouts=("corners",),
+              strategies=("bfs",), seed=0):
+    """
+    Times run_search over every combination and returns one dict per run. The
+    neighbour table is built once per maze and left out of the search time.
+    """
+    results = []
+    for size in sizes:
+        for algorithm in algorithms:
+            for fraction in braids:
+                start = time.perf_counter()
+                maze = generate(size, size, algorithm, fraction, seed=[seed, size])
+                generate_s = time.perf_counter() - start
+                start = time.perf_counter()
+                topology = GridTopology.from_maze(maze, WALL) # Treasure placement does not move walls
+                topology_s = time.perf_counter() - start
+
+                for layout in layouts:
+                    placed, start_1, start_2 = place(maze, layout, seed=[seed, size])
+                    for strategy in strategies:
+                        np.random.seed(seed) # BFS shuffles with the global generator
+                        start = time.perf_counter()
+                        log = run_search(placed, start_1, start_2, max_steps=size * size, strategy=strategy,
+                                         topology=topology)
+                        search_s = time.perf_counter() - start
+                        results.append({
+                            'size': size,
+                            'algorithm': algorithm,
+                            'braid': fraction,
+                            'layout': layout,
+                            'strategy': strategy,
+                            'found': bool(log.winner),
+                            'steps': log.frames,
+                            'nodes_expanded': log.nodes_expanded,
+                            'generate_s': generate_s,
+                            'topology_s': topology_s,
+                            'search_s': search_s,
+                        })
+    return results
+
+def print_results(results):
+    print(f"{'Size':>5} | {'Algorithm':<11} | {'Braid':>5} | {'Layout':<11} | {'Strategy':<13} | {'Found':<5} | "
+          f"{'Steps':>8} | {'Expanded':>9} | {'Gen s':>6} | {'Search s':>8} | {'Nodes/s':>9}")
+    print("-" * 118)
+    for row in results:
+        rate = row['nodes_expanded'] / row['search_s'] if row['search_s'] else 0.0
+        print(f"{row['size']:>5} | {row['algorithm']:<11} | {row['braid']:>5.2f} | {row['layout']:<11} | "
+              f"{row['strategy']:<13} | {'yes' if row['found'] else 'no':<5} | {row['steps']:>8} | "
+              f"{row['nodes_expanded']:>9} | {row['generate_s']:>6.2f} | {row['search_s']:>8.3f} | {rate:>9.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Procedural mazes and a treasurehunt search benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[63, 255, 511])
+    parser.add_argument("--algorithms", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--braids", type=float, nargs="+", default=[0.0, 0.5],
+                        help="fraction of dead ends opened into loops")
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=["corners", "same-corner"])
+    parser.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES), default=["bfs", "astar"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON lines")
+    parser.add_argument("--generate-only", action="store_true", help="only time maze generation")
+    args = parser.parse_args()
+
+    if args.generate_only:
+        for size in args.sizes:
+            for algorithm in args.algorithms:
+                start = time.perf_counter()
+                maze = generate(size, size, algorithm, args.braids[0], seed=args.seed)
+                print(f"{algorithm:<11} {size}x{size}: {time.perf_counter() - start:.2f}s "
+                      f"({np.count_nonzero(maze == EMPTY)} open cells)")
+    else:
+        results = benchmark(args.sizes, args.algorithms, args.braids, args.layouts, args.strategies, args.seed)
+        print_results(results)
+        if args.json:
+            with open(args.json, "w") as f:
+                for row in results:
+                    f.write(json.dumps(row) + "\n")
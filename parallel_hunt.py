@@ -0,0 +1,232 @@
+import argparse
+import multiprocessing as mp
+import queue
+import threading
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from grid_topology import GridTopology
+from mazegen import GENERATORS, generate, place
+from treasurehunt import STRATEGIES, TREASURE, WALL
+
+# --- Shared Visited Map ---
+# One shared memory block per hunt: a small header followed by one owner byte per
+# cell (flat index, as in GridTopology). Owner 0 is unclaimed, agents are 1..K.
+#
+#   byte 0          id of the agent that found the treasure, 0 while searching
+#   bytes HEADER..  owner of every cell
+#
+# Claims are compare-on-write: an agent writes its id into an unclaimed cell and
+# keeps the cell only if it reads its own id back. That is not a true
+# compare-and-swap. Two agents can still both claim a cell if their writes
+# interleave, which costs one duplicate expansion. A cell is never lost, because
+# the last writer always reads back its own id.
+
+HEADER_BYTES = 8
+FOUND = 0
+MAX_AGENTS = 255
+START_TIMEOUT = 60 # Seconds for every worker to start and reach the barrier
+SEARCH_TIMEOUT = 3600 # Seconds for the search itself
+POLL_INTERVAL = 0.1 # Seconds between checks for crashed workers while waiting for results
+
+def explore(shm_name, topology, cells, start, agent_id, strategy, goal, seed, barrier, results):
+    """
+    Worker: one explorer process. Expands its own frontier and claims cells in the
+    shared owner map. It stops when it finds the treasure, when another agent
+    has, or when its frontier runs dry. Any exception is reported on the results
+    queue as {'agent', 'error'}, and the barrier is broken so nobody waits for
+    this worker.
+    """
+    shm = owners = None
+    try:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        state = shm.buf
+        owners = state[HEADER_BYTES:]
+        np.random.seed(seed) # BFS shuffles with the global generator
+        frontier = STRATEGIES[strategy](topology, goal)
+        frontier.push(start, None)
+        neighbours = topology.neighbours
+        claimed = 1
+        barrier.wait(START_TIMEOUT)
+
+        began = time.perf_counter()
+        while frontier and not state[FOUND]:
+            current = frontier.pop()
+            if cells[current] == TREASURE or frontier.reached(current):
+                if not state[FOUND]:
+                    state[FOUND] = agent_id
+                break
+            candidates = list(neighbours[current])
+            frontier.order(candidates)
+            for n in candidates:
+                if not owners[n]:
+                    owners[n] = agent_id
+                    if owners[n] == agent_id:
+                        frontier.push(n, current)
+                        claimed += 1
+        results.put({
+            'agent': agent_id,
+            'expanded': frontier.expanded,
+            'claimed': claimed,
+            'search_s': time.perf_counter() - began,
+        })
+    except threading.BrokenBarrierError:
+        # Someone else failed first; their error is the one worth reporting
+        results.put({'agent': agent_id, 'aborted': True})
+    except Exception:
+        barrier.abort()
+        results.put({'agent': agent_id, 'error': traceback.format_exc()})
+    finally:
+        if owners is not None:
+            owners.release() # close() refuses while slices of the buffer are alive
+        if shm is not None:
+            shm.close()
+
+def collect(workers, results, timeout):
+    """
+    One result per worker, sorted by agent. Raises RuntimeError when a worker
+    reports an error, dies without reporting, or the timeout runs out. Workers
+    that gave up at a broken barrier report {'agent', 'aborted'}.
+    """
+    deadline = time.perf_counter() + timeout
+    rows = []
+    while len(rows) < len(workers):
+        try:
+            row = results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            crashed = [(agent_id, w.exitcode) for agent_id, w in enumerate(workers, 1) if w.exitcode not in (None, 0)]
+            if crashed:
+                raise RuntimeError("Explorer(s) died without a result: "
+                                   + ", ".join(f"agent {a} (exit code {code})" for a, code in crashed))
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"Explorers gave no result within {timeout}s")
+            continue
+        if 'error' in row:
+            raise RuntimeError(f"Explorer {row['agent']} failed:\n{row['error']}")
+        rows.append(row)
+    return sorted(rows, key=lambda r: r['agent'])
+
+def spread_starts(maze_grid, num_agents, seed=None):
+    """
+    num_agents distinct open cells, drawn from one seeded permutation. The first
+    k starts are the same for every num_agents >= k, so runs with more agents only
+    add explorers.
+    """
+    open_cells = np.flatnonzero((maze_grid != WALL) & (maze_grid != TREASURE))
+    if num_agents > min(len(open_cells), MAX_AGENTS):
+        raise ValueError(f"Cannot place {num_agents} agents (at most {min(len(open_cells), MAX_AGENTS)})")
+    order = np.random.default_rng(seed).permutation(len(open_cells))
+    return [tuple(int(v) for v in divmod(int(i), maze_grid.shape[1])) for i in open_cells[order[:num_agents]]]
+
+def run_parallel_search(maze_grid, starts, strategy="bfs", seed=0, topology=None, timeout=SEARCH_TIMEOUT):
+    """
+    Runs one explorer process per start over a shared owner map and returns a
+    summary dict. The wall time covers the search only, from the moment every
+    process is ready to the last result. Process start-up and the topology
+    build are excluded. A worker that fails, crashes or misses the timeout
+    raises RuntimeError here, after every worker has been stopped.
+    """
+    if strategy not in STRATEGIES or strategy == "shared":
+        choices = [s for s in STRATEGIES if s != "shared"]
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from: {', '.join(choices)}")
+    if not 0 < len(starts) <= MAX_AGENTS:
+        raise ValueError(f"Need 1-{MAX_AGENTS} agents, got {len(starts)}")
+
+    topology = topology or GridTopology.from_maze(maze_grid, WALL)
+    cells = bytes(maze_grid.astype(np.uint8).ravel())
+    treasure = np.argwhere(maze_grid == TREASURE)
+    goal = tuple(int(v) for v in treasure[0]) if len(treasure) else None
+    start_cells = [topology.index(*start) for start in starts]
+
+    shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + topology.size)
+    try:
+        shm.buf[:HEADER_BYTES + topology.size] = bytes(HEADER_BYTES + topology.size)
+        for agent_id, cell in enumerate(start_cells, 1):
+            shm.buf[HEADER_BYTES + cell] = agent_id
+
+        ctx = mp.get_context()
+        barrier = ctx.Barrier(len(starts) + 1)
+        results = ctx.Queue()
+        workers = [ctx.Process(target=explore, args=(shm.name, topology, cells, cell, agent_id, strategy, goal,
+                                                     [seed, agent_id], barrier, results))
+                   for agent_id, cell in enumerate(start_cells, 1)]
+        try:
+            for worker in workers:
+                worker.start()
+            try:
+                barrier.wait(START_TIMEOUT)
+            except threading.BrokenBarrierError:
+                # A worker failed during set-up (its error is on the queue) or never arrived
+                collect(workers, results, START_TIMEOUT)
+                raise RuntimeError(f"Explorers did not all start within {START_TIMEOUT}s")
+            began = time.perf_counter()
+            # Drain the queue before joining, or a worker can block on a full pipe
+            per_agent = collect(workers, results, timeout)
+            wall_s = time.perf_counter() - began
+        finally:
+            for worker in workers:
+                if worker.pid is None: # Never started
+                    continue
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+
+        winner = shm.buf[FOUND]
+        owners = np.frombuffer(shm.buf, dtype=np.uint8, count=topology.size, offset=HEADER_BYTES)
+        owned = np.bincount(owners, minlength=len(starts) + 1)
+        del owners # Release the view before the block is closed
+    finally:
+        shm.close()
+        shm.unlink()
+
+    for row in per_agent:
+        row['owned'] = int(owned[row['agent']]) # Cells holding this agent's id at the end
+    expanded = sum(row['expanded'] for row in per_agent)
+    return {
+        'agents': len(starts),
+        'strategy': strategy,
+        'winner': winner,
+        'found': bool(winner),
+        'nodes_expanded': expanded,
+        'duplicate_claims': sum(row['claimed'] for row in per_agent) - int(owned[1:].sum()),
+        'wall_s': wall_s,
+        'per_agent': per_agent,
+    }
+
+def scaling(maze_grid, agent_counts, strategy="bfs", seed=0):
+    """
+    One parallel search per agent count on the same maze, with the topology built
+    once. Each row also has its speedup over the first count.
+    """
+    topology = GridTopology.from_maze(maze_grid, WALL)
+    rows = []
+    for count in agent_counts:
+        row = run_parallel_search(maze_grid, spread_starts(maze_grid, count, seed), strategy, seed, topology)
+        row['speedup'] = rows[0]['wall_s'] / row['wall_s'] if rows and row['wall_s'] else 1.0
+        rows.append(row)
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treasure hunt with one process per explorer")
+    parser.add_argument("--agents", type=int, nargs="+", default=[1, 2, 4], help="agent counts to compare")
+    parser.add_argument("--size", type=int, default=511)
+    parser.add_argument("--algorithm", choices=sorted(GENERATORS), default="backtracker")
+    parser.add_argument("--braid", type=float, default=0.0)
+    parser.add_argument("--strategy", choices=sorted(s for s in STRATEGIES if s != "shared"), default="bfs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    maze_grid, _, _ = place(generate(args.size, args.size, args.algorithm, args.braid, seed=args.seed),
+                            "corners", seed=args.seed)
+    print(f"{args.algorithm} {args.size}x{args.size}, {args.strategy}, {mp.cpu_count()} CPUs\n")
+    print(f"{'Agents':>6} | {'Winner':>6} | {'Expanded':>9} | {'Dupes':>5} | {'Wall s':>7} | "
+          f"{'Nodes/s':>9} | {'Speedup':>7}")
+    print("-" * 68)
+    for row in scaling(maze_grid, args.agents, args.strategy, args.seed):
+        rate = row['nodes_expanded'] / row['wall_s'] if row['wall_s'] else 0.0
+        winner = row['winner'] if row['found'] else "-"
+        print(f"{row['agents']:>6} | {winner:>6} | {row['nodes_expanded']:>9} | {row['duplicate_claims']:>5} | "
+              f"{row['wall_s']:>7.3f} | {rate:>9.0f} | {row['speedup']:>6.2f}x")
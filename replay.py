@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+# --- Replay Format ---
+# A replay is a directory of raw arrays described by meta.json, so every array can
+# be opened with np.memmap and nothing is loaded until a frame asks for it.
+#
+#   keyframes       uint8 (K, H, W)  full cell state every keyframe_interval frames
+#   key_positions   int32 (K, A, 2)  agent (row, col) at each keyframe
+#   moves           int8+ (F-1, A, 2) per-step position deltas (dtype widens for big grids)
+#   change_cells    int32 (C,)       flat index of every cell that changed ...
+#   change_values   uint8 (C,)       ... and its new value
+#   change_offsets  int64 (F+1,)     frame f's changes are [offsets[f], offsets[f + 1])
+#   status          uint8 (F,)       index into meta['statuses'] per frame
+#
+# Cell values index meta['palette'], so the viewer needs no knowledge of the simulation.
+
+KEYFRAME_INTERVAL = 100
+META_FILE = "meta.json"
+
+class ReplayRecorder:
+    """
+    Streams a run to disk one frame at a time. Only the previous frame is kept in
+    memory; changes are found by diffing against it.
+    """
+    def __init__(self, path, cells, positions, palette, agent_colors, title="",
+                 statuses=("",), keyframe_interval=KEYFRAME_INTERVAL):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.prev_cells = np.array(cells, dtype=np.uint8)
+        self.prev_positions = np.array(positions, dtype=np.int32)
+        self.keyframe_interval = keyframe_interval
+        self.move_dtype = np.min_scalar_type(-max(self.prev_cells.shape))
+        self.meta = {
+            'title': title,
+            'rows': self.prev_cells.shape[0],
+            'cols': self.prev_cells.shape[1],
+            'num_agents': len(self.prev_positions),
+            'palette': list(palette),
+            'agent_colors': list(agent_colors),
+            'statuses': list(statuses),
+            'keyframe_interval': keyframe_interval,
+        }
+        self.files = {name: open(os.path.join(path, name + ".bin"), "wb")
+                      for name in ("keyframes", "key_positions", "moves", "change_cells",
+                                   "change_values", "change_offsets", "status")}
+        self.frames = 0
+        self.num_changes = 0
+        self.write("change_offsets", np.zeros(2, dtype=np.int64)) # frame 0 has no changes
+        self.write_frame(status=0)
+
+    def write(self, name, array):
+        self.files[name].write(np.ascontiguousarray(array).tobytes())
+
+    def write_frame(self, status):
+        if self.frames % self.keyframe_interval == 0:
+            self.write("keyframes", self.prev_cells)
+            self.write("key_positions", self.prev_positions)
+        self.write("status", np.array([status], dtype=np.uint8))
+        self.frames += 1
+
+    def record(self, cells, positions, status=0):
+        """Appends the state after one step."""
+        cells = np.asarray(cells)
+        positions = np.array(positions, dtype=np.int32)
+
+        changed = np.flatnonzero(cells != self.prev_cells)
+        self.write("change_cells", changed.astype(np.int32))
+        self.write("change_values", cells.ravel()[changed].astype(np.uint8))
+        self.num_changes += len(changed)
+        self.write("change_offsets", np.array([self.num_changes], dtype=np.int64))
+        self.write("moves", (positions - self.prev_positions).astype(self.move_dtype))
+
+        self.prev_cells[...] = cells
+        self.prev_positions = positions
+        self.write_frame(status)
+
+    def close(self):
+        rows, cols, agents = self.meta['rows'], self.meta['cols'], self.meta['num_agents']
+        keyframes = (self.frames - 1) // self.keyframe_interval + 1
+        self.meta['frames'] = self.frames
+        self.meta['arrays'] = {
+            'keyframes': ['uint8', [keyframes, rows, cols]],
+            'key_positions': ['int32', [keyframes, agents, 2]],
+            'moves': [self.move_dtype.name, [self.frames - 1, agents, 2]],
+            'change_cells': ['int32', [self.num_changes]],
+            'change_values': ['uint8', [self.num_changes]],
+            'change_offsets': ['int64', [self.frames + 1]],
+            'status': ['uint8', [self.frames]],
+        }
+        for f in self.files.values():
+            f.close()
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(self.meta, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Replay:
+    """
+    Read side of a replay directory. frame(t) seeks from the nearest keyframe at or
+    before t, and stepping forward one frame at a time only applies that frame's
+    changes, so playback and scrubbing never re-simulate anything.
+    """
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.arrays = {}
+        for name, (dtype, shape) in self.meta['arrays'].items():
+            if np.prod(shape) == 0: # np.memmap cannot map an empty file
+                self.arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                self.arrays[name] = np.memmap(os.path.join(path, name + ".bin"), dtype=dtype, mode="r",
+                                              shape=tuple(shape))
+        self.cursor = None
+        self.cells = None
+        self.positions = None
+
+    def __len__(self):
+        return self.meta['frames']
+
+    def seek(self, t):
+        interval = self.meta['keyframe_interval']
+        k = t // interval
+        self.cells = np.array(self.arrays['keyframes'][k])
+        self.positions = np.array(self.arrays['key_positions'][k])
+        self.apply(k * interval + 1, t + 1)
+        self.positions += self.arrays['moves'][k * interval:t].sum(axis=0, dtype=np.int32)
+        self.cursor = t
+
+    def apply(self, first, stop):
+        """Applies the cell changes of frames first..stop-1; later writes to a cell win."""
+        offsets = self.arrays['change_offsets']
+        start, end = offsets[first], offsets[stop]
+        if start == end:
+            return
+        cells = self.arrays['change_cells'][start:end][::-1]
+        values = self.arrays['change_values'][start:end][::-1]
+        _, last = np.unique(cells, return_index=True)
+        self.cells.ravel()[cells[last]] = values[last]
+
+    def frame(self, t):
+        """Returns (cells, positions, status) at frame t; the arrays are reused between calls."""
+        if not 0 <= t < len(self):
+            raise IndexError(f"Frame {t} out of range (0-{len(self) - 1})")
+        if self.cursor is not None and self.cursor < t <= self.cursor + 1:
+            self.apply(t, t + 1)
+            self.positions += self.arrays['moves'][t - 1]
+            self.cursor = t
+        elif t != self.cursor:
+            self.seek(t)
+        return self.cells, self.positions, self.meta['statuses'][self.arrays['status'][t]]
+
+# --- Viewer ---
+
+def view(replay, interval=100):
+    """Plays a replay with a slider to scrub to any frame; space pauses and resumes."""
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+    from matplotlib.colors import ListedColormap
+    from matplotlib.widgets import Slider
+
+    meta = replay.meta
+    fig, ax = plt.subplots(figsize=(8, 8.5))
+    fig.subplots_adjust(bottom=0.12)
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+    cells, positions, status = replay.frame(0)
+    palette = meta['palette']
+    img = ax.imshow(cells, cmap=ListedColormap(palette), vmin=0, vmax=len(palette) - 1, interpolation="nearest")
+    dots = ax.scatter(positions[:, 1], positions[:, 0], c=meta['agent_colors'], s=200, edgecolors='black')
+
+    slider = Slider(fig.add_axes([0.15, 0.04, 0.7, 0.03]), "Frame", 0, len(replay) - 1, valinit=0, valstep=1)
+    state = {'playing': True, 'updating': False}
+
+    def show(t):
+        cells, positions, status = replay.frame(t)
+        img.set_data(cells)
+        dots.set_offsets(positions[:, ::-1])
+        ax.set_title(f"{meta['title']} | Frame {t}/{len(replay) - 1} {status}".strip())
+        # Keep the slider in step with playback without re-entering show()
+        state['updating'] = True
+        slider.set_val(t)
+        state['updating'] = False
+        fig.canvas.draw_idle()
+
+    def on_slide(value):
+        if not state['updating']:
+            show(int(value))
+
+    def on_key(event):
+        if event.key == " ":
+            state['playing'] = not state['playing']
+
+    def tick(_):
+        if state['playing'] and replay.cursor < len(replay) - 1:
+            show(replay.cursor + 1)
+
+    slider.on_changed(on_slide)
+    fig.canvas.mpl_connect("key_press_event", on_key)
+    show(0)
+    ani = FuncAnimation(fig, tick, interval=interval, cache_frame_data=False)
+    plt.show()
+    return ani
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrub through a recorded cleaner or treasure hunt run")
+    parser.add_argument("path", help="replay directory")
+    parser.add_argument("--interval", type=int, default=100, help="milliseconds per frame during playback")
+    args = parser.parse_args()
+
+    view(Replay(args.path), args.interval)
@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import auction
+import cleaner
+from bid import AGENTS_CONFIG, run_batch_auction
+
+# --- Configuration ---
+CACHE_DIR = ".sweep_cache"
+CACHE_MAX_BYTES = 64 << 20
+
+# --- Simulations ---
+# A simulation is run(params, seed) -> dict of plain numbers and lists, plus its
+# default parameters and the source files its results depend on. Parameters in
+# UPPER_CASE are module constants that are patched for the duration of one point.
+
+def run_bid(params, seed):
+    config = [dict(c, risk_factor=params[f"risk.{i}"]) for i, c in enumerate(AGENTS_CONFIG)]
+    result = run_batch_auction(params['rounds'], seed=seed, agents_config=config, mechanism=params['mechanism'],
+                               reserve=params['reserve'])
+    won = result['winners'] >= 0
+    losses = np.bincount(result['winners'][won & (result['profits'] < 0)], minlength=len(config))
+    wins = result['wins']
+    return {
+        'balances': result['balances'].tolist(),
+        'wins': wins.tolist(),
+        'curse_rates': np.divide(losses, wins, out=np.zeros(len(wins)), where=wins > 0).tolist(),
+    }
+
+def run_auction(params, seed):
+    constants = {name: params[name] for name in params if name.isupper()}
+    originals = {name: getattr(auction, name) for name in constants}
+    try:
+        for name, value in constants.items():
+            setattr(auction, name, tuple(value) if isinstance(value, list) else value)
+        stats = auction.run_headless(params['ticks'], seed, params['mechanism'], params['reserve'])
+    finally:
+        for name, value in originals.items():
+            setattr(auction, name, value)
+    return {'tasks_completed': stats['tasks_completed'], 'balances': list(stats['balances'].values())}
+
+def run_cleaner(params, seed):
+    results = cleaner.run_batch(params['rooms'], params['steps'], seed=seed, grid_size=params['grid_size'],
+                                dirt_density=params['dirt_density'], num_agents=params['agents'],
+                                negotiation=params['negotiation'])
+    finished = [r['steps_to_clean'] for r in results if r['clean']]
+    return {
+        'clean_rate': len(finished) / len(results),
+        'makespan_mean': float(np.mean(finished)) if finished else None,
+        'moves_mean': float(np.mean([sum(a['moves_made'] for a in r['agents']) for r in results])),
+    }
+
+SIMULATIONS = {
+    "bid": {
+        'run': run_bid,
+        'defaults': {'rounds': 10000, 'mechanism': "first", 'reserve': None,
+                     **{f"risk.{i}": c['risk_factor'] for i, c in enumerate(AGENTS_CONFIG)}},
+        'sources': ["bid.py", "clearing.py"],
+    },
+    "auction": {
+        'run': run_auction,
+        'defaults': {'ticks': 36000, 'mechanism': "first", 'reserve': None,
+                     'ANIMATION_SPEED': auction.ANIMATION_SPEED,
+                     'VALUATION_SKILL_RANGE': list(auction.VALUATION_SKILL_RANGE),
+                     'GREED_RANGE': list(auction.GREED_RANGE),
+                     'AGGRESSIVENESS_RANGE': list(auction.AGGRESSIVENESS_RANGE)},
+        'sources': ["auction.py", "clearing.py"],
+    },
+    "cleaner": {
+        'run': run_cleaner,
+        'defaults': {'rooms': 100, 'steps': 200, 'grid_size': cleaner.GRID_SIZE,
+                     'dirt_density': cleaner.DIRT_DENSITY, 'agents': 2, 'negotiation': "split"},
+        'sources': ["cleaner.py", "grid_topology.py"],
+    },
+}
+
+def simulation(name):
+    try:
+        return SIMULATIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown simulation '{name}'. Choose from: {', '.join(SIMULATIONS)}")
+
+def code_version(name):
+    """Hash of the source files a simulation's results depend on, this driver included."""
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for source in simulation(name)['sources'] + ["sweep.py"]:
+        with open(os.path.join(here, source), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def point_key(name, params, seed, version):
+    blob = json.dumps({'simulation': name, 'params': params, 'seed': seed, 'version': version}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+def run_point(name, params, seed):
+    """Worker: one (params, seed) point of one simulation."""
+    return simulation(name)['run'](params, seed)
+
+# --- Result Cache ---
+
+class ResultCache:
+    """
+    Content-addressed results on disk: one JSON file per key, fanned out into
+    256 subdirectories. Once the cache grows past max_bytes, the least
+    recently used entries are deleted. A hit refreshes the entry's mtime.
+    """
+    def __init__(self, path=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.size = sum(entry[1] for entry in self.entries())
+
+    def file(self, key):
+        return os.path.join(self.path, key[:2], key + ".json")
+
+    def entries(self):
+        """(path, bytes, mtime) of every cached result."""
+        if not os.path.isdir(self.path):
+            return []
+        found = []
+        for shard in os.scandir(self.path):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        found.append((entry.path, stat.st_size, stat.st_mtime))
+        return found
+
+    def get(self, key):
+        try:
+            with open(self.file(key)) as f:
+                value = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        os.utime(self.file(key))
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        path = self.file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(value)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        # Write then rename, so an interrupted sweep never leaves a half-written entry
+        with open(path + ".tmp", "w") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        self.size += len(data) - previous
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache is under 90% of max_bytes."""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        self.size = sum(entry[1] for entry in entries)
+        for path, size, _ in entries:
+            if self.size <= 0.9 * self.max_bytes:
+                break
+            os.remove(path)
+            self.size -= size
+            self.evicted += 1
+
+# --- Sweep Driver ---
+
+def expand_grid(grid):
+    """Every combination of a {name: [values]} grid, in a stable order."""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def sweep(name, grid, seeds=(0,), cache=None, workers=None):
+    """
+    Runs every grid point for every seed and returns one row per (point, seed).
+    Points found in the cache are not recomputed. The rest are fanned out
+    over a process pool and stored in the cache as they come back.
+    """
+    sim = simulation(name)
+    unknown = set(grid) - set(sim['defaults'])
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) {', '.join(sorted(unknown))} for '{name}'. "
+                         f"Choose from: {', '.join(sim['defaults'])}")
+    cache = cache if cache is not None else ResultCache()
+    version = code_version(name)
+
+    rows, pending = [], []
+    for point in expand_grid(grid):
+        params = {**sim['defaults'], **point}
+        for seed in seeds:
+            key = point_key(name, params, seed, version)
+            row = {'point': point, 'seed': seed, 'key': key, 'result': cache.get(key), 'cached': True}
+            if row['result'] is None:
+                row['cached'] = False
+                pending.append((row, params))
+            rows.append(row)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_point, name, params, row['seed']) for row, params in pending]
+            for (row, _), future in zip(pending, futures):
+                row['result'] = future.result()
+                cache.put(row['key'], row['result'])
+    return rows
+
+def parse_param(text):
+    """NAME=JSON_LIST, e.g. dirt_density=[0.1,0.2] or GREED_RANGE=[[0.1,0.3],[0.2,0.5]]."""
+    name, _, values = text.partition("=")
+    values = json.loads(values)
+    return name, values if isinstance(values, list) else [values]
+
+def format_value(value):
+    if isinstance(value, float):
+        return f"{value:.3g}"
+    if isinstance(value, list):
+        return "/".join(format_value(v) for v in value)
+    return str(value)
+
+def print_rows(rows):
+    for row in rows:
+        point = " ".join(f"{k}={format_value(v)}" for k, v in row['point'].items())
+        result = " ".join(f"{k}={format_value(v)}" for k, v in row['result'].items())
+        print(f"{'cached' if row['cached'] else 'ran':<6} | seed {row['seed']:<4} | {point} | {result}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parameter sweeps over the simulations with a result cache")
+    parser.add_argument("simulation", choices=sorted(SIMULATIONS))
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=JSON_LIST",
+                        help="grid axis, repeatable; omitted parameters keep their defaults")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--cache", default=CACHE_DIR, help="cache directory")
+    parser.add_argument("--cache-mb", type=float, default=CACHE_MAX_BYTES / (1 << 20))
+    parser.add_argument("--json", metavar="PATH", help="also write the rows as JSON lines")
+    args = parser.parse_args()
+
+    cache = ResultCache(args.cache, int(args.cache_mb * (1 << 20)))
+    rows = sweep(args.simulation, dict(parse_param(p) for p in args.param), args.seeds, cache, args.workers)
+    print_rows(rows)
+    print(f"\n{len(rows)} points | cached: {cache.hits} | computed: {cache.misses} | evicted: {cache.evicted}")
+    if args.json:
+        with open(args.json, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
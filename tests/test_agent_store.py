@@ -0,0 +1,24 @@
+import pytest
+
+import agent_store
+from auction import MarketEngine, run_headless
+
+def test_store_matches_object_model_tick_by_tick():
+    assert agent_store.check(count=100, ticks=1500, seed=1) < 1e-9
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_array_engine_matches_object_engine(seed):
+    objects = run_headless(20000, seed=seed, store="objects")
+    arrays = run_headless(20000, seed=seed, store="arrays")
+    assert objects['tasks_completed'] > 0
+    assert arrays == objects
+
+def test_array_engine_syncs_agents():
+    objects, _ = agent_store.run_engine(50, 3000, seed=4, store="objects")
+    arrays, _ = agent_store.run_engine(50, 3000, seed=4, store="arrays")
+    assert [a.state for a in arrays.agents] == [a.state for a in objects.agents]
+    assert [a.x for a in arrays.agents] == pytest.approx([a.x for a in objects.agents])
+
+def test_unknown_store():
+    with pytest.raises(ValueError, match="Choose from"):
+        MarketEngine(store="columns")
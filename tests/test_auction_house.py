@@ -0,0 +1,21 @@
+import pytest
+
+from auction_house import AsyncBidder, run_auction_house
+
+def standings(agents):
+    return [(a.name, a.wins, a.balance) for a in agents]
+
+def test_seed_reproduces_standings():
+    first = run_auction_house(30, deadline=0.5, mean_latency=0.005, seed=3)
+    second = run_auction_house(30, deadline=0.5, mean_latency=0.005, seed=3)
+    assert first[0].late_bids == second[0].late_bids == 0
+    assert standings(first[1]) == standings(second[1])
+
+def test_zero_latency_gets_every_bid_in():
+    house, agents = run_auction_house(20, mean_latency=0, seed=1)
+    assert house.late_bids == 0
+    assert len(house.arrival_latencies) == 20 * len(agents)
+
+def test_negative_latency_is_rejected():
+    with pytest.raises(ValueError):
+        AsyncBidder(None, mean_latency=-0.1)
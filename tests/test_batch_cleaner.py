@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from batch_cleaner import BatchCleaningSimulation
+from cleaner import column_strips, run_batch
+
+def test_zones_match_scalar_split():
+    for size in (7, 15, 16):
+        for num_agents in (1, 2, 3, 5):
+            sim = BatchCleaningSimulation(3, size, 0.3, seed=0, num_agents=num_agents)
+            assert [tuple(z) for z in sim.zones] == [z[2:] for z in column_strips(size, num_agents, size)]
+            assert sim.pos.shape == (3, num_agents, 2)
+
+def test_agents_stay_in_their_strips_and_clean_every_room():
+    sim = BatchCleaningSimulation(50, 12, 0.3, seed=1, num_agents=4)
+    initial = sim.dirt.sum(axis=(1, 2))
+    while sim.steps < 400 and (sim.remaining > 0).any():
+        sim.step()
+        cols = sim.pos[..., 1]
+        assert ((cols >= sim.zones[:, 0]) & (cols < sim.zones[:, 1])).all()
+    assert (sim.steps_to_clean >= 0).all()
+    assert (sim.cleaned_count.sum(axis=1) == initial).all()
+
+def test_n_agents_match_scalar_in_distribution():
+    batch = BatchCleaningSimulation(400, 12, 0.3, seed=2, num_agents=3).run(300)
+    scalar = run_batch(100, 300, seed=2, grid_size=12, dirt_density=0.3, num_agents=3)
+    batch_steps = batch['steps_to_clean'].mean()
+    scalar_steps = np.mean([r['steps_to_clean'] for r in scalar])
+    assert abs(batch_steps - scalar_steps) < 0.1 * scalar_steps
+
+def test_rejects_bad_agent_counts():
+    for num_agents in (0, 9):
+        with pytest.raises(ValueError):
+            BatchCleaningSimulation(2, 8, 0.3, seed=0, num_agents=num_agents)
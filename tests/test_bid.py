@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+import bid
+import clearing
+
+@pytest.mark.parametrize("mechanism", sorted(clearing.MECHANISMS))
+@pytest.mark.parametrize("reserve", [None, 250])
+def test_batch_engine_matches_scalar_engine(mechanism, reserve):
+    rounds = 2000
+    scalar = bid.run_auction(rounds, seed=11, headless=True, mechanism=mechanism, reserve=reserve)
+    batch = bid.run_batch_auction(rounds, seed=11, mechanism=mechanism, reserve=reserve)
+
+    rows = scalar['rounds']
+    np.testing.assert_array_equal(batch['true_values'], [r['true_value'] for r in rows])
+    np.testing.assert_array_equal(batch['bids'], [r['bids'] for r in rows])
+    np.testing.assert_array_equal(batch['winners'], [-1 if r['winner_id'] is None else r['winner_id'] for r in rows])
+    np.testing.assert_array_equal(batch['winning_bids'], [r['winning_bid'] or 0 for r in rows])
+    np.testing.assert_array_equal(batch['prices'], [r['price'] or 0 for r in rows])
+    np.testing.assert_array_equal(batch['profits'], [r['profit'] for r in rows])
+    assert batch['balances'].tolist() == [a.balance for a in scalar['agents']]
+    assert batch['wins'].tolist() == [a.wins for a in scalar['agents']]
+    if reserve is not None:
+        assert (batch['winners'] == -1).any()
+
+def test_batch_clearing_without_bidders():
+    winners, winning_bids, prices = clearing.clear_batch(np.zeros((4, 0), dtype=np.int64), "second")
+    assert winners.tolist() == [-1] * 4
+    assert winning_bids.tolist() == prices.tolist() == [0] * 4
+    result = bid.run_batch_auction(10, seed=0, agents_config=[])
+    assert (result['winners'] == -1).all() and result['balances'].tolist() == []
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import cleaner
+from cleaner import DIRT, CleaningSimulation, partition_zones
+
+def zone_dirt(grid, zone):
+    r0, r1, c0, c1 = zone
+    return int(np.count_nonzero(grid[r0:r1, c0:c1] == DIRT))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_partition_of_a_zone_tiles_it_and_balances_dirt(seed):
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((40, 50)) < 0.3).astype(np.uint8)
+    zone = (7, 33, 11, 45)
+    zones = partition_zones(grid, 5, zone)
+    covered = np.zeros(grid.shape, dtype=int)
+    for r0, r1, c0, c1 in zones:
+        assert zone[0] <= r0 < r1 <= zone[1] and zone[2] <= c0 < c1 <= zone[3]
+        covered[r0:r1, c0:c1] += 1
+    assert covered[7:33, 11:45].min() == covered.max() == 1
+    assert covered.sum() == 26 * 34
+    dirt = [zone_dirt(grid, z) for z in zones]
+    assert sum(dirt) == zone_dirt(grid, zone)
+    assert max(dirt) - min(dirt) <= 0.2 * max(dirt)
+
+def test_partition_ignores_dirt_outside_the_zone():
+    grid = np.zeros((20, 20), dtype=np.uint8)
+    grid[10:, 10:] = DIRT
+    zone = (0, 10, 0, 10)
+    inside = partition_zones(grid, 2, zone)
+    grid[:10, :10] = 0
+    grid[15:, :] = DIRT
+    assert partition_zones(grid, 2, zone) == inside
+
+def test_rejected_split_is_not_recomputed(monkeypatch):
+    sim = CleaningSimulation(grid_size=60, dirt_density=0.05, seed=2, num_agents=4, negotiation="balanced")
+    splits = []
+    original = cleaner.partition_zones
+
+    def counting(grid, num_zones, zone=None):
+        splits.append((zone, zone_dirt(grid, zone)))
+        return original(grid, num_zones, zone)
+    monkeypatch.setattr(cleaner, "partition_zones", counting)
+    sim.run(5000)
+    assert sim.remaining_dirt == 0
+    assert splits
+    # Each zone is split at most once per dirt count, however many agents sit idle
+    assert len(splits) == len(set(splits))
@@ -0,0 +1,68 @@
+import itertools
+import random
+import time
+
+import pytest
+
+import bid
+import clearing
+
+def brute_force(bids):
+    """Best revenue over every subset of non-overlapping packages."""
+    best = 0
+    for size in range(1, len(bids) + 1):
+        for chosen in itertools.combinations(bids, size):
+            items = [item for _, _, package in chosen for item in package]
+            if len(items) == len(set(items)):
+                best = max(best, sum(amount for amount, _, _ in chosen))
+    return best
+
+def random_packages(rng, num_bids, num_items, max_size):
+    """Package bids worth 1-100 per item, so large and small packages compete."""
+    bids = []
+    for i in range(num_bids):
+        items = rng.sample(range(num_items), rng.randint(1, min(max_size, num_items)))
+        bids.append((rng.randint(1, 100) * len(items), f"b{i}", items))
+    return bids
+
+@pytest.mark.parametrize("seed", range(30))
+def test_combinatorial_matches_brute_force(seed):
+    rng = random.Random(seed)
+    bids = random_packages(rng, rng.randint(1, 12), rng.randint(1, 6), 3)
+    accepted, revenue, optimal = clearing.clear_combinatorial(bids)
+    assert optimal
+    assert revenue == brute_force(bids) == sum(amount for amount, _, _ in accepted)
+    items = [item for _, _, package in accepted for item in package]
+    assert len(items) == len(set(items))
+
+def test_combinatorial_respects_time_budget():
+    rng = random.Random(0)
+    bids = random_packages(rng, 3000, 40, 5)
+    started = time.perf_counter()
+    accepted, revenue, optimal = clearing.clear_combinatorial(bids, time_budget=0.05)
+    elapsed = time.perf_counter() - started
+    assert not optimal
+    assert elapsed < 0.5
+    # The best solution so far is still a feasible allocation
+    items = [item for _, _, package in accepted for item in package]
+    assert len(items) == len(set(items))
+    assert revenue == sum(amount for amount, _, _ in accepted) > 0
+
+def test_multi_unit_pricing():
+    bids = [(50, "a"), (80, "b"), (80, "c"), (20, "d")]
+    first = clearing.clear_multi_unit(bids, 2)
+    assert [(o['winner'], o['price']) for o in first] == [("b", 80), ("c", 80)]
+    uniform = clearing.clear_multi_unit(bids, 3, "uniform")
+    assert [(o['winner'], o['price']) for o in uniform] == [("b", 20), ("c", 20), ("a", 20)]
+    assert clearing.clear_multi_unit(bids, 2, "uniform", reserve=60)[0]['price'] == 60
+    with pytest.raises(ValueError, match="Choose from"):
+        clearing.clear_multi_unit(bids, 2, "dutch")
+
+@pytest.mark.parametrize("mechanism", clearing.MULTI_LOT_MECHANISMS)
+def test_multi_lot_auction_is_reproducible(mechanism):
+    first = bid.run_multi_lot_auction(50, seed=3, mechanism=mechanism)
+    second = bid.run_multi_lot_auction(50, seed=3, mechanism=mechanism)
+    assert first['rounds'] == second['rounds']
+    for r in first['rounds']:
+        items = [item for sale in r['sales'] for item in sale['items']]
+        assert len(items) == len(set(items)) <= bid.NUM_LOTS
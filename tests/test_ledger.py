@@ -0,0 +1,108 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import ledger
+from bid import run_batch_auction
+from ledger import Ledger
+
+AGENTS = ["a", "b", "c"]
+
+def random_lots(rng, rows, first_round=1):
+    """Columns of `rows` random lots, with a few unsold ones."""
+    bids = rng.integers(0, 600, size=(rows, len(AGENTS)))
+    winners = np.where(rng.random(rows) < 0.1, -1, bids.argmax(axis=1))
+    sold = winners >= 0
+    winning = np.where(sold, bids.max(axis=1), 0)
+    values = rng.integers(100, 501, size=rows)
+    profits = np.where(sold, values - winning, 0)
+    return np.arange(first_round, first_round + rows), values, bids, winners, winning, winning, profits
+
+def fill(target, lots, by_row=False):
+    if by_row:
+        for row in zip(*lots):
+            target.append(*row)
+    else:
+        target.extend(*lots)
+
+def assert_same(actual, expected):
+    for name in ledger.COLUMNS:
+        np.testing.assert_array_equal(actual.column(name), expected.column(name), err_msg=name)
+    assert actual.summary() == expected.summary()
+    np.testing.assert_array_equal(actual.pnl_curves(), expected.pnl_curves())
+
+def test_append_and_extend_agree_across_chunks():
+    rng = np.random.default_rng(0)
+    lots = random_lots(rng, 250)
+    rows, batch = Ledger(AGENTS, chunk_rows=64), Ledger(AGENTS, chunk_rows=64)
+    fill(rows, lots, by_row=True)
+    fill(batch, lots)
+    assert len(rows) == len(batch) == 250
+    assert_same(rows, batch)
+
+@pytest.mark.parametrize("chunk_rows", [7, 64, 1 << 16])
+def test_save_open_append_matches_in_memory(tmp_path, chunk_rows):
+    rng = np.random.default_rng(1)
+    first, second = random_lots(rng, 300), random_lots(rng, 150, first_round=301)
+    memory = Ledger(AGENTS, chunk_rows)
+    fill(memory, first)
+
+    memory.save(tmp_path / "trades")
+    reopened = Ledger.open(tmp_path / "trades", chunk_rows)
+    assert isinstance(reopened.column('bids'), np.memmap)
+    assert_same(reopened, memory)
+
+    # Appends after open go to fresh in-memory chunks behind the mapped ones
+    fill(memory, second)
+    fill(reopened, second, by_row=True)
+    assert len(reopened) == 450
+    assert_same(reopened, memory)
+
+def test_save_back_over_the_mapped_source(tmp_path):
+    rng = np.random.default_rng(2)
+    first, second = random_lots(rng, 200), random_lots(rng, 100, first_round=201)
+    memory = Ledger(AGENTS, chunk_rows=64)
+    fill(memory, first)
+    memory.save(tmp_path)
+
+    reopened = Ledger.open(tmp_path, chunk_rows=64)
+    fill(memory, second)
+    fill(reopened, second)
+    reopened.save(tmp_path)
+    # The mapped chunk still reads the old data, and the files hold all of it
+    assert_same(reopened, memory)
+    assert_same(Ledger.open(tmp_path), memory)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(ledger.TMP_SUFFIX)]
+
+def test_save_narrows_dtypes(tmp_path):
+    trades = Ledger(AGENTS)
+    trades.append(1, 300, [0, 250, 120], 1, 250, 250, 50)
+    trades.append(2, 200, [0, 0, 0], -1, 0, 0, 0)
+    trades.append(3, 100, [90, 0, 110], 2, 110, 110, -10)
+    trades.save(tmp_path / "small")
+    with open(os.path.join(tmp_path / "small", ledger.META_FILE)) as f:
+        arrays = json.load(f)['arrays']
+    assert arrays['round'][0] == "uint8"
+    assert arrays['true_value'][0] == "uint16"
+    assert arrays['winner'][0] == "int8" # -1 marks an unsold lot
+    assert arrays['profit'][0] == "int8"
+    assert arrays['bids'] == ["uint8", [3, 3]]
+    assert_same(Ledger.open(tmp_path / "small"), trades)
+
+def test_empty_ledger_round_trip(tmp_path):
+    empty = Ledger(AGENTS)
+    empty.save(tmp_path / "empty")
+    reopened = Ledger.open(tmp_path / "empty")
+    assert len(reopened) == 0
+    assert reopened.summary() == empty.summary()
+    reopened.append(1, 150, [0, 10, 20], 2, 20, 20, 130)
+    assert reopened.balances().tolist() == [0, 0, 130]
+
+def test_from_batch_matches_batch_result():
+    result = run_batch_auction(2000, seed=5)
+    trades = ledger.from_batch(result)
+    assert trades.wins().tolist() == result['wins'].tolist()
+    assert trades.balances().tolist() == result['balances'].tolist()
+    np.testing.assert_array_equal(trades.pnl_curves()[-1], result['balances'])
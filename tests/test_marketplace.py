@@ -0,0 +1,53 @@
+import math
+import random
+
+import pytest
+
+from marketplace import Marketplace, SpatialGrid, run_marketplace, spread_agents
+
+class Point:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+def brute_force(points, x, y, radius):
+    return sorted((math.hypot(p.x - x, p.y - y), id(p)) for p in points if math.hypot(p.x - x, p.y - y) <= radius)
+
+@pytest.mark.parametrize("cell_size", [7, 50, 400])
+def test_spatial_grid_matches_brute_force(cell_size):
+    rng = random.Random(cell_size)
+    grid = SpatialGrid(cell_size)
+    points = [Point(rng.uniform(-50, 1050), rng.uniform(-50, 750)) for _ in range(500)]
+    for p in points:
+        grid.insert(p)
+    # Churn, so removals leave empty cells behind in between
+    for p in rng.sample(points, 200):
+        grid.remove(p)
+        points.remove(p)
+    assert len(grid) == len(points)
+
+    for _ in range(200):
+        x, y, radius = rng.uniform(-100, 1100), rng.uniform(-100, 800), rng.choice([0, 5, 60, 300, 2000])
+        found = grid.query(x, y, radius)
+        assert sorted((dist, id(p)) for dist, p in found) == brute_force(points, x, y, radius)
+        if found:
+            nearest = min(found, key=lambda pair: pair[0])
+            assert nearest[0] == min(math.hypot(p.x - x, p.y - y) for p in points)
+
+def test_spawn_batch_lifts_the_throughput_cap():
+    slow = run_marketplace(3000, num_agents=60, max_open_tasks=300, seed=1)
+    fast = run_marketplace(3000, num_agents=60, max_open_tasks=300, seed=1, spawn_interval=1, spawn_batch=0)
+    assert slow['throughput'] <= 0.1
+    assert fast['throughput'] > 2 * slow['throughput']
+
+def test_spawn_never_exceeds_capacity():
+    rng = random.Random(0)
+    engine = Marketplace(spread_agents(10, rng), seed=1, max_open_tasks=25, spawn_interval=1, spawn_batch=0)
+    for _ in range(500):
+        engine.step()
+        assert len(engine.index) + engine.assigned <= 25
+
+def test_invalid_spawn_settings():
+    with pytest.raises(ValueError):
+        Marketplace(spawn_interval=0)
+    with pytest.raises(ValueError):
+        Marketplace(spawn_batch=-1)
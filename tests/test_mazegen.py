@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from grid_topology import GridTopology
+from mazegen import GENERATORS, generate, room_shape
+from treasurehunt import EMPTY, WALL
+
+SMALL_SIZES = [(rows, cols) for rows in range(3, 12) for cols in range(3, 12)]
+
+@pytest.mark.parametrize("algorithm", sorted(GENERATORS))
+@pytest.mark.parametrize("rows, cols", SMALL_SIZES)
+def test_border_stays_wall(algorithm, rows, cols):
+    for seed in range(3):
+        maze = generate(rows, cols, algorithm, seed=seed)
+        assert maze.shape == (rows, cols)
+        border = np.r_[maze[0], maze[-1], maze[:, 0], maze[:, -1]]
+        assert (border == WALL).all(), f"{algorithm} {rows}x{cols} seed {seed}"
+
+@pytest.mark.parametrize("algorithm", sorted(GENERATORS))
+@pytest.mark.parametrize("rows, cols", [(3, 9), (9, 3), (5, 5), (31, 47)])
+def test_every_room_is_reachable(algorithm, rows, cols):
+    """A perfect maze: one passage fewer than rooms, and all rooms connected."""
+    maze = generate(rows, cols, algorithm, seed=1)
+    h, w = room_shape(rows, cols)
+    assert int(np.count_nonzero(maze == EMPTY)) == 2 * h * w - 1
+    topology = GridTopology.from_maze(maze, WALL)
+    start = topology.index(1, 1)
+    seen, frontier = {start}, [start]
+    while frontier:
+        for n in topology.neighbours[frontier.pop()]:
+            if n not in seen:
+                seen.add(n)
+                frontier.append(n)
+    assert len(seen) == 2 * h * w - 1
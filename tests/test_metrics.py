@@ -0,0 +1,105 @@
+import time
+
+import numpy as np
+import pytest
+
+import bid
+import metrics
+
+class Worker:
+    def step(self):
+        return 42
+
+@pytest.fixture
+def registry():
+    registry = metrics.Registry()
+    yield registry
+    registry.disable()
+
+def test_enable_is_idempotent(registry):
+    original = Worker.step
+    hooks = [(Worker, "step", "worker.step")]
+    registry.enable(hooks)
+    registry.enable(hooks)
+    assert Worker().step() == 42
+    assert registry.histograms["worker.step"].count == 1
+    registry.disable()
+    assert Worker.step is original
+
+def test_disabled_registry_records_nothing(registry):
+    with registry.timer("block"):
+        pass
+    registry.count("calls")
+    assert registry.snapshot() == {'counters': {}, 'timers': {}}
+
+# --- Histogram ---
+
+RELATIVE_ERROR = 2.0 ** -(metrics.SIGNIFICANT_BITS - 1)
+
+def test_bucket_range_contains_its_values():
+    h = metrics.Histogram()
+    for value in list(range(5000)) + [2 ** k + d for k in range(12, 40) for d in (-1, 0, 1)]:
+        low, high = h.bucket_range(h.bucket(value))
+        assert low <= value < high
+        assert high - low <= max(1, value * RELATIVE_ERROR)
+
+@pytest.mark.parametrize("sigma", [0.5, 2.0])
+def test_quantiles_match_numpy_within_stated_error(sigma):
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(mean=12, sigma=sigma, size=200000).astype(np.int64) # ~160 us in ns
+    h = metrics.Histogram()
+    for value in values.tolist():
+        h.record(value)
+    assert (h.count, h.total, h.min, h.max) == (len(values), int(values.sum()), values.min(), values.max())
+    for q in metrics.QUANTILES + (0.0, 1.0):
+        exact = np.percentile(values, q * 100, method="nearest")
+        assert h.quantile(q) == pytest.approx(exact, rel=RELATIVE_ERROR)
+
+def test_small_values_are_exact():
+    h = metrics.Histogram()
+    for value in range(1, 101):
+        h.record(value)
+    assert h.quantile(0.5) == 50
+    assert h.quantile(0.99) == 99
+
+def test_merge_equals_recording_everything():
+    rng = np.random.default_rng(3)
+    first, second = rng.integers(0, 10 ** 9, size=(2, 5000)).tolist()
+    a, b, both = metrics.Histogram(), metrics.Histogram(), metrics.Histogram()
+    for value in first:
+        a.record(value)
+        both.record(value)
+    for value in second:
+        b.record(value)
+        both.record(value)
+    a.merge(b)
+    assert (a.counts, a.count, a.total, a.min, a.max) == (both.counts, both.count, both.total, both.min, both.max)
+    assert metrics.Histogram().quantile(0.5) is None
+
+# --- Instrumented simulations ---
+
+class SlowClock:
+    def now(self):
+        return 0.0
+
+    def sleep(self, seconds):
+        time.sleep(0.005)
+
+class SlowSink:
+    def handle(self, event, data):
+        time.sleep(0.005)
+
+def test_bid_phase_timers_exclude_sleeps_and_output():
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    try:
+        bid.run_auction(3, seed=1, sink=SlowSink(), clock=SlowClock())
+    finally:
+        metrics.disable()
+    timers = metrics.REGISTRY.snapshot()['timers']
+    metrics.REGISTRY.reset()
+    for phase in ("bid.spawn", "bid.collect", "bid.clear", "bid.settle"):
+        assert timers[phase]['count'] == 3
+        assert timers[phase]['max_s'] < 0.004, phase
+    assert timers['bid.render']['count'] == 3 * (len(bid.AGENTS_CONFIG) + 2)
+    assert timers['bid.render']['min_s'] >= 0.005
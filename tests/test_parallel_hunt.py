@@ -0,0 +1,58 @@
+import multiprocessing as mp
+import os
+import time
+
+import pytest
+
+import parallel_hunt
+from mazegen import generate, place
+from treasurehunt import BreadthFirst
+
+# Failing strategies are swapped into STRATEGIES, which only forked workers inherit
+pytestmark = pytest.mark.skipif(mp.get_start_method() != "fork", reason="needs the fork start method")
+
+@pytest.fixture
+def maze():
+    maze_grid, _, _ = place(generate(31, 31, "backtracker", seed=0), "corners", seed=0)
+    return maze_grid
+
+class FailsAtStart(BreadthFirst):
+    def __init__(self, topology, goal=None):
+        raise ValueError("broken frontier")
+
+class FailsMidSearch(BreadthFirst):
+    def pop(self):
+        if self.expanded == 5:
+            raise ValueError("lost the frontier")
+        return super().pop()
+
+def test_search_finds_treasure(maze):
+    result = parallel_hunt.run_parallel_search(maze, parallel_hunt.spread_starts(maze, 3, seed=0))
+    assert result['found']
+    assert len(result['per_agent']) == 3
+
+@pytest.mark.parametrize("strategy", [FailsAtStart, FailsMidSearch])
+def test_worker_error_raises(maze, monkeypatch, strategy):
+    monkeypatch.setitem(parallel_hunt.STRATEGIES, "bfs", strategy)
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError, match="ValueError"):
+        parallel_hunt.run_parallel_search(maze, parallel_hunt.spread_starts(maze, 3, seed=0))
+    assert time.perf_counter() - started < 10
+
+def test_crashed_worker_raises(maze, monkeypatch):
+    class Crashes(BreadthFirst):
+        def pop(self):
+            os._exit(3) # Dies without a traceback or a result
+    monkeypatch.setitem(parallel_hunt.STRATEGIES, "bfs", Crashes)
+    with pytest.raises(RuntimeError, match="exit code 3"):
+        parallel_hunt.run_parallel_search(maze, parallel_hunt.spread_starts(maze, 2, seed=0))
+
+def test_search_timeout(maze, monkeypatch):
+    class Stalls(BreadthFirst):
+        def pop(self):
+            time.sleep(60)
+    monkeypatch.setitem(parallel_hunt.STRATEGIES, "bfs", Stalls)
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError, match="no result within"):
+        parallel_hunt.run_parallel_search(maze, parallel_hunt.spread_starts(maze, 2, seed=0), timeout=0.5)
+    assert time.perf_counter() - started < 10
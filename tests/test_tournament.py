@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+import tournament
+
+def test_pool_size_does_not_change_results():
+    one = tournament.run_tournament(12, 200, seed=4, workers=1, seasons_per_task=12)
+    many = tournament.run_tournament(12, 200, seed=4, workers=2, seasons_per_task=5)
+    for a, b in zip(one, many):
+        assert a['season_win_rate'] == b['season_win_rate']
+        assert a['round_win_rate'] == b['round_win_rate']
+        assert np.isclose(a['balance_mean'], b['balance_mean'])
+        assert np.isclose(a['balance_var'], b['balance_var'])
+
+@pytest.mark.parametrize("kwargs", [{'num_seasons': 0}, {'rounds_per_season': 0}, {'seasons_per_task': 0}])
+def test_empty_tournament_is_rejected(kwargs):
+    with pytest.raises(ValueError):
+        tournament.run_tournament(**{'num_seasons': 2, 'rounds_per_season': 10, **kwargs})
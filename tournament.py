@@ -0,0 +1,121 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import clearing
+from bid import AGENTS_CONFIG, RESET_COLOR, run_batch_auction
+
+# --- Configuration ---
+NUM_SEASONS = 2000
+ROUNDS_PER_SEASON = 50
+SEASONS_PER_TASK = 100
+BASE_SEED = 2024
+
+def play_seasons(season_ids, rounds_per_season, base_seed, agents_config, mechanism="first", reserve=None):
+    """
+    Worker: plays a block of seasons and returns the partial statistics.
+    Season i is always seeded with (base_seed, i), so results do not depend on
+    how seasons are split across workers.
+    """
+    num_agents = len(agents_config)
+    balances = np.empty((len(season_ids), num_agents))
+    wins = np.zeros(num_agents, dtype=np.int64)
+    losses = np.zeros(num_agents, dtype=np.int64)
+    season_wins = np.zeros(num_agents, dtype=np.int64)
+
+    for row, season in enumerate(season_ids):
+        result = run_batch_auction(rounds_per_season, seed=[base_seed, season], agents_config=agents_config,
+                                   mechanism=mechanism, reserve=reserve)
+        balances[row] = result['balances']
+        wins += result['wins']
+        # Winner's curse: the round was won but the winner paid more than the task was worth
+        losses += np.bincount(result['winners'][result['profits'] < 0], minlength=num_agents)
+        season_wins[np.argmax(result['balances'])] += 1
+
+    return {
+        'seasons': len(season_ids),
+        'balance_mean': balances.mean(axis=0),
+        'balance_m2': ((balances - balances.mean(axis=0)) ** 2).sum(axis=0),
+        'wins': wins,
+        'losses': losses,
+        'season_wins': season_wins,
+    }
+
+def merge_partials(a, b):
+    """Combines two partial results (Chan's parallel mean/variance update)."""
+    n = a['seasons'] + b['seasons']
+    delta = b['balance_mean'] - a['balance_mean']
+    return {
+        'seasons': n,
+        'balance_mean': a['balance_mean'] + delta * b['seasons'] / n,
+        'balance_m2': a['balance_m2'] + b['balance_m2'] + delta ** 2 * a['seasons'] * b['seasons'] / n,
+        'wins': a['wins'] + b['wins'],
+        'losses': a['losses'] + b['losses'],
+        'season_wins': a['season_wins'] + b['season_wins'],
+    }
+
+def run_tournament(num_seasons=NUM_SEASONS, rounds_per_season=ROUNDS_PER_SEASON, seed=BASE_SEED,
+                   agents_config=AGENTS_CONFIG, workers=None, seasons_per_task=SEASONS_PER_TASK,
+                   mechanism="first", reserve=None):
+    """
+    Plays num_seasons independent auction seasons across a process pool and
+    reduces them into one row of statistics per strategy.
+    """
+    if num_seasons < 1 or rounds_per_season < 1 or seasons_per_task < 1:
+        raise ValueError(f"Need at least one season, round and season per task, got "
+                         f"{num_seasons}, {rounds_per_season} and {seasons_per_task}")
+    blocks = [range(start, min(start + seasons_per_task, num_seasons))
+              for start in range(0, num_seasons, seasons_per_task)]
+
+    total = None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_seasons, block, rounds_per_season, seed, agents_config, mechanism, reserve)
+                   for block in blocks]
+        # Merge in submission order so floating point results are reproducible
+        for future in futures:
+            partial = future.result()
+            total = partial if total is None else merge_partials(total, partial)
+
+    rows = []
+    for i, config in enumerate(agents_config):
+        wins = int(total['wins'][i])
+        rows.append({
+            'name': config['name'],
+            'strategy': config['strategy'],
+            'color': config['color'],
+            'season_win_rate': total['season_wins'][i] / num_seasons,
+            'round_win_rate': wins / (num_seasons * rounds_per_season),
+            'balance_mean': float(total['balance_mean'][i]),
+            'balance_var': float(total['balance_m2'][i] / max(1, num_seasons - 1)),
+            'curse_rate': total['losses'][i] / wins if wins else 0.0,
+        })
+    return rows
+
+def print_table(rows):
+    print(f"{'Agent':<15} | {'Strategy':<12} | {'Season Win':<10} | {'Round Win':<9} | "
+          f"{'Mean Bal':<10} | {'Std Bal':<9} | {'Curse %'}")
+    print("-" * 90)
+    for row in sorted(rows, key=lambda r: r['balance_mean'], reverse=True):
+        print(f"{row['color']}{row['name']:<15}{RESET_COLOR} | {row['strategy']:<12} | "
+              f"{row['season_win_rate']:<10.1%} | {row['round_win_rate']:<9.1%} | "
+              f"${row['balance_mean']:<9.0f} | {row['balance_var'] ** 0.5:<9.1f} | "
+              f"{row['curse_rate']:.1%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo tournament between bid.py strategies")
+    parser.add_argument("--seasons", type=int, default=NUM_SEASONS)
+    parser.add_argument("--rounds", type=int, default=ROUNDS_PER_SEASON)
+    parser.add_argument("--seed", type=int, default=BASE_SEED)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--mechanism", choices=sorted(clearing.MECHANISMS), default="first")
+    parser.add_argument("--reserve", type=int, default=None)
+    args = parser.parse_args()
+    if args.seasons < 1 or args.rounds < 1:
+        parser.error("--seasons and --rounds must be at least 1")
+
+    print(f"Running {args.seasons} seasons x {args.rounds} rounds on {args.workers} workers "
+          f"({args.mechanism}-price)...\n")
+    print_table(run_tournament(args.seasons, args.rounds, seed=args.seed, workers=args.workers,
+                               mechanism=args.mechanism, reserve=args.reserve))
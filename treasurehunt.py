@@ -1,13 +1,18 @@
+import argparse
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+import heapq
 from collections import deque
-import matplotlib.patches as patches
+
+import metrics
+from grid_topology import GridTopology
+from replay import ReplayRecorder
 
 # --- Configuration ---
 MAZE_SIZE = 15
 ANIMATION_INTERVAL = 400  # Milliseconds (Slower speed)
 MAX_STEPS = 300
+VICTORY_HOLD = 20  # Frames the animation pauses on the victory frame
 
 # Colors (Hex codes)
 COLOR_WALL = '#2C3E50'        # Dark Slate Blue
@@ -17,7 +22,6 @@ COLOR_AGENT_2 = '#3498DB'     # Peter River Blue
 COLOR_TRAIL_1 = '#F1948A'     # Light Red
 COLOR_TRAIL_2 = '#85C1E9'     # Light Blue
 COLOR_TREASURE = '#F1C40F'    # Sunflower Yellow
-COLOR_OVERLAP = '#9B59B6'     # Purple (where trails meet)
 
 # Map Constants
 EMPTY = 0
@@ -49,173 +53,468 @@ maze = np.array(grid_layout)
 START_1 = (1, 1)    # Top Left
 START_2 = (13, 13)  # Bottom Right
 
+# --- Search Strategies ---
+# A strategy is the agent's frontier: push(cell, parent) adds a discovered cell,
+# pop() hands back the next cell to expand, order() may reorder a cell's neighbours
+# before they are pushed, and reached(cell) lets a strategy end the search early.
+# Every frontier counts the nodes it expands.
+
+class BreadthFirst:
+    """Plain BFS; shuffling each cell's neighbours varies the order between runs."""
+    def __init__(self, topology, goal=None):
+        self.goal = goal
+        self.queue = deque()
+        self.expanded = 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def push(self, cell, parent):
+        self.queue.append(cell)
+
+    def pop(self):
+        self.expanded += 1
+        return self.queue.popleft()
+
+    def order(self, neighbours):
+        np.random.shuffle(neighbours)
+
+    def reached(self, cell):
+        return False
+
+class AStar(BreadthFirst):
+    """
+    Best-first on f = g + Manhattan distance to the treasure, kept in a binary heap.
+    Equal f goes to the deeper cell, which heads straight down open corridors.
+    """
+    def __init__(self, topology, goal=None):
+        super().__init__(topology, goal)
+        self.coords = topology.coords
+        self.heap = []
+        self.g = {}
+        self.pushes = 0 # FIFO among full ties
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, cell, parent):
+        g = self.g[parent] + 1 if parent is not None else 0
+        self.g[cell] = g
+        h = 0
+        if self.goal is not None:
+            r, c = self.coords[cell]
+            h = abs(r - self.goal[0]) + abs(c - self.goal[1])
+        heapq.heappush(self.heap, (g + h, -g, self.pushes, cell))
+        self.pushes += 1
+
+    def pop(self):
+        self.expanded += 1
+        return heapq.heappop(self.heap)[-1]
+
+    def order(self, neighbours):
+        pass # The heap decides
+
+class Bidirectional(BreadthFirst):
+    """
+    BFS from the agent and BFS back from the treasure, one expansion each per step.
+    The search is over as soon as the agent expands a cell the backward search has
+    seen: the two halves of the path meet there, and path_to_goal(cell) is the
+    backward half the agent still has to walk.
+    """
+    def __init__(self, topology, goal=None):
+        super().__init__(topology, goal)
+        self.neighbours = topology.neighbours
+        self.backward = deque()
+        self.toward_goal = np.full(topology.size, -1, dtype=np.int32) # Next cell on the way back to the goal
+        self.backward_seen = bytearray(topology.size)
+        if goal is not None:
+            start = topology.index(*goal)
+            self.backward.append(start)
+            self.backward_seen[start] = 1
+
+    def pop(self):
+        if self.backward:
+            self.expanded += 1
+            current = self.backward.popleft()
+            for n in self.neighbours[current]:
+                if not self.backward_seen[n]:
+                    self.backward_seen[n] = 1
+                    self.toward_goal[n] = current
+                    self.backward.append(n)
+        return super().pop()
+
+    def reached(self, cell):
+        return bool(self.backward_seen[cell])
+
+    def path_to_goal(self, cell):
+        """Cells from the one after `cell` up to and including the treasure."""
+        path = []
+        cell = int(self.toward_goal[cell])
+        while cell >= 0:
+            path.append(cell)
+            cell = int(self.toward_goal[cell])
+        return path
+
+STRATEGIES = {
+    "bfs": BreadthFirst,
+    "astar": AStar,
+    "bidirectional": Bidirectional,
+    "shared": AStar, # One heap that both agents pop from
+}
+
+def make_frontiers(strategy, topology, goal):
+    """Returns one frontier per agent; in "shared" mode both agents get the same one."""
+    try:
+        frontier = STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from: {', '.join(STRATEGIES)}")
+    if strategy == "shared":
+        shared = frontier(topology, goal)
+        return shared, shared
+    return frontier(topology, goal), frontier(topology, goal)
+
 # --- Agent Logic ---
 class SearchAgent:
-    def __init__(self, name, start_pos, color):
+    """
+    Explorer over flat cell indices, driven by a strategy frontier (BFS by default).
+    visited is a bytearray with one byte per cell, so the partner's trail is checked
+    with a single index, not a set of tuples.
+    """
+    def __init__(self, name, start_pos, color, topology, frontier=None):
         self.name = name
         self.color = color
+        self.topology = topology
+        self.frontier = frontier if frontier is not None else BreadthFirst(topology)
         self.pos = start_pos
-        self.queue = deque([start_pos])
-        self.visited = {start_pos}
+        start = topology.index(*start_pos)
+        self.frontier.push(start, None)
+        self.visited = bytearray(topology.size)
+        self.visited[start] = 1
+        self.walk = None # Cells left to walk once a strategy knows the way to the treasure
         self.finished = False
         self.found_treasure = False
 
-    def move(self, maze_grid, partner_visited):
-        if not self.queue or self.finished:
+    def move(self, cells, partner_visited):
+        """Expands one cell, or takes one step along a known path, and returns the cells it discovered."""
+        if self.walk:
+            return self.walk_step(cells, partner_visited)
+        if not self.frontier or self.finished:
             self.finished = True
-            return
+            return []
 
-        current = self.queue.popleft()
-        self.pos = current
-        r, c = current
+        current = self.frontier.pop()
+        self.pos = self.topology.coords[current]
 
-        if maze_grid[r, c] == TREASURE:
+        if cells[current] == TREASURE:
             self.found_treasure = True
             self.finished = True
-            return
-
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        np.random.shuffle(directions)
-
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < MAZE_SIZE and 0 <= nc < MAZE_SIZE:
-                if maze_grid[nr, nc] != WALL:
-                    if (nr, nc) not in self.visited and (nr, nc) not in partner_visited:
-                        self.visited.add((nr, nc))
-                        self.queue.append((nr, nc))
-
-# --- Simulation Execution ---
-agent1 = SearchAgent("Agent Red", START_1, COLOR_AGENT_1)
-agent2 = SearchAgent("Agent Blue", START_2, COLOR_AGENT_2)
-
-history = []
-
-for _ in range(MAX_STEPS):
-    state = {
-        'p1': agent1.pos,
-        'p2': agent2.pos,
-        'v1': agent1.visited.copy(),
-        'v2': agent2.visited.copy(),
-        'status': "Searching..."
-    }
-    
-    agent1.move(maze, agent2.visited)
-    agent2.move(maze, agent1.visited)
-
-    if agent1.found_treasure:
-        # Create the "Victory" frame logic
-        state['p1'] = agent1.pos # Ensure final pos is recorded
-        state['status'] = "RED FOUND THE TREASURE!"
-        # Append multiple times to pause animation on victory
-        for _ in range(20): 
-            history.append(state)
-        break
-    if agent2.found_treasure:
-        state['p2'] = agent2.pos
-        state['status'] = "BLUE FOUND THE TREASURE!"
-        for _ in range(20):
-            history.append(state)
-        break
-    
-    history.append(state)
-
-# --- Visualization Setup ---
-fig, ax = plt.subplots(figsize=(8, 8))
-fig.patch.set_facecolor('#FDFEFE')
-
-def setup_plot():
-    ax.clear()
+            return []
+        if self.frontier.reached(current):
+            # The rest of the path is known; walk it one cell per step like any other move
+            self.walk = deque(self.frontier.path_to_goal(current))
+            return []
+
+        neighbours = list(self.topology.neighbours[current])
+        self.frontier.order(neighbours)
+
+        discovered = []
+        for n in neighbours:
+            if not self.visited[n] and not partner_visited[n]:
+                self.visited[n] = 1
+                self.frontier.push(n, current)
+                discovered.append(n)
+        return discovered
+
+    def walk_step(self, cells, partner_visited):
+        current = self.walk.popleft()
+        self.pos = self.topology.coords[current]
+        if cells[current] == TREASURE:
+            self.walk.clear()
+            self.found_treasure = True
+            self.finished = True
+            return []
+        if self.visited[current] or partner_visited[current]:
+            return []
+        self.visited[current] = 1
+        return [current]
+
+# --- Search Log ---
+NEVER = np.iinfo(np.int32).max
+STATUS_SEARCHING = "Searching..."
+VICTORY_STATUS = {1: "RED FOUND THE TREASURE!", 2: "BLUE FOUND THE TREASURE!"}
+
+class SearchLog:
+    """
+    Append-only record of a search. Each cell stores the frame it was discovered
+    in and the agent that found it, so any frame's visited set is the view
+    discovery_step <= frame for that owner and nothing is copied per step. The
+    agents never claim a cell the partner already holds, so one owner per cell
+    loses nothing.
+    """
+    def __init__(self, shape, max_frames=MAX_STEPS):
+        self.shape = shape
+        # Flat per-cell arrays, indexed like GridTopology cells
+        self.discovery_step = np.full(shape[0] * shape[1], NEVER, dtype=np.int32)
+        self.owner = np.zeros(shape[0] * shape[1], dtype=np.int8)
+        # Grown by doubling, so long searches only pay for the frames they use
+        self.positions = np.zeros((max(1, min(max_frames, 1024)), 2, 2), dtype=np.int32)
+        self.frames = 0
+        self.winner = 0
+        self.nodes_expanded = 0
+
+    def discover(self, cells, agent_id, frame):
+        self.discovery_step[cells] = frame
+        self.owner[cells] = agent_id
+
+    def add_frame(self, p1, p2):
+        if self.frames == len(self.positions):
+            self.positions = np.concatenate([self.positions, np.zeros_like(self.positions)])
+        self.positions[self.frames] = (p1, p2)
+        self.frames += 1
+
+    def visited(self, frame, agent_id):
+        return ((self.discovery_step <= frame) & (self.owner == agent_id)).reshape(self.shape)
+
+    def status(self, frame):
+        if self.winner and frame == self.frames - 1:
+            return VICTORY_STATUS[self.winner]
+        return STATUS_SEARCHING
+
+def run_search(maze_grid=maze, start_1=START_1, start_2=START_2, max_steps=MAX_STEPS, strategy="bfs",
+               topology=None):
+    """
+    Runs both agents until one finds the treasure or max_steps is reached.
+    Frame f shows the positions and trails before step f's moves; on a victory the
+    last frame shows the finder on the treasure. Pass a prebuilt topology to reuse
+    it across runs on the same walls.
+    """
+    topology = topology or GridTopology.from_maze(maze_grid, WALL)
+    cells = bytes(maze_grid.astype(np.uint8).ravel())
+    treasure = np.argwhere(maze_grid == TREASURE)
+    goal = tuple(int(v) for v in treasure[0]) if len(treasure) else None
+    frontier1, frontier2 = make_frontiers(strategy, topology, goal)
+    agent1 = SearchAgent("Agent Red", start_1, COLOR_AGENT_1, topology, frontier1)
+    agent2 = SearchAgent("Agent Blue", start_2, COLOR_AGENT_2, topology, frontier2)
+
+    log = SearchLog(maze_grid.shape, max_steps)
+    log.discover([topology.index(*start_1)], 1, 0)
+    log.discover([topology.index(*start_2)], 2, 0)
+
+    for step in range(max_steps):
+        p1, p2 = agent1.pos, agent2.pos
+        log.discover(agent1.move(cells, agent2.visited), 1, step + 1)
+        log.discover(agent2.move(cells, agent1.visited), 2, step + 1)
+
+        if agent1.found_treasure:
+            log.add_frame(agent1.pos, p2) # Ensure final pos is recorded
+            log.winner = 1
+            break
+        if agent2.found_treasure:
+            log.add_frame(p1, agent2.pos)
+            log.winner = 2
+            break
+        log.add_frame(p1, p2)
+
+    frontiers = [frontier1] if frontier1 is frontier2 else [frontier1, frontier2]
+    log.nodes_expanded = sum(frontier.expanded for frontier in frontiers)
+    metrics.count("treasurehunt.nodes_expanded", log.nodes_expanded)
+    return log
+
+# Per-step methods timed by --metrics
+METRIC_HOOKS = [(SearchAgent, "move", "treasurehunt.move")]
+
+def compare_strategies(maze_grid=maze, start_1=START_1, start_2=START_2, max_steps=MAX_STEPS, runs=20):
+    """Mean nodes expanded and steps to the treasure per strategy over `runs` seeded runs."""
+    rows = []
+    for strategy in STRATEGIES:
+        expanded, steps, found = [], [], 0
+        for run in range(runs):
+            np.random.seed(run) # BFS shuffles with the global generator
+            log = run_search(maze_grid, start_1, start_2, max_steps, strategy)
+            expanded.append(log.nodes_expanded)
+            if log.winner:
+                found += 1
+                steps.append(log.frames)
+        rows.append({
+            'strategy': strategy,
+            'found_rate': found / runs,
+            'nodes_expanded': float(np.mean(expanded)),
+            'steps_to_treasure': float(np.mean(steps)) if steps else None,
+        })
+    return rows
+
+# --- Replay Recording ---
+# Recorded cells use these codes; trails are pre-blended over the path colour
+CELL_PATH, CELL_WALL, CELL_TREASURE, CELL_TRAIL_1, CELL_TRAIL_2 = range(5)
+STATUSES = [STATUS_SEARCHING, VICTORY_STATUS[1], VICTORY_STATUS[2]]
+
+def hex_rgb(color):
+    """'#rrggbb' as floats in [0, 1], like matplotlib.colors.to_rgb, without importing matplotlib."""
+    return tuple(int(color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+
+def blend(color, alpha):
+    mixed = alpha * np.array(hex_rgb(color)) + (1 - alpha) * np.array(hex_rgb(COLOR_PATH))
+    return "#" + "".join(format(round(v * 255), "02x") for v in mixed.tolist())
+
+REPLAY_PALETTE = [COLOR_PATH, COLOR_WALL, COLOR_TREASURE, blend(COLOR_TRAIL_1, 0.6), blend(COLOR_TRAIL_2, 0.6)]
+
+def record_log(log, maze_grid, path):
+    """Writes a search log as a replay directory (see replay.py)."""
+    base = np.select([maze_grid == WALL, maze_grid == TREASURE], [CELL_WALL, CELL_TREASURE], CELL_PATH)
+    base = base.astype(np.uint8)
+    path_cells = base == CELL_PATH
+
+    def frame_cells(frame):
+        cells = base.copy()
+        cells[path_cells & log.visited(frame, 1)] = CELL_TRAIL_1
+        cells[path_cells & log.visited(frame, 2)] = CELL_TRAIL_2
+        return cells
+
+    with ReplayRecorder(path, frame_cells(0), log.positions[0], REPLAY_PALETTE, [COLOR_AGENT_1, COLOR_AGENT_2],
+                        title="Collaborative Multi-Agent Search", statuses=STATUSES) as recorder:
+        for frame in range(1, log.frames):
+            recorder.record(frame_cells(frame), log.positions[frame], STATUSES.index(log.status(frame)))
+
+# --- Visualization ---
+# Precomputed colours: base image indexed by 0 path / 1 wall / 2 treasure, trails by owner
+BASE_RGB = np.array([hex_rgb(c) for c in (COLOR_PATH, COLOR_WALL, COLOR_TREASURE)])
+BASE_RGB = (BASE_RGB * 255).astype('uint8')
+TRAIL_RGBA = np.array([(0.0, 0.0, 0.0, 0.0),
+                       hex_rgb(COLOR_TRAIL_1) + (0.6,),
+                       hex_rgb(COLOR_TRAIL_2) + (0.6,)])
+
+def animate_log(log, maze_grid=maze):
+    """Plays a search log; the victory frame is held for VICTORY_HOLD frames."""
+    # Imported here so searches, recordings and benchmarks never load matplotlib
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+    from matplotlib.animation import FuncAnimation
+
+    rows, cols = maze_grid.shape
+    fig, ax = plt.subplots(figsize=(8, 8))
+    fig.patch.set_facecolor('#FDFEFE')
+
     ax.set_xticks([])
     ax.set_yticks([])
     ax.set_title("Collaborative Multi-Agent Search", fontsize=14, fontweight='bold')
-    
-    grid_img = np.zeros((MAZE_SIZE, MAZE_SIZE, 3))
-    for r in range(MAZE_SIZE):
-        for c in range(MAZE_SIZE):
-            if maze[r, c] == WALL:
-                grid_img[r, c] = [int(x*255) for x in plt.matplotlib.colors.to_rgb(COLOR_WALL)]
-            elif maze[r, c] == TREASURE:
-                grid_img[r, c] = [int(x*255) for x in plt.matplotlib.colors.to_rgb(COLOR_TREASURE)]
-            else:
-                grid_img[r, c] = [int(x*255) for x in plt.matplotlib.colors.to_rgb(COLOR_PATH)]
-    
-    ax.imshow(grid_img.astype('uint8'))
-    return ax
-
-ax = setup_plot()
-visited_layer = ax.imshow(np.zeros((MAZE_SIZE, MAZE_SIZE, 4)), zorder=1)
-
-# Agents
-dot1, = ax.plot([], [], 'o', color=COLOR_AGENT_1, markersize=15, markeredgecolor='white', label='Agent 1')
-dot2, = ax.plot([], [], 'o', color=COLOR_AGENT_2, markersize=15, markeredgecolor='white', label='Agent 2')
-
-# Winner Marker (Hidden initially)
-winner_star, = ax.plot([], [], '*', color='gold', markersize=30, markeredgecolor='black', zorder=10, visible=False)
-
-status_text = ax.text(0.5, -0.05, "", transform=ax.transAxes, ha="center", fontsize=12, fontweight='bold')
-
-legend_elements = [
-    patches.Patch(facecolor=COLOR_AGENT_1, label='Agent Red'),
-    patches.Patch(facecolor=COLOR_AGENT_2, label='Agent Blue'),
-    patches.Patch(facecolor=COLOR_TREASURE, label='Treasure'),
-]
-ax.legend(handles=legend_elements, loc='upper right', bbox_to_anchor=(1.1, 1.1))
-
-def animate(frame_idx):
-    data = history[frame_idx]
-    
-    # Update positions
-    dot1.set_data([data['p1'][1]], [data['p1'][0]])
-    dot2.set_data([data['p2'][1]], [data['p2'][0]])
-    
-    # Reset visual styles for normal search
-    dot1.set_marker('o')
-    dot2.set_marker('o')
-    dot1.set_markersize(15)
-    dot2.set_markersize(15)
-    winner_star.set_visible(False)
-
-    # VICTORY VISUALS
-    if "RED FOUND" in data['status']:
-        dot1.set_visible(False) # Hide dot, show star
-        winner_star.set_data([data['p1'][1]], [data['p1'][0]])
-        winner_star.set_color(COLOR_AGENT_1)
-        winner_star.set_visible(True)
-    elif "BLUE FOUND" in data['status']:
-        dot2.set_visible(False)
-        winner_star.set_data([data['p2'][1]], [data['p2'][0]])
-        winner_star.set_color(COLOR_AGENT_2)
-        winner_star.set_visible(True)
+
+    # Base image: one palette lookup instead of a colour conversion per cell
+    base = np.select([maze_grid == WALL, maze_grid == TREASURE], [1, 2], 0)
+    ax.imshow(BASE_RGB[base])
+
+    # Every cell's trail colour once it is visited: owner picks the colour, walls and treasure stay clear
+    path = ((maze_grid != WALL) & (maze_grid != TREASURE)).ravel()
+    trail_colors = np.where(path[:, None], TRAIL_RGBA[log.owner], 0.0)
+    # Cells in discovery order, so each frame only paints the cells discovered since the last one
+    order = np.argsort(log.discovery_step, kind='stable')
+    revealed = np.searchsorted(log.discovery_step[order], np.arange(log.frames), side='right')
+    overlay = np.zeros((rows * cols, 4))
+    shown = {'frame': -1}
+
+    visited_layer = ax.imshow(overlay.reshape(rows, cols, 4), zorder=1)
+
+    # Agents
+    dot1, = ax.plot([], [], 'o', color=COLOR_AGENT_1, markersize=15, markeredgecolor='white', label='Agent 1')
+    dot2, = ax.plot([], [], 'o', color=COLOR_AGENT_2, markersize=15, markeredgecolor='white', label='Agent 2')
+
+    # Winner Marker (Hidden initially)
+    winner_star, = ax.plot([], [], '*', color='gold', markersize=30, markeredgecolor='black', zorder=10, visible=False)
+
+    status_text = ax.text(0.5, -0.05, "", transform=ax.transAxes, ha="center", fontsize=12, fontweight='bold')
+
+    legend_elements = [
+        patches.Patch(facecolor=COLOR_AGENT_1, label='Agent Red'),
+        patches.Patch(facecolor=COLOR_AGENT_2, label='Agent Blue'),
+        patches.Patch(facecolor=COLOR_TREASURE, label='Treasure'),
+    ]
+    ax.legend(handles=legend_elements, loc='upper right', bbox_to_anchor=(1.1, 1.1))
+
+    def update_trails(frame):
+        if frame < shown['frame']: # Going backwards: repaint from scratch
+            overlay[:] = 0.0
+            shown['frame'] = -1
+        start = revealed[shown['frame']] if shown['frame'] >= 0 else 0
+        cells = order[start:revealed[frame]]
+        overlay[cells] = trail_colors[cells]
+        shown['frame'] = frame
+
+    def animate(frame_idx):
+        with metrics.timer("treasurehunt.animate"):
+            return draw_frame(frame_idx)
+
+    def draw_frame(frame_idx):
+        frame = min(frame_idx, log.frames - 1) # Hold the last frame on victory
+        (r1, c1), (r2, c2) = log.positions[frame]
+        status = log.status(frame)
+
+        # Update positions
+        dot1.set_data([c1], [r1])
+        dot2.set_data([c2], [r2])
+
+        # Reset visual styles for normal search
+        dot1.set_marker('o')
+        dot2.set_marker('o')
+        dot1.set_markersize(15)
+        dot2.set_markersize(15)
+        winner_star.set_visible(False)
+
+        # VICTORY VISUALS
+        if status == VICTORY_STATUS[1]:
+            dot1.set_visible(False) # Hide dot, show star
+            winner_star.set_data([c1], [r1])
+            winner_star.set_color(COLOR_AGENT_1)
+            winner_star.set_visible(True)
+        elif status == VICTORY_STATUS[2]:
+            dot2.set_visible(False)
+            winner_star.set_data([c2], [r2])
+            winner_star.set_color(COLOR_AGENT_2)
+            winner_star.set_visible(True)
+        else:
+            dot1.set_visible(True)
+            dot2.set_visible(True)
+
+        # Update Trails
+        if frame != shown['frame']:
+            update_trails(frame)
+            visited_layer.set_data(overlay.reshape(rows, cols, 4))
+        status_text.set_text(status)
+
+        return dot1, dot2, visited_layer, status_text, winner_star
+
+    frames = log.frames + (VICTORY_HOLD - 1 if log.winner else 0)
+    ani = FuncAnimation(fig, animate, frames=frames, interval=ANIMATION_INTERVAL, blit=True, repeat=False)
+
+    plt.tight_layout()
+    plt.show()
+    return ani
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collaborative two-agent treasure hunt")
+    parser.add_argument("--record", metavar="PATH", help="write the run to a replay directory instead of animating it")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="bfs")
+    parser.add_argument("--compare", action="store_true", help="print expansion counts for every strategy")
+    parser.add_argument("--headless", action="store_true", help="run the search and print the result only")
+    parser.add_argument("--metrics", metavar="PATH", help="write timings on exit (.prom for Prometheus, else JSON)")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable(METRIC_HOOKS)
+
+    if args.compare:
+        print(f"{'Strategy':<14} | {'Found':<6} | {'Expanded':<9} | {'Steps to treasure'}")
+        print("-" * 55)
+        for row in compare_strategies():
+            steps = f"{row['steps_to_treasure']:.1f}" if row['steps_to_treasure'] is not None else "-"
+            print(f"{row['strategy']:<14} | {row['found_rate']:<6.0%} | {row['nodes_expanded']:<9.1f} | {steps}")
     else:
-        dot1.set_visible(True)
-        dot2.set_visible(True)
-
-    # Update Trails
-    overlay = np.zeros((MAZE_SIZE, MAZE_SIZE, 4))
-    all_visited_1 = data['v1']
-    all_visited_2 = data['v2']
-    
-    for r in range(MAZE_SIZE):
-        for c in range(MAZE_SIZE):
-            if maze[r, c] == WALL or maze[r, c] == TREASURE:
-                continue
-            is_v1 = (r, c) in all_visited_1
-            is_v2 = (r, c) in all_visited_2
-            
-            if is_v1 and is_v2:
-                overlay[r, c] = list(plt.matplotlib.colors.to_rgb(COLOR_OVERLAP)) + [0.5]
-            elif is_v1:
-                overlay[r, c] = list(plt.matplotlib.colors.to_rgb(COLOR_TRAIL_1)) + [0.6]
-            elif is_v2:
-                overlay[r, c] = list(plt.matplotlib.colors.to_rgb(COLOR_TRAIL_2)) + [0.6]
-                
-    visited_layer.set_data(overlay)
-    status_text.set_text(data['status'])
-    
-    return dot1, dot2, visited_layer, status_text, winner_star
-
-ani = FuncAnimation(fig, animate, frames=len(history), interval=ANIMATION_INTERVAL, blit=True, repeat=False)
-
-plt.tight_layout()
-plt.show()
+        log = run_search(strategy=args.strategy)
+        print(f"{args.strategy}: {log.nodes_expanded} nodes expanded in {log.frames} steps")
+        if args.record:
+            record_log(log, maze, args.record)
+            print(f"Recorded {log.frames} frames to {args.record} | View with: python replay.py {args.record}")
+        elif args.headless:
+            print(log.status(log.frames - 1))
+        else:
+            animate_log(log)
+    if args.metrics:
+        metrics.REGISTRY.write(args.metrics)